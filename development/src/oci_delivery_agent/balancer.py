@@ -0,0 +1,187 @@
+"""Load balancing across a pool of dedicated GenAI endpoints."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .config import EndpointPoolConfig, GenAIEndpoint
+
+T = TypeVar("T")
+
+GENERATE_TEXT_PATH = "/20231130/actions/generateText"
+
+
+def normalize_hostname(hostname: str) -> str:
+    """Strip the generateText action path some consoles copy into the hostname."""
+    hostname = hostname.strip()
+    if GENERATE_TEXT_PATH in hostname:
+        hostname = hostname.replace(GENERATE_TEXT_PATH, "")
+    return hostname
+
+
+def parse_endpoints(spec: str) -> List[GenAIEndpoint]:
+    """Parse ``OCI_GENAI_ENDPOINTS``.
+
+    Entries are comma separated ``hostname|endpoint_ocid`` pairs, e.g.
+    ``https://inference.generativeai.us-chicago-1.oci.oraclecloud.com|ocid1.generativeaiendpoint...``.
+    """
+    endpoints: List[GenAIEndpoint] = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        hostname, sep, model_ocid = entry.partition("|")
+        if not sep or not hostname.strip() or not model_ocid.strip():
+            raise ValueError(f"Invalid OCI_GENAI_ENDPOINTS entry '{entry}', expected 'hostname|endpoint_ocid'")
+        endpoints.append(GenAIEndpoint(hostname=normalize_hostname(hostname), model_ocid=model_ocid.strip()))
+    return endpoints
+
+
+def resolve_endpoints(config: EndpointPoolConfig) -> List[GenAIEndpoint]:
+    """Configured pool, else the single ``OCI_GENAI_HOSTNAME``/``OCI_TEXT_MODEL_OCID`` pair."""
+    if config.endpoints:
+        return list(config.endpoints)
+    spec = os.environ.get("OCI_GENAI_ENDPOINTS")
+    if spec:
+        return parse_endpoints(spec)
+    hostname = os.environ.get("OCI_GENAI_HOSTNAME")
+    model_ocid = os.environ.get("OCI_TEXT_MODEL_OCID")
+    if hostname and model_ocid:
+        return [GenAIEndpoint(hostname=normalize_hostname(hostname), model_ocid=model_ocid)]
+    return []
+
+
+@dataclass
+class _EndpointState:
+    endpoint: GenAIEndpoint
+    outstanding: int = 0
+    ewma_latency: Optional[float] = None
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+
+
+class EndpointBalancer:
+    """Pick an endpoint per call and eject endpoints that keep failing.
+
+    ``least_outstanding`` sends each call to the endpoint with the fewest
+    in-flight requests, breaking ties on latency. ``latency_weighted`` scores
+    endpoints by ``ewma_latency * (outstanding + 1)`` so slow endpoints still
+    receive work, just proportionally less. Endpoints with no latency history
+    score zero and are tried first.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[GenAIEndpoint],
+        config: EndpointPoolConfig,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not endpoints:
+            raise ValueError("EndpointBalancer requires at least one endpoint")
+        self.config = config
+        self._clock = clock
+        self._states = [_EndpointState(endpoint) for endpoint in endpoints]
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> str:
+        return "+".join(state.endpoint.model_ocid for state in self._states)
+
+    @property
+    def endpoints(self) -> List[GenAIEndpoint]:
+        return [state.endpoint for state in self._states]
+
+    def _score(self, state: _EndpointState) -> Tuple[float, float]:
+        latency = state.ewma_latency or 0.0
+        if self.config.strategy == "latency_weighted":
+            return (latency * (state.outstanding + 1), state.outstanding)
+        return (state.outstanding, latency)
+
+    def _pick(self) -> _EndpointState:
+        now = self._clock()
+        healthy = [state for state in self._states if state.ejected_until <= now]
+        if healthy:
+            return min(healthy, key=self._score)
+        # Everything is ejected: probe the endpoint that recovers first
+        return min(self._states, key=lambda candidate: candidate.ejected_until)
+
+    def select(self) -> GenAIEndpoint:
+        """The endpoint a call would go to now; pass it to ``call`` to pin the call there."""
+        with self._lock:
+            return self._pick().endpoint
+
+    def _acquire(self, endpoint: Optional[GenAIEndpoint] = None) -> _EndpointState:
+        with self._lock:
+            if endpoint is None:
+                state = self._pick()
+            else:
+                state = next(candidate for candidate in self._states if candidate.endpoint == endpoint)
+            state.outstanding += 1
+            state.requests += 1
+            return state
+
+    def _release(self, state: _EndpointState, latency: Optional[float]) -> None:
+        with self._lock:
+            state.outstanding -= 1
+            if latency is None:
+                state.failures += 1
+                state.consecutive_failures += 1
+                if state.consecutive_failures >= self.config.failure_threshold:
+                    state.ejected_until = self._clock() + self.config.ejection_seconds
+                    state.consecutive_failures = 0
+                return
+            state.consecutive_failures = 0
+            alpha = self.config.latency_smoothing
+            state.ewma_latency = (
+                latency if state.ewma_latency is None else (1 - alpha) * state.ewma_latency + alpha * latency
+            )
+
+    def call(self, fn: Callable[[GenAIEndpoint], T], endpoint: Optional[GenAIEndpoint] = None) -> T:
+        """Run ``fn`` against ``endpoint`` (default: the selected one) and record the outcome."""
+        state = self._acquire(endpoint)
+        started = time.perf_counter()
+        try:
+            result = fn(state.endpoint)
+        except Exception:
+            self._release(state, None)
+            raise
+        self._release(state, time.perf_counter() - started)
+        return result
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            now = self._clock()
+            return [
+                {
+                    "hostname": state.endpoint.hostname,
+                    "model_ocid": state.endpoint.model_ocid,
+                    "outstanding": state.outstanding,
+                    "ewma_latency_seconds": round(state.ewma_latency, 4) if state.ewma_latency is not None else None,
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "ejected": state.ejected_until > now,
+                }
+                for state in self._states
+            ]
+
+
+_balancers: Dict[Tuple[GenAIEndpoint, ...], EndpointBalancer] = {}
+_balancers_lock = threading.Lock()
+
+
+def shared_balancer(endpoints: List[GenAIEndpoint], config: EndpointPoolConfig) -> EndpointBalancer:
+    """Process-wide balancer per endpoint pool so outstanding counts are global."""
+    pool_key = tuple(endpoints)
+    with _balancers_lock:
+        balancer = _balancers.get(pool_key)
+        if balancer is None:
+            balancer = EndpointBalancer(endpoints, config)
+            _balancers[pool_key] = balancer
+        else:
+            balancer.config = config
+        return balancer
@@ -0,0 +1,407 @@
+"""Bounded result caches with an in-memory LRU tier and an on-disk SQLite tier."""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.caches import BaseCache
+from langchain_core.outputs import Generation
+
+from .config import CacheConfig
+
+
+def sha256_hex(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss/byte counters for one cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "bytes_read": 0, "bytes_written": 0, "evictions": 0, "expired": 0}
+
+    def add(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_ratio"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+        return counts
+
+
+class MemoryLRUCache:
+    """LRU cache bounded by entry count and total value bytes, with a TTL."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: Optional[float], clock: Callable[[], float] = time.time):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.add("misses")
+                return None
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.stats.add("expired")
+                self.stats.add("misses")
+                return None
+            self._entries.move_to_end(key)
+        self.stats.add("hits")
+        self.stats.add("bytes_read", len(value))
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self._max_bytes:
+            return
+        expires_at = self._clock() + self._ttl if self._ttl else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self._bytes += len(value)
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats.add("evictions")
+        self.stats.add("bytes_written", len(value))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+class SQLiteCache:
+    """On-disk cache bounded by total value bytes; least recently used rows are evicted first."""
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: Optional[float], clock: Callable[[], float] = time.time):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._lock = threading.Lock()
+        self._bytes = int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0])
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute("SELECT value, size, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[2] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._bytes -= row[1]
+                self.stats.add("expired")
+                row = None
+            if row is None:
+                self.stats.add("misses")
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self.stats.add("hits")
+        self.stats.add("bytes_read", row[1])
+        return bytes(row[0])
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self._max_bytes:
+            return
+        now = self._clock()
+        expires_at = now + self._ttl if self._ttl else float("inf")
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), len(value), expires_at, now),
+            )
+            self._bytes += len(value) - (previous[0] if previous else 0)
+            self._evict()
+        self.stats.add("bytes_written", len(value))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._bytes -= row[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at LIMIT 32").fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            for key, size in rows:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._bytes -= size
+                self.stats.add("evictions")
+                if self._bytes <= self._max_bytes:
+                    return
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """Memory LRU in front of an optional SQLite tier; disk hits are promoted to memory."""
+
+    def __init__(self, memory: MemoryLRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None:
+            self.stats.add("misses")
+            return None
+        self.stats.add("hits")
+        self.stats.add("bytes_read", len(value))
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self.stats.add("bytes_written", len(value))
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = self.stats.snapshot()
+        snapshot["memory"] = self.memory.stats.snapshot()
+        if self.disk is not None:
+            snapshot["disk"] = self.disk.stats.snapshot()
+        return snapshot
+
+
+def build_cache(config: CacheConfig) -> TieredCache:
+    memory = MemoryLRUCache(config.max_entries, config.memory_max_bytes, config.ttl_seconds)
+    disk = SQLiteCache(config.path, config.disk_max_bytes, config.ttl_seconds) if config.path else None
+    return TieredCache(memory, disk)
+
+
+_caches: Dict[str, TieredCache] = {}
+_caches_lock = threading.Lock()
+
+
+def shared_cache(name: str, config: CacheConfig) -> Optional[TieredCache]:
+    """Process-wide cache per name, or None when the cache is disabled."""
+    if not config.enabled:
+        return None
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = build_cache(config)
+            _caches[name] = cache
+        return cache
+
+
+def cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss/byte counters for every cache opened in this process."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.snapshot() for name, cache in caches.items()}
+
+
+@dataclass
+class CachedObject:
+    """Object bytes with the ETag they were served with."""
+
+    data: bytes
+    etag: Optional[str]
+    content_type: str
+    validated_at: float
+
+
+class ObjectReadThroughCache:
+    """Object Storage bytes plus ETag.
+
+    Entries younger than ``ttl_seconds`` are served as-is. Older entries are
+    kept and revalidated with a conditional GET (``If-None-Match``), so an
+    unchanged object costs a 304 instead of a full download. Eviction is by
+    size only, through the underlying tiered cache.
+    """
+
+    def __init__(self, store: TieredCache, ttl_seconds: Optional[float], clock: Callable[[], float] = time.time):
+        self.store = store
+        self._ttl = ttl_seconds or 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counts = {"fresh_hits": 0, "not_modified": 0, "downloads": 0}
+
+    def _bump(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def lookup(self, key: str) -> Optional[CachedObject]:
+        raw = self.store.get(key)
+        if raw is None:
+            return None
+        header, _, data = raw.partition(b"\n")
+        meta = json.loads(header)
+        return CachedObject(data, meta["etag"], meta["content_type"], meta["validated_at"])
+
+    def is_fresh(self, cached: CachedObject) -> bool:
+        fresh = self._clock() - cached.validated_at < self._ttl
+        if fresh:
+            self._bump("fresh_hits")
+        return fresh
+
+    def store_object(self, key: str, data: bytes, etag: Optional[str], content_type: str) -> CachedObject:
+        cached = CachedObject(data, etag, content_type, self._clock())
+        self._write(key, cached)
+        self._bump("downloads")
+        return cached
+
+    def not_modified(self, key: str, cached: CachedObject) -> CachedObject:
+        """Record a 304: the cached bytes are valid for another TTL."""
+        cached = replace(cached, validated_at=self._clock())
+        self._write(key, cached)
+        self._bump("not_modified")
+        return cached
+
+    def forget(self, key: str) -> None:
+        """Drop an object that no longer exists upstream."""
+        self.store.delete(key)
+
+    def _write(self, key: str, cached: CachedObject) -> None:
+        header = json.dumps(
+            {"etag": cached.etag, "content_type": cached.content_type, "validated_at": cached.validated_at}
+        ).encode("utf-8")
+        self.store.set(key, header + b"\n" + cached.data)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        counts["store"] = self.store.snapshot()
+        return counts
+
+
+_object_cache: Optional[ObjectReadThroughCache] = None
+
+
+def shared_object_cache(config: CacheConfig) -> Optional[ObjectReadThroughCache]:
+    """Process-wide Object Storage cache, or None when disabled.
+
+    ``config.ttl_seconds`` is the revalidation interval; stored entries never
+    expire on their own because a stale entry still saves a download on 304.
+    """
+    global _object_cache
+    store = shared_cache("object_storage", replace(config, ttl_seconds=None))
+    if store is None:
+        return None
+    with _caches_lock:
+        if _object_cache is None or _object_cache.store is not store:
+            _object_cache = ObjectReadThroughCache(store, config.ttl_seconds)
+        return _object_cache
+
+
+_llm_cache_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache() -> Iterator[None]:
+    """Skip cached answers for LLM calls made in this block; fresh answers still refresh the cache."""
+    token = _llm_cache_bypass.set(True)
+    try:
+        yield
+    finally:
+        _llm_cache_bypass.reset(token)
+
+
+class LLMResponseCache(BaseCache):
+    """LangChain cache keyed on the exact prompt and the model's generation parameters.
+
+    LangChain passes the model's identifying parameters (endpoints, max_tokens,
+    temperature, top_p, stop) as ``llm_string``, so changing any of them
+    misses. Generations flagged with an ``error`` in ``generation_info`` are
+    never stored.
+    """
+
+    def __init__(self, store: TieredCache):
+        self.store = store
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        return sha256_hex(f"{llm_string}\x00{prompt}")
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if _llm_cache_bypass.get():
+            return None
+        raw = self.store.get(self.key(prompt, llm_string))
+        if raw is None:
+            return None
+        return [Generation(text=text) for text in json.loads(raw)]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        if any((generation.generation_info or {}).get("error") for generation in return_val):
+            return
+        texts = [generation.text for generation in return_val]
+        self.store.set(self.key(prompt, llm_string), json.dumps(texts).encode("utf-8"))
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+
+def shared_llm_cache(config: CacheConfig) -> Optional[LLMResponseCache]:
+    store = shared_cache("llm", config)
+    return LLMResponseCache(store) if store is not None else None
@@ -0,0 +1,190 @@
+"""Fast-then-large model cascade for the vision stages.
+
+Most delivery photos are clean, undamaged doorstep shots that a smaller,
+faster model answers correctly. With the cascade enabled the caption and
+damage requests go to the fast endpoints first; an answer is escalated to the
+large model when it is uncertain:
+
+* the reply could not be parsed (or the fast call failed);
+* the caption does not say whether a package is visible;
+* the damage report lists uncertainties or a severity above ``none``.
+
+Each vision call returns a per-stage record (tier, escalation reason, seconds
+and relative cost) and process-wide counters give the escalation rate and the
+blended latency and cost per delivery against a large-only baseline.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .balancer import parse_endpoints
+from .config import CascadeConfig, GenAIEndpoint
+
+FAST = "fast"
+LARGE = "large"
+
+# Escalation reasons
+PARSE_FAILURE = "parse_failure"
+PACKAGE_UNKNOWN = "package_unknown"
+UNCERTAINTIES = "uncertainties"
+SEVERITY = "severity"
+
+_NO_UNCERTAINTY = ("", "none", "n/a")
+
+
+def resolve_fast_endpoints(config: CascadeConfig) -> List[GenAIEndpoint]:
+    """Configured fast pool, else ``GENAI_FAST_ENDPOINTS``; empty when the cascade is off."""
+    if not config.enabled:
+        return []
+    if config.fast_endpoints:
+        return list(config.fast_endpoints)
+    return parse_endpoints(os.environ.get("GENAI_FAST_ENDPOINTS", ""))
+
+
+def escalation_reason(stage: str, result: Mapping[str, Any]) -> Optional[str]:
+    """Why a fast-model answer must be re-asked of the large model, or None to keep it."""
+    if "error" in result or "unstructured" in result:
+        return PARSE_FAILURE
+    if stage == "caption":
+        if not isinstance(result.get("packageVisible"), bool):
+            return PACKAGE_UNKNOWN
+        return None
+    if str(result.get("uncertainties") or "").strip().lower() not in _NO_UNCERTAINTY:
+        return UNCERTAINTIES
+    overall = result.get("overall")
+    severity = overall.get("severity") if isinstance(overall, dict) else None
+    if severity != "none":
+        return SEVERITY
+    return None
+
+
+def run_cascade(
+    stage: str,
+    ask: Callable[[List[GenAIEndpoint]], Dict[str, Any]],
+    fast_endpoints: List[GenAIEndpoint],
+    large_endpoints: List[GenAIEndpoint],
+    config: CascadeConfig,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Ask the fast pool, escalating to the large pool; returns the answer and its cascade record.
+
+    ``ask`` sends the stage's request to a pool and returns the parsed answer
+    (an ``error``/``unstructured`` dict when parsing failed).
+    """
+    started = time.perf_counter()
+    try:
+        result = ask(fast_endpoints)
+    except Exception as err:
+        print(f"Warning: fast {stage} model failed, escalating: {err}")
+        result = {"error": str(err)}
+    fast_seconds = time.perf_counter() - started
+    reason = escalation_reason(stage, result)
+    record = {
+        "tier": FAST,
+        "escalated": reason is not None,
+        "reason": reason,
+        "fast_seconds": round(fast_seconds, 4),
+        "large_seconds": None,
+        "cost": config.fast_call_cost,
+    }
+    if reason is not None:
+        started = time.perf_counter()
+        escalated = ask(large_endpoints)
+        record["large_seconds"] = round(time.perf_counter() - started, 4)
+        record["cost"] += config.large_call_cost
+        # Keep an uncertain fast answer over a large-model failure
+        if "error" not in escalated or "error" in result:
+            result = escalated
+            record["tier"] = LARGE
+    record["seconds"] = round(fast_seconds + (record["large_seconds"] or 0.0), 4)
+    _stats.record_call(stage, record)
+    return result, record
+
+
+def delivery_summary(records: Mapping[str, Optional[Mapping[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Blended seconds and cost of one delivery's vision calls; None when no call went through the cascade."""
+    stages = {stage: dict(record) for stage, record in records.items() if record is not None}
+    if not stages:
+        return None
+    summary = {
+        "stages": stages,
+        "escalations": sum(1 for record in stages.values() if record["escalated"]),
+        "seconds": round(sum(record["seconds"] for record in stages.values()), 4),
+        "cost": round(sum(record["cost"] for record in stages.values()), 4),
+    }
+    _stats.record_delivery(summary)
+    return summary
+
+
+class CascadeStats:
+    """Calls and escalations per stage, plus blended seconds and cost per delivery."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._deliveries = 0
+        self._delivery_seconds = 0.0
+        self._delivery_cost = 0.0
+        self._delivery_calls = 0
+
+    def record_call(self, stage: str, record: Mapping[str, Any]) -> None:
+        with self._lock:
+            counts = self._stages.setdefault(
+                stage,
+                {"calls": 0, "escalations": 0, "reasons": {}, "fast_seconds": 0.0, "large_seconds": 0.0},
+            )
+            counts["calls"] += 1
+            counts["fast_seconds"] += record["fast_seconds"]
+            if record["escalated"]:
+                counts["escalations"] += 1
+                counts["reasons"][record["reason"]] = counts["reasons"].get(record["reason"], 0) + 1
+                counts["large_seconds"] += record["large_seconds"]
+
+    def record_delivery(self, summary: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._deliveries += 1
+            self._delivery_seconds += summary["seconds"]
+            self._delivery_cost += summary["cost"]
+            self._delivery_calls += len(summary["stages"])
+
+    def snapshot(self, config: Optional[CascadeConfig] = None) -> Dict[str, Any]:
+        with self._lock:
+            stages = {stage: dict(counts, reasons=dict(counts["reasons"])) for stage, counts in self._stages.items()}
+            deliveries = self._deliveries
+            seconds = self._delivery_seconds
+            cost = self._delivery_cost
+            calls = self._delivery_calls
+        calls_total = sum(counts["calls"] for counts in stages.values())
+        escalations = sum(counts["escalations"] for counts in stages.values())
+        large_seconds = sum(counts["large_seconds"] for counts in stages.values())
+        for counts in stages.values():
+            counts["escalation_rate"] = round(counts["escalations"] / counts["calls"], 4)
+            counts["fast_seconds_mean"] = round(counts.pop("fast_seconds") / counts["calls"], 4)
+            large = counts.pop("large_seconds")
+            counts["large_seconds_mean"] = round(large / counts["escalations"], 4) if counts["escalations"] else None
+        large_mean = large_seconds / escalations if escalations else None
+        snapshot: Dict[str, Any] = {
+            "stages": stages,
+            "escalation_rate": round(escalations / calls_total, 4) if calls_total else None,
+            "deliveries": deliveries,
+            "seconds_per_delivery": round(seconds / deliveries, 4) if deliveries else None,
+            "cost_per_delivery": round(cost / deliveries, 4) if deliveries else None,
+            # What the same deliveries would take sending every call straight to the large model
+            "large_only_seconds_per_delivery": (
+                round(large_mean * calls / deliveries, 4) if deliveries and large_mean is not None else None
+            ),
+            "large_only_cost_per_delivery": None,
+        }
+        if config is not None and deliveries:
+            snapshot["large_only_cost_per_delivery"] = round(config.large_call_cost * calls / deliveries, 4)
+        return snapshot
+
+
+_stats = CascadeStats()
+
+
+def cascade_metrics(config: Optional[CascadeConfig] = None) -> Dict[str, Any]:
+    """Process-wide escalation rate and blended latency/cost; ``config`` prices the large-only baseline."""
+    return _stats.snapshot(config)
@@ -1,7 +1,9 @@
 """LangChain chains orchestrating the OCI delivery workflow."""
 from __future__ import annotations
 
+import base64
 import json
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Mapping, Optional
@@ -10,8 +12,29 @@ from langchain.chains import LLMChain, SequentialChain
 from langchain.prompts import PromptTemplate
 from langchain_core.language_models import BaseLLM
 
+from .cache import cache_metrics
+from .cascade import cascade_metrics, delivery_summary
+from .concurrency import concurrency_metrics
 from .config import WorkflowConfig, DamageTypeWeights, SeverityScores
+from .deadline import Deadline
+from .dedup import burst_group, dhash, perceptual_hash, shared_burst_index
+from .fast_paths import (
+    LLM_PATH,
+    SAMPLED,
+    SHORT_CIRCUIT,
+    UNUSABLE_PHOTO,
+    agrees_with_short_circuit,
+    damage_stage,
+    decide,
+    fast_path_metrics,
+    no_package_damage_report,
+    record_damage_stage,
+    record_decision,
+)
+from .json_extract import extract_json_object
+from .prompts import compiled_prompts
 from .tools import toolset
+from .usability import UsabilityReport, assess, decode_preview
 
 
 @dataclass
@@ -23,6 +46,10 @@ class DeliveryContext:
     expected_longitude: float
     promised_time_utc: datetime
     delivered_time_utc: datetime
+    driver_id: Optional[str] = None
+    route_id: Optional[str] = None
+    region: Optional[str] = None
+    stop_id: Optional[str] = None
 
 
 def build_caption_chain(llm: BaseLLM) -> LLMChain:
@@ -49,13 +76,18 @@ def compute_location_accuracy(exif: Mapping[str, Any], context: DeliveryContext,
     lon = gps_info.get("longitude")
     if lat is None or lon is None:
         return 0.0
+    return location_accuracy_between(lat, lon, context.expected_latitude, context.expected_longitude, max_distance_meters)
 
+
+def location_accuracy_between(
+    lat: float, lon: float, expected_lat: float, expected_lon: float, max_distance_meters: float
+) -> float:
     # Basic Haversine implementation
     from math import asin, cos, radians, sin, sqrt
 
-    d_lat = radians(lat - context.expected_latitude)
-    d_lon = radians(lon - context.expected_longitude)
-    a = sin(d_lat / 2) ** 2 + cos(radians(context.expected_latitude)) * cos(radians(lat)) * sin(d_lon / 2) ** 2
+    d_lat = radians(lat - expected_lat)
+    d_lon = radians(lon - expected_lon)
+    a = sin(d_lat / 2) ** 2 + cos(radians(expected_lat)) * cos(radians(lat)) * sin(d_lon / 2) ** 2
     c = 2 * asin(sqrt(a))
     earth_radius_m = 6371000
     distance = earth_radius_m * c
@@ -113,11 +145,13 @@ def _compute_weighted_damage_score(damage_report: Mapping[str, Any], type_weight
     total_weighted_score = 0.0
     total_weight = 0.0
     
-    for indicator_name, indicator_data in indicators.items():
-        if indicator_data.get("present", False):
+    # Summed in weight order, not the report's own key order, so every caller
+    # (including the batch scorer) adds the same floats in the same sequence
+    for indicator_name, weight in weights.items():
+        indicator_data = indicators.get(indicator_name)
+        if indicator_data and indicator_data.get("present", False):
             severity = indicator_data.get("severity", "none")
             score = severity_to_score(severity)
-            weight = weights.get(indicator_name, 0.0)
             
             total_weighted_score += score * weight
             total_weight += weight
@@ -180,35 +214,165 @@ def build_workflow_chain(config: WorkflowConfig, llm: BaseLLM) -> SequentialChai
     )
 
 
+def _has_assessment_status(payload: Mapping[str, Any]) -> bool:
+    return payload.get("status") in ("OK", "Review")
+
+
+def _fallback_caption_summary(caption_dict: Mapping[str, Any]) -> str:
+    """Summary used when the caption LLM stage is skipped for lack of time."""
+    description = caption_dict.get("overallDescription")
+    if description:
+        return str(description)
+    return "Caption summary skipped: invocation time budget exhausted."
+
+
+def _context_payload(context: DeliveryContext) -> Dict[str, Any]:
+    return {
+        "object_name": context.object_name,
+        "expected_latitude": context.expected_latitude,
+        "expected_longitude": context.expected_longitude,
+        "promised_time_utc": context.promised_time_utc.isoformat(),
+        "delivered_time_utc": context.delivered_time_utc.isoformat(),
+        "driver_id": context.driver_id,
+        "route_id": context.route_id,
+        "region": context.region,
+        "stop_id": context.stop_id,
+    }
+
+
+def _unusable_photo_result(
+    config: WorkflowConfig,
+    context: DeliveryContext,
+    retrieval_output: Mapping[str, Any],
+    exif: Mapping[str, Any],
+    usability: UsabilityReport,
+    deadline: Deadline,
+) -> Dict[str, Any]:
+    """Result for a photo the usability gate rejected: no GenAI stage ran, and package quality is unknown."""
+    issues = usability.issues()
+    record_decision(UNUSABLE_PHOTO)
+    return {
+        "context": _context_payload(context),
+        "metadata": retrieval_output["metadata"],
+        "exif": exif,
+        "caption_json": {"error": UNUSABLE_PHOTO, "reasons": usability.reasons},
+        "caption_summary": "Photo unusable: " + "; ".join(issues),
+        "damage_report": None,
+        "quality_metrics": {
+            "location_accuracy": round(
+                compute_location_accuracy(exif, context, config.geolocation.max_distance_meters), 3
+            ),
+            "timeliness": compute_timeliness_score(context),
+            "package_quality": None,
+            "quality_index": None,
+        },
+        "assessment": {
+            "status": "Review",
+            "issues": issues,
+            "insights": "The delivery photo failed the local usability checks, so it was not sent for analysis.",
+        },
+        "time_budget": {
+            "remaining_seconds": round(deadline.remaining(), 3),
+            "skipped_stages": ["caption", "damage", "caption_summary", "review"],
+        },
+        "decision": {"path": UNUSABLE_PHOTO, "damage_stage": None, "fast_paths": fast_path_metrics()},
+        "usability": usability.to_dict(),
+        "concurrency": concurrency_metrics(),
+        "prompt_versions": compiled_prompts(config.damage_scoring, config.vision.compact_output).versions(),
+        "caches": cache_metrics(),
+        "dedup": {"phash": None, "duplicate_of": None, "distance": None},
+    }
+
+
 def run_quality_pipeline(
     config: WorkflowConfig,
     llm: BaseLLM,
     context: DeliveryContext,
     object_name: str,
+    deadline: Optional[Deadline] = None,
 ) -> Dict[str, Any]:
-    tools = toolset(config)
+    budget = config.time_budget
+    if deadline is None:
+        deadline = Deadline(budget.invocation_timeout_seconds)
+    skipped_stages: List[str] = []
+    tools = toolset(config, deadline)
 
     retrieval_output = json.loads(tools["retrieval"].run(object_name))
     encoded_payload = retrieval_output["payload"]
 
     exif_raw = json.loads(tools["exif"].run(encoded_payload))
     
+    # Unusable photos (blurry, dark, tiny) go to review before paying for any GenAI call
+    preview = None
+    usability = None
+    if config.usability.enabled:
+        preview = decode_preview(base64.b64decode(encoded_payload), config.usability.preview_side)
+        usability = assess(preview, config.usability)
+        if not usability.usable:
+            return _unusable_photo_result(config, context, retrieval_output, exif_raw, usability, deadline)
+    
+    # Burst photos of the same doorstep reuse the analysis of an earlier near-duplicate
+    burst_index = shared_burst_index(config.dedup)
+    burst_match = None
+    photo_hash = None
+    group = burst_group(
+        object_name,
+        context.expected_latitude,
+        context.expected_longitude,
+        context.driver_id,
+        context.route_id,
+        context.stop_id,
+        context.promised_time_utc.isoformat(),
+    )
+    taken_at = context.delivered_time_utc.timestamp()
+    if burst_index is not None and group is not None:
+        if preview is not None:
+            # Reuse the gate's decoded preview
+            photo_hash = dhash(preview.image, config.dedup.hash_size)
+        else:
+            photo_hash = perceptual_hash(base64.b64decode(encoded_payload), config.dedup.hash_size)
+        if photo_hash is not None:
+            burst_match = burst_index.find(group, photo_hash, taken_at)
+    
     # Get structured caption JSON (do this first to provide context)
-    caption_json = tools["caption"].run(encoded_payload)
+    if burst_match is not None:
+        caption_json = burst_match.caption_json
+    else:
+        caption_json = tools["caption"].run(encoded_payload)
     caption_dict = json.loads(caption_json)
-    
-    caption_summary = build_caption_chain(llm).invoke(
-        {
-            "metadata": json.dumps(retrieval_output["metadata"]),
-            "caption_json": caption_json,
-        }
-    )["caption_summary"]
+    # Which model tier answered is reported separately, not passed to later stages
+    cascade_records = {"caption": caption_dict.pop("cascade", None), "damage": None}
+    if cascade_records["caption"] is not None:
+        caption_json = json.dumps(caption_dict)
     
     # Get structured damage report JSON with caption context for consistency
-    damage_report = json.loads(tools["damage"].run(
-        encoded_payload,  # First positional argument
-        caption_context=caption_json  # Pass caption results as context
-    ))
+    stage = None
+    if burst_match is not None:
+        damage_report = burst_match.damage_report
+    else:
+        # No package in the caption fixes the damage answer; skip the call unless sampled for auditing
+        stage = damage_stage(caption_dict, object_name, config.damage_short_circuit)
+        if stage == SHORT_CIRCUIT:
+            damage_report = no_package_damage_report()
+            record_damage_stage(stage)
+        else:
+            damage_report = json.loads(tools["damage"].run(
+                encoded_payload,  # First positional argument
+                caption_context=caption_json  # Pass caption results as context
+            ))
+            cascade_records["damage"] = damage_report.pop("cascade", None)
+            if stage == SAMPLED:
+                agrees = agrees_with_short_circuit(damage_report)
+                record_damage_stage(stage, agrees)
+                if agrees is False:
+                    print(f"Warning: damage model found a package or damage in {object_name} after the caption saw none")
+        if (
+            photo_hash is not None
+            and "error" not in caption_dict
+            and "error" not in damage_report
+        ):
+            burst_index.add(group, object_name, photo_hash, taken_at, caption_json, damage_report)
+    cascade = delivery_summary(cascade_records)
 
     weights = config.quality_weights.normalized()
     quality_metrics = compute_quality_index(
@@ -220,31 +384,56 @@ def run_quality_pipeline(
         config=config,
     )
 
-    workflow_chain = build_workflow_chain(config, llm)
-    assessment = workflow_chain.invoke(
-        {
-            "metadata": json.dumps(retrieval_output["metadata"]),
-            "caption_summary": caption_summary,
-            "quality_metrics": json.dumps(quality_metrics),
-        }
-    )["agent_assessment"]
-    assessment_clean = assessment.strip()
-    if assessment_clean.startswith("```"):
-        lines = [
-            line for line in assessment_clean.splitlines()
-            if not line.strip().startswith("```")
-        ]
-        assessment_clean = "\n".join(lines).strip()
-    try:
-        assessment_payload = json.loads(assessment_clean)
-    except json.JSONDecodeError:
-        assessment_payload = {
-            "status": "Review",
-            "issues": ["LLM returned non-JSON response"],
-            "insights": assessment,
-        }
+    # Clear-cut deliveries are settled by rule; only ambiguous ones pay for the text LLM stages
+    decision = decide(caption_dict, damage_report, quality_metrics, config.fast_paths)
+    if decision is not None:
+        caption_summary = decision.caption_summary
+        assessment_payload = decision.assessment
+        record_decision(decision.rule)
+    else:
+        llm_started = time.perf_counter()
+        # Optional stage: fall back to the structured caption when time runs short
+        if deadline.can_afford(budget.caption_summary_min_seconds):
+            caption_summary = build_caption_chain(llm).invoke(
+                {
+                    "metadata": json.dumps(retrieval_output["metadata"]),
+                    "caption_json": caption_json,
+                }
+            )["caption_summary"]
+        else:
+            skipped_stages.append("caption_summary")
+            caption_summary = _fallback_caption_summary(caption_dict)
+
+        # Optional stage: route to human review rather than overrun the function timeout
+        if deadline.can_afford(budget.review_min_seconds):
+            workflow_chain = build_workflow_chain(config, llm)
+            assessment = workflow_chain.invoke(
+                {
+                    "metadata": json.dumps(retrieval_output["metadata"]),
+                    "caption_summary": caption_summary,
+                    "quality_metrics": json.dumps(quality_metrics),
+                }
+            )["agent_assessment"]
+            # A reply repaired after truncation must still carry a whole status
+            assessment_payload = extract_json_object(assessment, valid=_has_assessment_status)
+            if assessment_payload is None:
+                assessment_payload = {
+                    "status": "Review",
+                    "issues": ["LLM returned non-JSON response"],
+                    "insights": assessment,
+                }
+        else:
+            skipped_stages.append("review")
+            assessment_payload = {
+                "status": "Review",
+                "issues": ["Automated review skipped: invocation time budget exhausted"],
+                "insights": caption_summary,
+            }
+        # Only full runs of both stages say how long the LLM path takes
+        record_decision(LLM_PATH, None if skipped_stages else time.perf_counter() - llm_started)
 
     return {
+        "context": _context_payload(context),
         "metadata": retrieval_output["metadata"],
         "exif": exif_raw,
         "caption_json": caption_dict,  # Already parsed above
@@ -252,4 +441,23 @@ def run_quality_pipeline(
         "damage_report": damage_report,
         "quality_metrics": quality_metrics,
         "assessment": assessment_payload,
+        "time_budget": {
+            "remaining_seconds": round(deadline.remaining(), 3),
+            "skipped_stages": skipped_stages,
+        },
+        "decision": {
+            "path": decision.rule if decision is not None else LLM_PATH,
+            "damage_stage": stage,
+            "fast_paths": fast_path_metrics(),
+        },
+        "usability": usability.to_dict() if usability is not None else None,
+        "cascade": {"delivery": cascade, "totals": cascade_metrics(config.cascade)},
+        "concurrency": concurrency_metrics(),
+        "prompt_versions": compiled_prompts(config.damage_scoring, config.vision.compact_output).versions(),
+        "caches": cache_metrics(),
+        "dedup": {
+            "phash": f"{photo_hash:0{config.dedup.hash_size ** 2 // 4}x}" if photo_hash is not None else None,
+            "duplicate_of": burst_match.object_name if burst_match else None,
+            "distance": burst_match.distance if burst_match else None,
+        },
     }
@@ -0,0 +1,214 @@
+"""Compact wire format for the vision replies and its decoder.
+
+Every output token is generated serially, so the compact prompts ask for
+short keys, enum codes and word-bounded free text instead of the verbose
+schema. ``decode_caption`` and ``decode_damage`` expand a compact reply back
+into the ``caption_json`` and ``damage_report`` structures the rest of the
+pipeline reads; replies that already use the verbose keys pass through.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional
+
+SCENE_CODES = {"d": "delivery", "p": "package", "e": "entrance", "o": "other"}
+LOCATION_CODES = {
+    "ds": "doorstep",
+    "po": "porch",
+    "mb": "mailbox",
+    "dw": "driveway",
+    "en": "entrance",
+    "in": "inside",
+    "o": "other",
+}
+WEATHER_CODES = {"c": "clear", "r": "rainy", "cl": "cloudy", "s": "snowy", "u": "unknown"}
+TIME_CODES = {"m": "morning", "a": "afternoon", "e": "evening", "n": "night", "u": "unknown"}
+SEVERITIES = ("none", "minor", "moderate", "severe")
+INDICATOR_CODES = {"bd": "boxDeformation", "cd": "cornerDamage", "lk": "leakage", "pi": "packagingIntegrity"}
+
+# Word limits the compact prompts state for free text
+DESCRIPTION_WORDS = 25
+SHORT_TEXT_WORDS = 8
+EVIDENCE_WORDS = 6
+
+
+def code_list(codes: Mapping[str, str]) -> str:
+    """``d=delivery, p=package, ...`` for a prompt."""
+    return ", ".join(f"{code}={name}" for code, name in codes.items())
+
+
+def _enum(codes: Mapping[str, str], value: Any, default: str) -> str:
+    if not isinstance(value, str):
+        return default
+    value = value.strip()
+    if value in codes:
+        return codes[value]
+    lowered = value.lower()
+    if lowered in codes.values():
+        return lowered
+    return codes.get(lowered, default)
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def _text(value: Any, empty: str = "") -> str:
+    if value is None:
+        return empty
+    text = str(value).strip()
+    return text or empty
+
+
+def _severity(value: Any) -> str:
+    if isinstance(value, bool):
+        return "none"
+    if isinstance(value, (int, float)):
+        return SEVERITIES[min(max(int(value), 0), len(SEVERITIES) - 1)]
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value.isdigit():
+            return _severity(int(value))
+        if value in SEVERITIES:
+            return value
+    return "none"
+
+
+def _known_severity(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return value == int(value) and 0 <= value < len(SEVERITIES)
+    if isinstance(value, str):
+        value = value.strip().lower()
+        return value in SEVERITIES or (value.isdigit() and int(value) < len(SEVERITIES))
+    return False
+
+
+def has_known_severities(payload: Mapping[str, Any]) -> bool:
+    """Whether a damage reply, compact or verbose, gives a known overall severity and one for each indicator it lists."""
+    if "overall" in payload:
+        overall = payload["overall"]
+        severity = overall.get("severity") if isinstance(overall, dict) else None
+        indicators = payload.get("indicators") or {}
+        listed = [entry.get("severity") if isinstance(entry, dict) else None for entry in indicators.values()] \
+            if isinstance(indicators, dict) else [None]
+    else:
+        severity = _item(payload.get("o"), 0)
+        indicators = payload.get("i") or {}
+        listed = [_item(entry, 1) for entry in indicators.values()] if isinstance(indicators, dict) else [None]
+    return _known_severity(severity) and all(_known_severity(value) for value in listed)
+
+
+def _score(value: Any) -> float:
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _item(values: Any, index: int) -> Any:
+    if isinstance(values, (list, tuple)) and len(values) > index:
+        return values[index]
+    return None
+
+
+def decode_caption(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a compact caption reply into the ``caption_json`` structure."""
+    if "sceneType" in payload:
+        return payload
+    safety = payload.get("sf")
+    return {
+        "sceneType": _enum(SCENE_CODES, payload.get("s"), "other"),
+        "packageVisible": _flag(payload.get("pv")),
+        "packageDescription": _text(payload.get("pd"), "none"),
+        "location": {
+            "type": _enum(LOCATION_CODES, payload.get("l"), "other"),
+            "description": _text(payload.get("ld")),
+        },
+        "environment": {
+            "weather": _enum(WEATHER_CODES, payload.get("w"), "unknown"),
+            "timeOfDay": _enum(TIME_CODES, payload.get("t"), "unknown"),
+            "conditions": _text(payload.get("c")),
+        },
+        "safetyAssessment": {
+            "protected": _flag(_item(safety, 0)),
+            "visible": _flag(_item(safety, 1)),
+            "secure": _flag(_item(safety, 2)),
+            "notes": _text(payload.get("sn")),
+        },
+        "overallDescription": _text(payload.get("o")),
+    }
+
+
+def decode_damage(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a compact damage reply into the ``damage_report`` structure."""
+    if "overall" in payload:
+        return payload
+    overall = payload.get("o")
+    indicators = payload.get("i") if isinstance(payload.get("i"), dict) else {}
+    return {
+        "overall": {
+            "severity": _severity(_item(overall, 0)),
+            "score": _score(_item(overall, 1)),
+            "rationale": _text(_item(overall, 2)),
+        },
+        "indicators": {
+            name: {
+                "present": _flag(_item(indicators.get(code), 0)),
+                "severity": _severity(_item(indicators.get(code), 1)),
+                "evidence": _text(_item(indicators.get(code), 2), "none"),
+            }
+            for code, name in INDICATOR_CODES.items()
+        },
+        "packageVisible": _flag(payload.get("pv")),
+        "uncertainties": _text(payload.get("u")),
+    }
+
+
+def _code_for(codes: Mapping[str, str], name: Optional[str]) -> Optional[str]:
+    for code, value in codes.items():
+        if value == name:
+            return code
+    return None
+
+
+def encode_caption(caption: Mapping[str, Any]) -> Dict[str, Any]:
+    """Compact form of a ``caption_json``; the inverse of ``decode_caption``."""
+    location = caption.get("location") or {}
+    environment = caption.get("environment") or {}
+    safety = caption.get("safetyAssessment") or {}
+    return {
+        "s": _code_for(SCENE_CODES, caption.get("sceneType")) or "o",
+        "pv": int(bool(caption.get("packageVisible"))),
+        "pd": caption.get("packageDescription", "none"),
+        "l": _code_for(LOCATION_CODES, location.get("type")) or "o",
+        "ld": location.get("description", ""),
+        "w": _code_for(WEATHER_CODES, environment.get("weather")) or "u",
+        "t": _code_for(TIME_CODES, environment.get("timeOfDay")) or "u",
+        "c": environment.get("conditions", ""),
+        "sf": [int(bool(safety.get(key))) for key in ("protected", "visible", "secure")],
+        "sn": safety.get("notes", ""),
+        "o": caption.get("overallDescription", ""),
+    }
+
+
+def encode_damage(report: Mapping[str, Any]) -> Dict[str, Any]:
+    """Compact form of a ``damage_report``; the inverse of ``decode_damage``."""
+    overall = report.get("overall") or {}
+    indicators = report.get("indicators") or {}
+    encoded_indicators = {}
+    for code, name in INDICATOR_CODES.items():
+        indicator = indicators.get(name) or {}
+        encoded_indicators[code] = [
+            int(bool(indicator.get("present"))),
+            SEVERITIES.index(_severity(indicator.get("severity"))),
+            "" if indicator.get("evidence") in (None, "none") else indicator["evidence"],
+        ]
+    return {
+        "o": [SEVERITIES.index(_severity(overall.get("severity"))), overall.get("score", 0.0), overall.get("rationale", "")],
+        "i": encoded_indicators,
+        "pv": int(bool(report.get("packageVisible"))),
+        "u": report.get("uncertainties", ""),
+    }
@@ -0,0 +1,171 @@
+"""Adaptive (AIMD) concurrency limits for OCI service calls."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from .config import ConcurrencyConfig
+from .deadline import Deadline, DeadlineExceeded
+
+T = TypeVar("T")
+
+# Limiter names. Vision and text LLM calls have very different baseline
+# latencies, so each class gets its own limiter and latency baseline.
+GENAI_VISION = "genai_vision"
+GENAI_TEXT = "genai_text"
+OBJECT_STORAGE = "object_storage"
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def is_throttle(error: BaseException) -> bool:
+    """True for OCI ``ServiceError`` responses that signal overload."""
+    return getattr(error, "status", None) in THROTTLE_STATUSES
+
+
+class AdaptiveLimiter:
+    """Additive-increase / multiplicative-decrease limit on in-flight calls.
+
+    Every healthy completion grows the limit by ``additive_increase / limit``,
+    i.e. roughly one slot per full window of successful calls. A throttling
+    response (429/503) or a latency sample above ``latency_tolerance`` times
+    the smoothed baseline cuts the limit by ``backoff_ratio``. Cuts are spaced
+    by ``decrease_cooldown_seconds`` so one burst of rejections only counts once.
+    """
+
+    def __init__(self, name: str, config: ConcurrencyConfig, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.config = config
+        self._clock = clock
+        self._limit = float(config.initial_limit)
+        self._in_flight = 0
+        self._baseline: Optional[float] = None
+        self._samples = 0
+        self._throttles = 0
+        self._errors = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+
+    def reconfigure(self, config: ConcurrencyConfig) -> None:
+        """Swap in ``config``, moving the current limit inside its bounds straight away."""
+        with self._cond:
+            self.config = config
+            self._limit = min(float(config.max_limit), max(float(config.min_limit), self._limit))
+            self._cond.notify_all()
+
+    @property
+    def limit(self) -> int:
+        with self._cond:
+            return int(self._limit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "name": self.name,
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "baseline_latency_seconds": round(self._baseline, 4) if self._baseline is not None else None,
+                "throttles": self._throttles,
+                "errors": self._errors,
+            }
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._in_flight < int(self._limit), timeout=timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        with self._cond:
+            self._samples += 1
+            baseline = self._baseline
+            if (
+                baseline is not None
+                and self._samples > self.config.warmup_samples
+                and latency > baseline * self.config.latency_tolerance
+            ):
+                self._decrease()
+            else:
+                self._limit = min(
+                    float(self.config.max_limit),
+                    self._limit + self.config.additive_increase / max(self._limit, 1.0),
+                )
+            alpha = self.config.baseline_smoothing
+            self._baseline = latency if baseline is None else (1 - alpha) * baseline + alpha * latency
+            self._cond.notify_all()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            self._throttles += 1
+            self._decrease()
+
+    def on_error(self) -> None:
+        with self._cond:
+            self._errors += 1
+
+    def _decrease(self) -> None:
+        now = self._clock()
+        if now - self._last_decrease < self.config.decrease_cooldown_seconds:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.config.min_limit), self._limit * self.config.backoff_ratio)
+
+    def call(self, fn: Callable[[], T], deadline: Optional[Deadline] = None) -> T:
+        """Run ``fn`` inside a concurrency slot and feed the outcome back.
+
+        With a ``deadline`` the wait for a slot is bounded by the remaining
+        invocation budget and ``DeadlineExceeded`` is raised when it runs out.
+        """
+        if not self.config.enabled:
+            return fn()
+        if not self.acquire(deadline.remaining() if deadline is not None else None):
+            raise DeadlineExceeded(f"Invocation deadline exceeded waiting for a '{self.name}' slot")
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as err:
+            if is_throttle(err):
+                self.on_throttle()
+            else:
+                self.on_error()
+            raise
+        else:
+            self.on_success(time.perf_counter() - started)
+            return result
+        finally:
+            self.release()
+
+    async def call_async(self, fn: Callable[[], T], deadline: Optional[Deadline] = None) -> T:
+        """Async variant; the blocking SDK call and the slot wait run off the event loop."""
+        return await asyncio.to_thread(self.call, fn, deadline)
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(name: str, config: ConcurrencyConfig) -> AdaptiveLimiter:
+    """Process-wide limiter per downstream service, shared by all tools and threads."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveLimiter(name, config)
+            _limiters[name] = limiter
+        else:
+            limiter.reconfigure(config)
+        return limiter
+
+
+def concurrency_metrics() -> List[Dict[str, Any]]:
+    """Current limit and in-flight count for every registered limiter."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.snapshot() for limiter in limiters]
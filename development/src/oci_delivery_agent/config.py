@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -22,6 +22,10 @@ class VisionConfig:
     image_caption_model_endpoint: str
     damage_detection_model_endpoint: Optional[str] = None
     confidence_threshold: float = 0.5
+    # Stream GenAI replies and stop reading once the JSON object closes
+    stream_responses: bool = False
+    # Ask for the compact wire schema (short keys, enum codes) and expand it locally
+    compact_output: bool = False
 
 
 @dataclass
@@ -30,6 +34,11 @@ class GeolocationConfig:
 
     max_distance_meters: float = 50.0
     geocoding_api_endpoint: Optional[str] = None
+    # CSV of address points (address, latitude, longitude[, stop_id]) resolved locally
+    address_points_path: Optional[str] = None
+    geocoding_timeout_seconds: float = 2.0
+    geocoding_cache_entries: int = 4096
+    geocoding_cache_ttl_seconds: float = 24 * 3600.0
 
 
 @dataclass
@@ -108,6 +117,228 @@ class QualityIndexWeights:
         }
 
 
+@dataclass
+class TimeBudgetConfig:
+    """Per-invocation time budget shared by the workflow stages."""
+
+    invocation_timeout_seconds: float = 300.0
+    safety_margin_seconds: float = 10.0
+    connect_timeout_seconds: float = 10.0
+    read_timeout_seconds: float = 240.0
+    caption_summary_min_seconds: float = 20.0
+    review_min_seconds: float = 20.0
+
+
+@dataclass
+class FastPathConfig:
+    """Rules that settle clear-cut deliveries without the caption-summary and review LLM calls."""
+
+    enabled: bool = False
+    # Every metric (location, timeliness, package quality) at or above this, with no visible damage: OK
+    clear_pass_min: float = 0.9
+    # Quality index at or below this: Review ("Severe" band of docs/api-response-format.md)
+    clear_review_max: float = 0.3
+    # No package in the photo: Review
+    no_package_review: bool = True
+
+    def __post_init__(self):
+        if not 0.0 <= self.clear_review_max < self.clear_pass_min <= 1.0:
+            raise ValueError("Fast paths must satisfy 0 <= clear_review_max < clear_pass_min <= 1.")
+
+
+@dataclass
+class DamageShortCircuitConfig:
+    """Skip the damage vision call when the caption saw no package."""
+
+    enabled: bool = False
+    # Fraction of skippable deliveries still sent to the model to measure disagreement
+    sample_rate: float = 0.05
+
+    def __post_init__(self):
+        if not 0.0 <= self.sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1.")
+
+
+@dataclass
+class UsabilityConfig:
+    """Local photo checks that send unusable photos to review before any GenAI call."""
+
+    enabled: bool = False
+    # Long side of the grayscale preview the checks (and the burst hash) run on
+    preview_side: int = 256
+    min_short_side: int = 320
+    # Variance of the Laplacian on the preview; sharp delivery photos score in the hundreds
+    min_sharpness: float = 40.0
+    min_mean_luminance: float = 35.0
+    max_mean_luminance: float = 230.0
+    # Share of pixels crushed to black or blown to white
+    max_clipped_fraction: float = 0.5
+    min_contrast: float = 10.0
+
+
+@dataclass
+class HedgingConfig:
+    """Duplicate slow GenAI vision requests to cut tail latency."""
+
+    enabled: bool = False
+    percentile: float = 95.0
+    min_samples: int = 20
+    window: int = 200
+    max_hedge_ratio: float = 0.1
+    min_delay_seconds: float = 0.05
+    max_workers: int = 8
+
+    def __post_init__(self):
+        if not 0.0 < self.percentile < 100.0:
+            raise ValueError("Hedging percentile must be between 0 and 100.")
+        if not 0.0 <= self.max_hedge_ratio <= 1.0:
+            raise ValueError("max_hedge_ratio must be between 0.0 and 1.0.")
+
+
+@dataclass
+class ConcurrencyConfig:
+    """AIMD limits on in-flight GenAI and Object Storage calls."""
+
+    enabled: bool = False
+    initial_limit: int = 4
+    min_limit: int = 1
+    max_limit: int = 32
+    additive_increase: float = 1.0
+    backoff_ratio: float = 0.5
+    latency_tolerance: float = 2.0
+    baseline_smoothing: float = 0.05
+    warmup_samples: int = 10
+    decrease_cooldown_seconds: float = 1.0
+
+    def __post_init__(self):
+        if not 1 <= self.min_limit <= self.initial_limit <= self.max_limit:
+            raise ValueError("Concurrency limits must satisfy 1 <= min_limit <= initial_limit <= max_limit.")
+        if not 0.0 < self.backoff_ratio < 1.0:
+            raise ValueError("backoff_ratio must be between 0.0 and 1.0.")
+
+
+@dataclass(frozen=True)
+class GenAIEndpoint:
+    """A dedicated GenAI endpoint: service hostname plus endpoint OCID."""
+
+    hostname: str
+    model_ocid: str
+
+
+@dataclass
+class EndpointPoolConfig:
+    """Balancing and health ejection across several GenAI endpoints."""
+
+    endpoints: List[GenAIEndpoint] = field(default_factory=list)
+    strategy: str = "least_outstanding"
+    failure_threshold: int = 3
+    ejection_seconds: float = 30.0
+    latency_smoothing: float = 0.2
+
+    def __post_init__(self):
+        if self.strategy not in ("least_outstanding", "latency_weighted"):
+            raise ValueError("Endpoint strategy must be 'least_outstanding' or 'latency_weighted'.")
+
+
+@dataclass
+class CascadeConfig:
+    """Send vision calls to a fast model first and escalate uncertain answers to the large pool."""
+
+    enabled: bool = False
+    fast_endpoints: List[GenAIEndpoint] = field(default_factory=list)
+    # Relative cost of one call to each tier, for blended cost per delivery
+    fast_call_cost: float = 0.25
+    large_call_cost: float = 1.0
+
+    def __post_init__(self):
+        if self.fast_call_cost < 0 or self.large_call_cost < 0:
+            raise ValueError("Cascade call costs must be non-negative.")
+
+
+@dataclass
+class SpoolConfig:
+    """Durable local spool for incoming delivery events."""
+
+    enabled: bool = False
+    path: str = "/tmp/delivery-spool.sqlite3"
+    workers: int = 4
+    visibility_timeout_seconds: float = 360.0
+    max_attempts: int = 5
+    retry_backoff_seconds: float = 5.0
+    max_retry_backoff_seconds: float = 300.0
+
+
+@dataclass
+class CacheConfig:
+    """Bounded result cache: in-memory LRU in front of an optional SQLite file."""
+
+    enabled: bool = False
+    path: Optional[str] = None
+    max_entries: int = 512
+    memory_max_bytes: int = 16 * 1024 * 1024
+    disk_max_bytes: int = 256 * 1024 * 1024
+    ttl_seconds: Optional[float] = 7 * 24 * 3600.0
+
+    def __post_init__(self):
+        if self.max_entries < 1 or self.memory_max_bytes < 1 or self.disk_max_bytes < 1:
+            raise ValueError("Cache size bounds must be positive.")
+
+
+@dataclass
+class DedupConfig:
+    """Reuse analysis for near-identical burst photos of the same delivery."""
+
+    enabled: bool = False
+    hash_size: int = 8
+    max_distance: int = 10
+    window_seconds: float = 120.0
+    max_photos_per_group: int = 10
+    max_groups: int = 1024
+
+
+@dataclass
+class DriverRollupConfig:
+    """Incremental per-driver, per-day rollups behind the driver_performance table."""
+
+    enabled: bool = False
+    path: str = "/tmp/driver-performance.sqlite3"
+    flush_interval_seconds: float = 60.0
+    max_pending_rows: int = 1000
+    trend_fast_alpha: float = 0.3
+    trend_slow_alpha: float = 0.05
+    trend_threshold: float = 0.02
+    trend_min_samples: int = 5
+
+    def __post_init__(self):
+        if not 0.0 < self.trend_slow_alpha < self.trend_fast_alpha <= 1.0:
+            raise ValueError("Trend smoothing must satisfy 0 < trend_slow_alpha < trend_fast_alpha <= 1.")
+        if self.max_pending_rows < 1:
+            raise ValueError("max_pending_rows must be positive.")
+
+
+@dataclass
+class SketchConfig:
+    """Hourly quantile sketches per driver, route and region."""
+
+    enabled: bool = False
+    path: str = "/tmp/quality-sketches.sqlite3"
+    metrics: Tuple[str, ...] = ("quality_index", "location_accuracy")
+    flush_interval_seconds: float = 60.0
+    max_pending_sketches: int = 2000
+
+
+@dataclass
+class ResultStoreConfig:
+    """Buffered, partitioned Parquet files for delivery results."""
+
+    enabled: bool = False
+    path: str = "/tmp/quality-results"
+    max_buffered_rows: int = 10000
+    flush_interval_seconds: float = 300.0
+    compression: str = "zstd"
+    row_group_rows: int = 128 * 1024
+
+
 @dataclass
 class WorkflowConfig:
     """Top level settings required by the agent workflow."""
@@ -117,6 +348,28 @@ class WorkflowConfig:
     geolocation: GeolocationConfig = field(default_factory=GeolocationConfig)
     quality_weights: QualityIndexWeights = field(default_factory=QualityIndexWeights)
     damage_scoring: DamageScoringConfig = field(default_factory=DamageScoringConfig)
+    time_budget: TimeBudgetConfig = field(default_factory=TimeBudgetConfig)
+    fast_paths: FastPathConfig = field(default_factory=FastPathConfig)
+    damage_short_circuit: DamageShortCircuitConfig = field(default_factory=DamageShortCircuitConfig)
+    usability: UsabilityConfig = field(default_factory=UsabilityConfig)
+    hedging: HedgingConfig = field(default_factory=HedgingConfig)
+    concurrency: ConcurrencyConfig = field(default_factory=ConcurrencyConfig)
+    endpoint_pool: EndpointPoolConfig = field(default_factory=EndpointPoolConfig)
+    cascade: CascadeConfig = field(default_factory=CascadeConfig)
+    spool: SpoolConfig = field(default_factory=SpoolConfig)
+    vision_cache: CacheConfig = field(default_factory=CacheConfig)
+    llm_cache: CacheConfig = field(default_factory=CacheConfig)
+    dedup: DedupConfig = field(default_factory=DedupConfig)
+    object_cache: CacheConfig = field(
+        default_factory=lambda: CacheConfig(path="/tmp/object-cache.sqlite3", ttl_seconds=300.0)
+    )
+    # Short-lived memory of object names that returned 404, so replayed events fail fast
+    missing_object_cache: CacheConfig = field(
+        default_factory=lambda: CacheConfig(enabled=True, max_entries=4096, memory_max_bytes=1024 * 1024, ttl_seconds=30.0)
+    )
+    driver_rollup: DriverRollupConfig = field(default_factory=DriverRollupConfig)
+    quality_sketches: SketchConfig = field(default_factory=SketchConfig)
+    result_store: ResultStoreConfig = field(default_factory=ResultStoreConfig)
     notification_topic_id: Optional[str] = None
     database_table: str = "delivery_quality_events"
     local_asset_root: Optional[str] = None
@@ -0,0 +1,100 @@
+"""Invocation deadline tracking for the delivery workflow."""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional, Tuple
+
+from .config import TimeBudgetConfig
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a stage cannot start because the invocation budget is spent."""
+
+
+class Deadline:
+    """Monotonic countdown shared by every stage of a single invocation."""
+
+    def __init__(self, budget_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._expires_at = clock() + max(0.0, budget_seconds)
+
+    @classmethod
+    def from_invocation(cls, ctx: Any, budget: TimeBudgetConfig) -> "Deadline":
+        """Build a deadline from the Fn invoke context, falling back to the configured timeout.
+
+        The Fn FDK exposes the platform deadline as an ISO timestamp via
+        ``ctx.Deadline()``. A safety margin is reserved so results can still be
+        persisted and returned before the platform kills the container.
+        """
+        budget_seconds = budget.invocation_timeout_seconds
+        deadline_getter = getattr(ctx, "Deadline", None)
+        if callable(deadline_getter):
+            try:
+                platform_deadline = datetime.fromisoformat(str(deadline_getter()))
+                if platform_deadline.tzinfo is None:
+                    platform_deadline = platform_deadline.replace(tzinfo=timezone.utc)
+                remaining = (platform_deadline - datetime.now(timezone.utc)).total_seconds()
+                budget_seconds = min(budget_seconds, remaining)
+            except (TypeError, ValueError):
+                pass
+        return cls(budget_seconds - budget.safety_margin_seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - self._clock())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def can_afford(self, seconds: float) -> bool:
+        """Return True when at least ``seconds`` of budget are left."""
+        return self.remaining() >= seconds
+
+    def check(self, stage: str) -> None:
+        if self.expired():
+            raise DeadlineExceeded(f"Invocation deadline exceeded before stage '{stage}'")
+
+    def request_timeout(self, connect: float = 10.0, read: float = 240.0) -> Tuple[float, float]:
+        """Return a ``(connect, read)`` timeout tuple clipped to the remaining budget."""
+        remaining = self.remaining()
+        if remaining <= 0.0:
+            raise DeadlineExceeded("Invocation deadline exceeded before request")
+        return (min(connect, remaining), min(read, remaining))
+
+
+class ThreadLocalClients:
+    """One OCI SDK client per thread and key (e.g. service hostname).
+
+    OCI service clients take their timeout from ``base_client.timeout`` rather
+    than per operation, so a deadline-derived timeout set on a client that
+    another thread (a hedged duplicate, a spool worker) is using would change
+    that thread's call too. Each thread builds, and times, its own client.
+    """
+
+    def __init__(self, factory: Callable[[str], Any]):
+        self._factory = factory
+        self._local = threading.local()
+
+    def get(self, key: str = "") -> Any:
+        clients = self._local.__dict__.setdefault("clients", {})
+        if key not in clients:
+            clients[key] = self._factory(key)
+        return clients[key]
+
+
+def apply_request_timeout(client: Any, deadline: Optional[Deadline], budget: Optional[TimeBudgetConfig] = None) -> None:
+    """Set the per-call timeout on an OCI SDK client from the remaining budget.
+
+    OCI service clients do not accept a per-operation timeout, so the timeout
+    stored on the underlying ``base_client`` is updated before each call. Only
+    apply it to a client the calling thread owns (see ``ThreadLocalClients``).
+    """
+    base_client = getattr(client, "base_client", None)
+    if deadline is None or base_client is None:
+        return
+    budget = budget or TimeBudgetConfig()
+    base_client.timeout = deadline.request_timeout(
+        connect=budget.connect_timeout_seconds,
+        read=budget.read_timeout_seconds,
+    )
@@ -0,0 +1,170 @@
+"""Perceptual-hash near-duplicate detection for burst delivery photos."""
+from __future__ import annotations
+
+import io
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from PIL import Image
+
+from .config import DedupConfig
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a tiny grayscale thumbnail."""
+    width = hash_size + 1
+    pixels = image.convert("L").resize((width, hash_size), Image.Resampling.LANCZOS).tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def perceptual_hash(image_bytes: bytes, hash_size: int = 8) -> Optional[int]:
+    """dHash of encoded image bytes, or None when the bytes cannot be decoded."""
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        # JPEG can decode straight to a reduced scale, which is all the hash needs
+        image.draft("L", (hash_size * 8, hash_size * 8))
+        return dhash(image, hash_size)
+    except Exception as err:
+        print(f"Warning: could not hash image for dedup: {err}")
+        return None
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def burst_group(
+    object_name: str,
+    latitude: float,
+    longitude: float,
+    driver_id: Optional[str],
+    route_id: Optional[str],
+    stop_id: Optional[str],
+    promised_time: str,
+) -> Optional[str]:
+    """Photos of one delivery share an object prefix, the drop-off point (~11 m) and the delivery identity.
+
+    The location alone cannot tell two packages left at one doorstep or building
+    apart, so the key also carries driver, route, stop and promised time. Events
+    with none of driver, route or stop get no group and are never matched.
+    """
+    if not (driver_id or route_id or stop_id):
+        return None
+    identity = "|".join((driver_id or "", route_id or "", stop_id or "", promised_time))
+    return f"{PurePosixPath(object_name).parent}@{latitude:.4f},{longitude:.4f}#{identity}"
+
+
+@dataclass
+class BurstMatch:
+    """An already-analysed photo close enough to reuse."""
+
+    object_name: str
+    distance: int
+    caption_json: str
+    damage_report: Dict[str, Any]
+
+
+@dataclass
+class _Analysed:
+    object_name: str
+    phash: int
+    taken_at: float
+    caption_json: str
+    damage_report: Dict[str, Any]
+
+
+class BurstIndex:
+    """Recent analysed photos per delivery group, matched by Hamming distance within a time window."""
+
+    def __init__(self, config: DedupConfig):
+        self.config = config
+        self._groups: "OrderedDict[str, Deque[_Analysed]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "reused": 0}
+
+    def find(self, group: str, phash: int, taken_at: float) -> Optional[BurstMatch]:
+        with self._lock:
+            self.stats["lookups"] += 1
+            entries = self._groups.get(group)
+            if not entries:
+                return None
+            best: Optional[Tuple[int, _Analysed]] = None
+            for entry in entries:
+                if abs(taken_at - entry.taken_at) > self.config.window_seconds:
+                    continue
+                distance = hamming(phash, entry.phash)
+                if distance <= self.config.max_distance and (best is None or distance < best[0]):
+                    best = (distance, entry)
+            if best is None:
+                return None
+            self.stats["reused"] += 1
+            distance, entry = best
+            return BurstMatch(entry.object_name, distance, entry.caption_json, dict(entry.damage_report))
+
+    def add(
+        self,
+        group: str,
+        object_name: str,
+        phash: int,
+        taken_at: float,
+        caption_json: str,
+        damage_report: Dict[str, Any],
+    ) -> None:
+        with self._lock:
+            entries = self._groups.get(group)
+            if entries is None:
+                entries = deque(maxlen=self.config.max_photos_per_group)
+                self._groups[group] = entries
+            self._groups.move_to_end(group)
+            entries.append(_Analysed(object_name, phash, taken_at, caption_json, dict(damage_report)))
+            while len(self._groups) > self.config.max_groups:
+                self._groups.popitem(last=False)
+
+
+def precision_recall(pairs: Iterable[Tuple[int, int, bool]], max_distance: int) -> Dict[str, Any]:
+    """Score the dedup decision on labelled ``(hash_a, hash_b, is_duplicate)`` pairs."""
+    tp = fp = fn = tn = 0
+    for hash_a, hash_b, is_duplicate in pairs:
+        predicted = hamming(hash_a, hash_b) <= max_distance
+        if predicted and is_duplicate:
+            tp += 1
+        elif predicted:
+            fp += 1
+        elif is_duplicate:
+            fn += 1
+        else:
+            tn += 1
+    return {
+        "max_distance": max_distance,
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "recall": tp / (tp + fn) if tp + fn else 1.0,
+        "true_positives": tp,
+        "false_positives": fp,
+        "false_negatives": fn,
+        "true_negatives": tn,
+    }
+
+
+_index: Optional[BurstIndex] = None
+_index_lock = threading.Lock()
+
+
+def shared_burst_index(config: DedupConfig) -> Optional[BurstIndex]:
+    """Process-wide burst index, or None when dedup is disabled."""
+    global _index
+    if not config.enabled:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = BurstIndex(config)
+        else:
+            _index.config = config
+        return _index
@@ -0,0 +1,234 @@
+"""Deterministic decisions for clear-cut deliveries.
+
+The caption-summary and review chains are two text LLM calls per delivery.
+When the outcome is already settled by the structured vision output and the
+quality metrics (every metric excellent with no visible damage, no package
+in the photo, or a quality index in the severe band), ``decide`` returns the
+assessment and a caption summary templated from ``caption_json`` so the
+pipeline can skip both calls. Every decision is counted per path, and LLM
+path timings give an estimate of the latency the rules save.
+
+The damage vision call is short-circuited the same way when the caption saw
+no package: its answer is fixed by the damage prompt's own rules. A sampled
+fraction of those deliveries still goes to the model to measure disagreement.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from .config import DamageShortCircuitConfig, FastPathConfig
+
+LLM_PATH = "llm"
+CLEAR_PASS = "clear_pass"
+NO_PACKAGE = "no_package"
+CLEAR_REVIEW = "clear_review"
+# Photos rejected by the usability gate before any GenAI call
+UNUSABLE_PHOTO = "unusable_photo"
+
+# Damage stage outcomes
+SHORT_CIRCUIT = "short_circuit"
+SAMPLED = "sampled"
+MODEL = "model"
+
+_METRICS = ("location_accuracy", "timeliness", "package_quality")
+_INDICATORS = ("boxDeformation", "cornerDamage", "leakage", "packagingIntegrity")
+
+
+@dataclass
+class Decision:
+    """Outcome of a rule that fired."""
+
+    rule: str
+    assessment: Dict[str, Any]
+    caption_summary: str
+
+
+def templated_caption_summary(caption: Mapping[str, Any]) -> str:
+    """Two-sentence scene summary built from the structured caption."""
+    location = caption.get("location") or {}
+    environment = caption.get("environment") or {}
+    safety = caption.get("safetyAssessment") or {}
+    where = location.get("type") or "unknown location"
+    if caption.get("packageVisible"):
+        description = caption.get("packageDescription") or "package"
+        first = f"Package ({description}) delivered at the {where}."
+    else:
+        first = f"No package visible; scene at the {where}."
+    concerns = []
+    if safety.get("protected") is False:
+        concerns.append("not sheltered")
+    if safety.get("visible") is True:
+        concerns.append("visible from the street")
+    if safety.get("secure") is False:
+        concerns.append("not secure")
+    conditions = ", ".join(
+        value for value in (environment.get("weather"), environment.get("timeOfDay")) if value and value != "unknown"
+    )
+    second = f"Safety: {', '.join(concerns) if concerns else 'no concerns'}"
+    if conditions:
+        second += f"; conditions: {conditions}"
+    return f"{first} {second}."
+
+
+def _severity(damage_report: Mapping[str, Any]) -> Optional[str]:
+    overall = damage_report.get("overall")
+    if isinstance(overall, dict):
+        return overall.get("severity")
+    return None
+
+
+def decide(
+    caption: Mapping[str, Any],
+    damage_report: Mapping[str, Any],
+    quality_metrics: Mapping[str, float],
+    config: FastPathConfig,
+) -> Optional[Decision]:
+    """The rule that settles this delivery, or None when it needs the LLM."""
+    if not config.enabled:
+        return None
+    # Failed or unstructured vision output is never clear-cut
+    if "error" in caption or "unstructured" in caption or "error" in damage_report:
+        return None
+
+    summary = templated_caption_summary(caption)
+    metrics = ", ".join(f"{name}={quality_metrics[name]}" for name in (*_METRICS, "quality_index"))
+    package_visible = caption.get("packageVisible")
+    severity = _severity(damage_report)
+
+    if config.no_package_review and package_visible is False and damage_report.get("packageVisible") is not True:
+        return Decision(
+            rule=NO_PACKAGE,
+            assessment={
+                "status": "Review",
+                "issues": ["No package visible in the delivery photo"],
+                "insights": f"{summary} Decided by rule '{NO_PACKAGE}' ({metrics}).",
+            },
+            caption_summary=summary,
+        )
+
+    if (
+        package_visible is True
+        and severity == "none"
+        and all(quality_metrics[name] >= config.clear_pass_min for name in _METRICS)
+    ):
+        return Decision(
+            rule=CLEAR_PASS,
+            assessment={
+                "status": "OK",
+                "issues": [],
+                "insights": f"{summary} Decided by rule '{CLEAR_PASS}' ({metrics}).",
+            },
+            caption_summary=summary,
+        )
+
+    if quality_metrics["quality_index"] <= config.clear_review_max:
+        issues: List[str] = [
+            f"Low {name.replace('_', ' ')}: {quality_metrics[name]}"
+            for name in _METRICS
+            if quality_metrics[name] < 0.5
+        ]
+        if severity not in (None, "none"):
+            issues.append(f"Damage severity: {severity}")
+        return Decision(
+            rule=CLEAR_REVIEW,
+            assessment={
+                "status": "Review",
+                "issues": issues or [f"Quality index {quality_metrics['quality_index']} in the severe band"],
+                "insights": f"{summary} Decided by rule '{CLEAR_REVIEW}' ({metrics}).",
+            },
+            caption_summary=summary,
+        )
+    return None
+
+
+def damage_stage(caption: Mapping[str, Any], object_name: str, config: DamageShortCircuitConfig) -> str:
+    """``short_circuit`` to skip the damage call, ``sampled`` to check a skippable case, else ``model``.
+
+    Sampling hashes the object name, so a replayed event takes the same branch.
+    """
+    if not config.enabled or "error" in caption or caption.get("packageVisible") is not False:
+        return MODEL
+    digest = int(hashlib.sha256(object_name.encode("utf-8")).hexdigest()[:8], 16)
+    return SAMPLED if digest < config.sample_rate * 0x100000000 else SHORT_CIRCUIT
+
+
+def no_package_damage_report() -> Dict[str, Any]:
+    """The report the damage prompt prescribes when no delivery item is visible."""
+    return {
+        "overall": {"severity": "none", "score": 0.0, "rationale": "No package visible in the caption analysis"},
+        "indicators": {name: {"present": False, "severity": "none", "evidence": "none"} for name in _INDICATORS},
+        "packageVisible": False,
+        "uncertainties": "",
+        "source": SHORT_CIRCUIT,
+    }
+
+
+def agrees_with_short_circuit(damage_report: Mapping[str, Any]) -> Optional[bool]:
+    """Whether a sampled model report matches the synthesised one; None when the call failed."""
+    if "error" in damage_report:
+        return None
+    return damage_report.get("packageVisible") is not True and _severity(damage_report) in (None, "none")
+
+
+class FastPathStats:
+    """Decisions per path, LLM-path text-stage timings and damage short-circuit counts."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._llm_seconds = 0.0
+        self._llm_timed = 0
+        self._damage: Dict[str, int] = {"short_circuited": 0, "sampled": 0, "disagreements": 0}
+
+    def record(self, path: str, llm_seconds: Optional[float] = None) -> None:
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            if llm_seconds is not None:
+                self._llm_seconds += llm_seconds
+                self._llm_timed += 1
+
+    def record_damage(self, stage: str, agrees: Optional[bool] = None) -> None:
+        with self._lock:
+            if stage == SHORT_CIRCUIT:
+                self._damage["short_circuited"] += 1
+            elif stage == SAMPLED:
+                self._damage["sampled"] += 1
+                if agrees is False:
+                    self._damage["disagreements"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            mean = self._llm_seconds / self._llm_timed if self._llm_timed else None
+            damage = dict(self._damage)
+        damage["disagreement_rate"] = round(damage["disagreements"] / damage["sampled"], 4) if damage["sampled"] else None
+        total = sum(counts.values())
+        fired = total - counts.get(LLM_PATH, 0)
+        return {
+            "decisions": counts,
+            "rule_rate": round(fired / total, 4) if total else None,
+            "llm_stage_seconds_mean": round(mean, 4) if mean is not None else None,
+            "estimated_seconds_saved": round(fired * mean, 3) if mean is not None else None,
+            "damage_short_circuit": damage,
+        }
+
+
+_stats = FastPathStats()
+
+
+def record_decision(path: str, llm_seconds: Optional[float] = None) -> None:
+    """Count one delivery on ``path``; LLM-path deliveries also report their text-stage seconds."""
+    _stats.record(path, llm_seconds)
+
+
+def record_damage_stage(stage: str, agrees: Optional[bool] = None) -> None:
+    """Count a skipped damage call, or a sampled one and whether the model agreed."""
+    _stats.record_damage(stage, agrees)
+
+
+def fast_path_metrics() -> Dict[str, Any]:
+    """Process-wide fast-path counters."""
+    return _stats.snapshot()
@@ -0,0 +1,256 @@
+"""Offline address / delivery-stop geocoding with a cached remote fallback."""
+from __future__ import annotations
+
+import csv
+import json
+import string
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .cache import MemoryLRUCache
+from .config import GeolocationConfig
+
+try:
+    import requests
+except ImportError:  # pragma: no cover - requests ships with the function image
+    requests = None
+
+_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "drive": "dr",
+    "boulevard": "blvd",
+    "lane": "ln",
+    "court": "ct",
+    "place": "pl",
+    "terrace": "ter",
+    "highway": "hwy",
+    "parkway": "pkwy",
+    "apartment": "apt",
+    "suite": "ste",
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+}
+_PUNCTUATION = str.maketrans({char: " " for char in string.punctuation})
+
+
+def normalize_address(address: str) -> str:
+    """Lower-case, strip punctuation and abbreviate common street words."""
+    words = address.lower().translate(_PUNCTUATION).split()
+    return " ".join([_ABBREVIATIONS.get(word, word) for word in words])
+
+
+class _HashIndex:
+    """Sorted 64-bit key hashes with parallel fingerprint and coordinate arrays.
+
+    About 28 bytes per point, so a few million points fit comfortably in a
+    function's memory where a dict of strings would not. Keys are hashed with
+    the process's ``hash``; the index is rebuilt per process, never persisted.
+    A match must also agree on an independent 32-bit CRC of the key, so an
+    address missing from the file only borrows another point's coordinates if
+    both hashes collide (about n / 2**96 per lookup for n points).
+    """
+
+    def __init__(self):
+        self._hashes = array("q")
+        self._fingerprints = array("I")
+        self._latitudes = array("d")
+        self._longitudes = array("d")
+
+    @staticmethod
+    def _digest(key: str) -> int:
+        return hash(key)
+
+    @staticmethod
+    def _fingerprint(key: str) -> int:
+        return zlib.crc32(key.encode("utf-8"))
+
+    def add(self, key: str, latitude: float, longitude: float) -> None:
+        self._hashes.append(self._digest(key))
+        self._fingerprints.append(self._fingerprint(key))
+        self._latitudes.append(latitude)
+        self._longitudes.append(longitude)
+
+    def freeze(self) -> "_HashIndex":
+        """Sort by hash once all points are added; lookups are a binary search."""
+        order = sorted(range(len(self._hashes)), key=self._hashes.__getitem__)
+        self._hashes = array("q", (self._hashes[i] for i in order))
+        self._fingerprints = array("I", (self._fingerprints[i] for i in order))
+        self._latitudes = array("d", (self._latitudes[i] for i in order))
+        self._longitudes = array("d", (self._longitudes[i] for i in order))
+        return self
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        digest = self._digest(key)
+        fingerprint = self._fingerprint(key)
+        position = bisect_left(self._hashes, digest)
+        # Keys whose hashes collide sit next to each other; the fingerprint tells them apart
+        while position < len(self._hashes) and self._hashes[position] == digest:
+            if self._fingerprints[position] == fingerprint:
+                return self._latitudes[position], self._longitudes[position]
+            position += 1
+        return None
+
+
+class AddressIndex:
+    """In-memory index over an address-point file.
+
+    The file is CSV with a header containing ``address``, ``latitude`` and
+    ``longitude`` and optionally ``stop_id``.
+    """
+
+    def __init__(self, addresses: _HashIndex, stops: _HashIndex):
+        self._addresses = addresses
+        self._stops = stops
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Optional[str], float, float, Optional[str]]]) -> "AddressIndex":
+        """Build from ``(address, latitude, longitude, stop_id)`` tuples."""
+        addresses, stops = _HashIndex(), _HashIndex()
+        for address, latitude, longitude, stop_id in rows:
+            if address:
+                addresses.add(normalize_address(address), latitude, longitude)
+            if stop_id:
+                stops.add(stop_id.strip(), latitude, longitude)
+        return cls(addresses.freeze(), stops.freeze())
+
+    @classmethod
+    def from_csv(cls, path: str) -> "AddressIndex":
+        with open(path, newline="", encoding="utf-8") as handle:
+            reader = csv.reader(handle)
+            header = [column.strip().lower() for column in next(reader)]
+            address_col = header.index("address")
+            lat_col = header.index("latitude")
+            lon_col = header.index("longitude")
+            stop_col = header.index("stop_id") if "stop_id" in header else None
+            return cls.from_rows(
+                (
+                    row[address_col],
+                    float(row[lat_col]),
+                    float(row[lon_col]),
+                    row[stop_col] if stop_col is not None else None,
+                )
+                for row in reader
+                if row
+            )
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+    def lookup_address(self, address: str) -> Optional[Tuple[float, float]]:
+        return self._addresses.get(normalize_address(address))
+
+    def lookup_stop(self, stop_id: str) -> Optional[Tuple[float, float]]:
+        return self._stops.get(str(stop_id).strip())
+
+
+def _parse_remote(payload: Any) -> Optional[Tuple[float, float]]:
+    """Accept ``{"latitude", "longitude"}``, ``{"lat", "lon"}`` or a list of either (Nominatim style)."""
+    if isinstance(payload, list):
+        payload = payload[0] if payload else None
+    if not isinstance(payload, dict):
+        return None
+    latitude = payload.get("latitude", payload.get("lat"))
+    longitude = payload.get("longitude", payload.get("lon", payload.get("lng")))
+    if latitude is None or longitude is None:
+        return None
+    return float(latitude), float(longitude)
+
+
+class Geocoder:
+    """Resolve addresses and stop IDs locally, falling back to ``geocoding_api_endpoint``.
+
+    Remote answers, including "not found", are kept in a bounded LRU so a
+    repeated address costs one HTTP call per TTL. Transport errors are not cached.
+    """
+
+    def __init__(
+        self,
+        config: GeolocationConfig,
+        index: Optional[AddressIndex] = None,
+        clock=time.time,
+    ):
+        self._config = config
+        if index is None and config.address_points_path:
+            started = time.perf_counter()
+            index = AddressIndex.from_csv(config.address_points_path)
+            print(f"Loaded {len(index)} address points in {time.perf_counter() - started:.1f}s")
+        self._index = index
+        self._remote_cache = MemoryLRUCache(
+            config.geocoding_cache_entries, 64 * config.geocoding_cache_entries, config.geocoding_cache_ttl_seconds, clock=clock
+        )
+        self._stats_lock = threading.Lock()
+        self.stats = {"local": 0, "remote_cache": 0, "remote": 0, "unresolved": 0}
+
+    def _bump(self, key: str) -> None:
+        # The geocoder is shared by every spool worker thread
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def resolve(self, address: Optional[str] = None, stop_id: Optional[str] = None) -> Optional[Tuple[float, float]]:
+        if self._index is not None:
+            location = None
+            if stop_id:
+                location = self._index.lookup_stop(stop_id)
+            if location is None and address:
+                location = self._index.lookup_address(address)
+            if location is not None:
+                self._bump("local")
+                return location
+        location = self._resolve_remote(address) if address else None
+        if location is None:
+            self._bump("unresolved")
+        return location
+
+    def _resolve_remote(self, address: str) -> Optional[Tuple[float, float]]:
+        endpoint = self._config.geocoding_api_endpoint
+        if not endpoint or requests is None:
+            return None
+        key = normalize_address(address)
+        cached = self._remote_cache.get(key)
+        if cached is not None:
+            self._bump("remote_cache")
+            value = json.loads(cached)
+            return tuple(value) if value else None
+        try:
+            response = requests.get(
+                endpoint,
+                params={"q": address, "format": "json", "limit": 1},
+                timeout=self._config.geocoding_timeout_seconds,
+            )
+            if response.status_code == 404:
+                location = None
+            else:
+                response.raise_for_status()
+                location = _parse_remote(response.json())
+        except Exception as err:
+            print(f"Warning: geocoding request failed: {err}")
+            return None
+        self._bump("remote")
+        self._remote_cache.set(key, json.dumps(list(location) if location else None).encode("utf-8"))
+        return location
+
+
+_geocoders: Dict[Tuple[Any, ...], Geocoder] = {}
+_geocoders_lock = threading.Lock()
+
+
+def shared_geocoder(config: GeolocationConfig) -> Geocoder:
+    """Process-wide geocoder so the address file is loaded once per container."""
+    key = (config.address_points_path, config.geocoding_api_endpoint)
+    with _geocoders_lock:
+        geocoder = _geocoders.get(key)
+        if geocoder is None:
+            geocoder = Geocoder(config)
+            _geocoders[key] = geocoder
+        return geocoder
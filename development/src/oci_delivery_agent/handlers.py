@@ -3,22 +3,63 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 # from langchain.llms import OCIModel  # Commented out due to version compatibility
 
+from .balancer import normalize_hostname, parse_endpoints, resolve_endpoints, shared_balancer
+from .cache import shared_llm_cache
 from .chains import DeliveryContext, run_quality_pipeline
+from .concurrency import GENAI_TEXT, limiter_for
 from .config import (
+    CacheConfig,
+    CascadeConfig,
+    ConcurrencyConfig,
     DamageScoringConfig,
+    DamageShortCircuitConfig,
     DamageTypeWeights,
+    DedupConfig,
+    DriverRollupConfig,
+    EndpointPoolConfig,
+    FastPathConfig,
+    GenAIEndpoint,
     GeolocationConfig,
+    HedgingConfig,
     ObjectStorageConfig,
     QualityIndexWeights,
+    ResultStoreConfig,
     SeverityScores,
+    SketchConfig,
+    SpoolConfig,
+    TimeBudgetConfig,
+    UsabilityConfig,
     VisionConfig,
     WorkflowConfig,
 )
+from .deadline import Deadline, ThreadLocalClients, apply_request_timeout
+from .geocoding import shared_geocoder
+from .result_store import shared_result_store
+from .rollups import shared_driver_rollup
+from .sketches import shared_quality_sketches
+from .spool import DegradedResultError, EventSpool, SpoolWorkerPool, vision_stage_error
+from .usability import gate_available
+
+_usability_warned = False
+
+
+def _usability_gate_enabled() -> bool:
+    """PHOTO_GATE_ENABLED, turned off with a single warning when numpy is missing."""
+    global _usability_warned
+    if os.environ.get("PHOTO_GATE_ENABLED", "false").lower() != "true":
+        return False
+    if gate_available():
+        return True
+    if not _usability_warned:
+        _usability_warned = True
+        print("Warning: PHOTO_GATE_ENABLED is set but numpy is not installed; the photo usability gate stays off")
+    return False
 
 
 def load_config() -> WorkflowConfig:
@@ -32,10 +73,16 @@ def load_config() -> WorkflowConfig:
             compartment_id=os.environ.get("OCI_COMPARTMENT_ID", ""),
             image_caption_model_endpoint=os.environ.get("OCI_CAPTION_ENDPOINT", ""),
             damage_detection_model_endpoint=os.environ.get("OCI_DAMAGE_ENDPOINT"),
+            stream_responses=os.environ.get("GENAI_STREAMING_ENABLED", "false").lower() == "true",
+            compact_output=os.environ.get("GENAI_COMPACT_OUTPUT", "false").lower() == "true",
         ),
         geolocation=GeolocationConfig(
             max_distance_meters=float(os.environ.get("MAX_DISTANCE_METERS", "50")),
             geocoding_api_endpoint=os.environ.get("GEOCODING_ENDPOINT"),
+            address_points_path=os.environ.get("ADDRESS_POINTS_PATH") or None,
+            geocoding_timeout_seconds=float(os.environ.get("GEOCODING_TIMEOUT_SECONDS", "2")),
+            geocoding_cache_entries=int(os.environ.get("GEOCODING_CACHE_ENTRIES", "4096")),
+            geocoding_cache_ttl_seconds=float(os.environ.get("GEOCODING_CACHE_TTL_SECONDS", "86400")),
         ),
         quality_weights=QualityIndexWeights(
             timeliness=float(os.environ.get("WEIGHT_TIMELINESS", "0.3")),
@@ -63,36 +110,150 @@ def load_config() -> WorkflowConfig:
                 severe=float(os.environ.get("SEVERITY_SCORE_SEVERE", "0.9")),
             ),
         ),
+        time_budget=TimeBudgetConfig(
+            invocation_timeout_seconds=float(os.environ.get("FUNCTION_TIMEOUT_SECONDS", "300")),
+            safety_margin_seconds=float(os.environ.get("DEADLINE_SAFETY_MARGIN_SECONDS", "10")),
+            connect_timeout_seconds=float(os.environ.get("GENAI_CONNECT_TIMEOUT_SECONDS", "10")),
+            read_timeout_seconds=float(os.environ.get("GENAI_READ_TIMEOUT_SECONDS", "240")),
+            caption_summary_min_seconds=float(os.environ.get("CAPTION_SUMMARY_MIN_SECONDS", "20")),
+            review_min_seconds=float(os.environ.get("REVIEW_MIN_SECONDS", "20")),
+        ),
+        fast_paths=FastPathConfig(
+            enabled=os.environ.get("FAST_PATHS_ENABLED", "false").lower() == "true",
+            clear_pass_min=float(os.environ.get("FAST_PATH_PASS_MIN", "0.9")),
+            clear_review_max=float(os.environ.get("FAST_PATH_REVIEW_MAX", "0.3")),
+            no_package_review=os.environ.get("FAST_PATH_NO_PACKAGE_REVIEW", "true").lower() == "true",
+        ),
+        damage_short_circuit=DamageShortCircuitConfig(
+            enabled=os.environ.get("DAMAGE_SHORT_CIRCUIT_ENABLED", "false").lower() == "true",
+            sample_rate=float(os.environ.get("DAMAGE_SHORT_CIRCUIT_SAMPLE_RATE", "0.05")),
+        ),
+        usability=UsabilityConfig(
+            enabled=_usability_gate_enabled(),
+            min_short_side=int(os.environ.get("PHOTO_GATE_MIN_SHORT_SIDE", "320")),
+            min_sharpness=float(os.environ.get("PHOTO_GATE_MIN_SHARPNESS", "40")),
+            min_mean_luminance=float(os.environ.get("PHOTO_GATE_MIN_LUMINANCE", "35")),
+            max_mean_luminance=float(os.environ.get("PHOTO_GATE_MAX_LUMINANCE", "230")),
+        ),
+        hedging=HedgingConfig(
+            enabled=os.environ.get("GENAI_HEDGING_ENABLED", "false").lower() == "true",
+            percentile=float(os.environ.get("GENAI_HEDGE_PERCENTILE", "95")),
+            min_samples=int(os.environ.get("GENAI_HEDGE_MIN_SAMPLES", "20")),
+            window=int(os.environ.get("GENAI_HEDGE_WINDOW", "200")),
+            max_hedge_ratio=float(os.environ.get("GENAI_HEDGE_MAX_RATIO", "0.1")),
+        ),
+        concurrency=ConcurrencyConfig(
+            enabled=os.environ.get("ADAPTIVE_CONCURRENCY_ENABLED", "false").lower() == "true",
+            initial_limit=int(os.environ.get("CONCURRENCY_INITIAL_LIMIT", "4")),
+            min_limit=int(os.environ.get("CONCURRENCY_MIN_LIMIT", "1")),
+            max_limit=int(os.environ.get("CONCURRENCY_MAX_LIMIT", "32")),
+            backoff_ratio=float(os.environ.get("CONCURRENCY_BACKOFF_RATIO", "0.5")),
+            latency_tolerance=float(os.environ.get("CONCURRENCY_LATENCY_TOLERANCE", "2.0")),
+        ),
+        endpoint_pool=EndpointPoolConfig(
+            endpoints=parse_endpoints(os.environ.get("OCI_GENAI_ENDPOINTS", "")),
+            strategy=os.environ.get("GENAI_BALANCER_STRATEGY", "least_outstanding"),
+            failure_threshold=int(os.environ.get("GENAI_EJECT_AFTER_FAILURES", "3")),
+            ejection_seconds=float(os.environ.get("GENAI_EJECT_SECONDS", "30")),
+        ),
+        cascade=CascadeConfig(
+            enabled=os.environ.get("GENAI_CASCADE_ENABLED", "false").lower() == "true",
+            fast_endpoints=parse_endpoints(os.environ.get("GENAI_FAST_ENDPOINTS", "")),
+            fast_call_cost=float(os.environ.get("GENAI_FAST_CALL_COST", "0.25")),
+            large_call_cost=float(os.environ.get("GENAI_LARGE_CALL_COST", "1.0")),
+        ),
+        spool=SpoolConfig(
+            enabled=os.environ.get("SPOOL_ENABLED", "false").lower() == "true",
+            path=os.environ.get("SPOOL_PATH", "/tmp/delivery-spool.sqlite3"),
+            workers=int(os.environ.get("SPOOL_WORKERS", "4")),
+            visibility_timeout_seconds=float(os.environ.get("SPOOL_VISIBILITY_TIMEOUT_SECONDS", "360")),
+            max_attempts=int(os.environ.get("SPOOL_MAX_ATTEMPTS", "5")),
+        ),
+        vision_cache=CacheConfig(
+            enabled=os.environ.get("VISION_CACHE_ENABLED", "false").lower() == "true",
+            path=os.environ.get("VISION_CACHE_PATH") or None,
+            max_entries=int(os.environ.get("VISION_CACHE_MAX_ENTRIES", "512")),
+            disk_max_bytes=int(os.environ.get("VISION_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            ttl_seconds=float(os.environ.get("VISION_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        ),
+        llm_cache=CacheConfig(
+            enabled=os.environ.get("LLM_CACHE_ENABLED", "false").lower() == "true",
+            path=os.environ.get("LLM_CACHE_PATH") or None,
+            max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "1024")),
+            disk_max_bytes=int(os.environ.get("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl_seconds=float(os.environ.get("LLM_CACHE_TTL_SECONDS", str(24 * 3600))),
+        ),
+        dedup=DedupConfig(
+            enabled=os.environ.get("DEDUP_ENABLED", "false").lower() == "true",
+            max_distance=int(os.environ.get("DEDUP_MAX_DISTANCE", "10")),
+            window_seconds=float(os.environ.get("DEDUP_WINDOW_SECONDS", "120")),
+        ),
+        object_cache=CacheConfig(
+            enabled=os.environ.get("OBJECT_CACHE_ENABLED", "false").lower() == "true",
+            path=os.environ.get("OBJECT_CACHE_PATH", "/tmp/object-cache.sqlite3") or None,
+            max_entries=int(os.environ.get("OBJECT_CACHE_MAX_ENTRIES", "64")),
+            disk_max_bytes=int(os.environ.get("OBJECT_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+            ttl_seconds=float(os.environ.get("OBJECT_CACHE_TTL_SECONDS", "300")),
+        ),
+        missing_object_cache=CacheConfig(
+            enabled=float(os.environ.get("MISSING_OBJECT_TTL_SECONDS", "30")) > 0,
+            max_entries=int(os.environ.get("MISSING_OBJECT_MAX_ENTRIES", "4096")),
+            memory_max_bytes=1024 * 1024,
+            ttl_seconds=float(os.environ.get("MISSING_OBJECT_TTL_SECONDS", "30")),
+        ),
+        driver_rollup=DriverRollupConfig(
+            enabled=os.environ.get("DRIVER_ROLLUP_ENABLED", "false").lower() == "true",
+            path=os.environ.get("DRIVER_ROLLUP_PATH", "/tmp/driver-performance.sqlite3"),
+            flush_interval_seconds=float(os.environ.get("DRIVER_ROLLUP_FLUSH_SECONDS", "60")),
+            max_pending_rows=int(os.environ.get("DRIVER_ROLLUP_MAX_PENDING_ROWS", "1000")),
+            trend_threshold=float(os.environ.get("DRIVER_TREND_THRESHOLD", "0.02")),
+        ),
+        quality_sketches=SketchConfig(
+            enabled=os.environ.get("QUALITY_SKETCHES_ENABLED", "false").lower() == "true",
+            path=os.environ.get("QUALITY_SKETCHES_PATH", "/tmp/quality-sketches.sqlite3"),
+            flush_interval_seconds=float(os.environ.get("QUALITY_SKETCHES_FLUSH_SECONDS", "60")),
+        ),
+        result_store=ResultStoreConfig(
+            enabled=os.environ.get("RESULT_STORE_ENABLED", "false").lower() == "true",
+            path=os.environ.get("RESULT_STORE_PATH", "/tmp/quality-results"),
+            max_buffered_rows=int(os.environ.get("RESULT_STORE_MAX_BUFFERED_ROWS", "10000")),
+            flush_interval_seconds=float(os.environ.get("RESULT_STORE_FLUSH_SECONDS", "300")),
+            compression=os.environ.get("RESULT_STORE_COMPRESSION", "zstd"),
+        ),
         notification_topic_id=os.environ.get("NOTIFICATION_TOPIC_ID"),
         database_table=os.environ.get("QUALITY_TABLE", "delivery_quality_events"),
         local_asset_root=os.environ.get("LOCAL_ASSET_ROOT"),
     )
 
 
-def build_llm(config: WorkflowConfig) -> OCIModel:
-    """Build OCI Generative AI client for chat API"""
+def build_llm(config: WorkflowConfig, deadline: Optional[Deadline] = None) -> OCIModel:
+    """Build OCI Generative AI client for chat API.
+
+    When ``deadline`` is given, every chat call is bounded by the remaining
+    invocation budget instead of the fixed client timeout.
+    """
     import oci
     from oci.generative_ai_inference import GenerativeAiInferenceClient
     
-    # Get configuration from environment
-    hostname = os.environ.get("OCI_GENAI_HOSTNAME")
-    model_ocid = os.environ.get("OCI_TEXT_MODEL_OCID")
+    # Get configuration: OCI_GENAI_ENDPOINTS pool, else the single hostname/OCID pair
+    endpoints = resolve_endpoints(config.endpoint_pool)
     compartment_id = os.environ.get("OCI_COMPARTMENT_ID")
     
-    if not hostname:
-        raise ValueError("OCI_GENAI_HOSTNAME must be set")
-    
-    if not model_ocid:
+    if not endpoints:
+        hostname = os.environ.get("OCI_GENAI_HOSTNAME")
+        if not hostname:
+            raise ValueError("OCI_GENAI_HOSTNAME must be set")
         print("Warning: OCI_TEXT_MODEL_OCID not set, using placeholder")
-        model_ocid = "ocid1.test.oc1..<unique_ID>EXAMPLE-modelId-Value"
+        endpoints = [
+            GenAIEndpoint(
+                hostname=normalize_hostname(hostname),
+                model_ocid="ocid1.test.oc1..<unique_ID>EXAMPLE-modelId-Value",
+            )
+        ]
     
     if not compartment_id:
         raise ValueError("OCI_COMPARTMENT_ID must be set")
     
-    # Remove endpoint path if included in hostname
-    if '/20231130/actions/generateText' in hostname:
-        hostname = hostname.replace('/20231130/actions/generateText', '')
-    
     # Load OCI configuration with error handling
     try:
         oci_config = oci.config.from_file()
@@ -104,38 +265,67 @@ def build_llm(config: WorkflowConfig) -> OCIModel:
         except Exception as fallback_error:
             raise ValueError(f"Could not load OCI configuration: {config_error}, {fallback_error}")
     
-    # Initialize Generative AI client
-    try:
-        client = GenerativeAiInferenceClient(
+    # One Generative AI client per endpoint hostname and thread, since each call sets its client's timeout
+    clients = ThreadLocalClients(
+        lambda hostname: GenerativeAiInferenceClient(
             config=oci_config,
             service_endpoint=hostname,
             retry_strategy=oci.retry.NoneRetryStrategy(),
-            timeout=(10, 240)
+            timeout=(
+                config.time_budget.connect_timeout_seconds,
+                config.time_budget.read_timeout_seconds,
+            )
         )
-    except Exception as client_error:
-        raise RuntimeError(f"Failed to initialize OCI Generative AI client: {client_error}")
+    )
+    for endpoint in endpoints:
+        try:
+            clients.get(endpoint.hostname)
+        except Exception as client_error:
+            raise RuntimeError(f"Failed to initialize OCI Generative AI client: {client_error}")
     
     # Create custom LLM wrapper for OCI GenAI chat API
     from langchain_core.language_models import BaseLLM
     from langchain_core.callbacks import CallbackManagerForLLMRun
     from typing import Any, List, Optional
     
+    from langchain_core.outputs import LLMResult, Generation
+    
     class OCIGenAIModel(BaseLLM):
-        client: Any = None
-        model_ocid: str = ""
+        clients: Any = None
+        balancer: Any = None
         compartment_id: str = ""
+        deadline: Any = None
+        time_budget: Any = None
+        limiter: Any = None
+        max_tokens: int = 300
+        temperature: float = 0.7
+        top_p: float = 0.75
         
-        def __init__(self, client, model_ocid, compartment_id):
+        def __init__(self, clients, balancer, compartment_id, deadline=None, time_budget=None, limiter=None, cache=None):
             super().__init__(
-                client=client,
-                model_ocid=model_ocid,
-                compartment_id=compartment_id
+                clients=clients,
+                balancer=balancer,
+                compartment_id=compartment_id,
+                deadline=deadline,
+                time_budget=time_budget,
+                limiter=limiter,
+                cache=cache,
             )
         
         @property
         def _llm_type(self) -> str:
             return "oci_genai"
         
+        @property
+        def _identifying_params(self) -> Dict[str, Any]:
+            """Everything that changes the answer; LangChain folds this into the cache key."""
+            return {
+                "endpoints": self.balancer.key if self.balancer is not None else None,
+                "max_tokens": self.max_tokens,
+                "temperature": self.temperature,
+                "top_p": self.top_p,
+            }
+        
         def _generate(
             self,
             prompts: List[str],
@@ -144,11 +334,9 @@ def build_llm(config: WorkflowConfig) -> OCIModel:
             **kwargs: Any,
         ) -> Any:
             """Generate responses for multiple prompts."""
-            from langchain_core.outputs import LLMResult, Generation
             generations = []
             for prompt in prompts:
-                text = self._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
-                generations.append([Generation(text=text)])
+                generations.append([self._generation(prompt, **kwargs)])
             return LLMResult(generations=generations)
         
         def _call(
@@ -159,6 +347,10 @@ def build_llm(config: WorkflowConfig) -> OCIModel:
             **kwargs: Any,
         ) -> str:
             """Generate text using OCI GenAI chat API"""
+            return self._generation(prompt, **kwargs).text
+        
+        def _generation(self, prompt: str, **kwargs: Any) -> Generation:
+            """One chat completion; failures are flagged so the response cache skips them."""
             try:
                 # Create content and message
                 content = oci.generative_ai_inference.models.TextContent()
@@ -172,25 +364,34 @@ def build_llm(config: WorkflowConfig) -> OCIModel:
                 chat_request = oci.generative_ai_inference.models.GenericChatRequest()
                 chat_request.api_format = oci.generative_ai_inference.models.BaseChatRequest.API_FORMAT_GENERIC
                 chat_request.messages = [message]
-                chat_request.max_tokens = kwargs.get('max_tokens', 300)
-                chat_request.temperature = kwargs.get('temperature', 0.7)
+                chat_request.max_tokens = kwargs.get('max_tokens', self.max_tokens)
+                chat_request.temperature = kwargs.get('temperature', self.temperature)
                 chat_request.frequency_penalty = kwargs.get('frequency_penalty', 0)
                 chat_request.presence_penalty = kwargs.get('presence_penalty', 0)
-                chat_request.top_p = kwargs.get('top_p', 0.75)
-                
-                # Create serving mode with endpoint ID
-                serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
-                    endpoint_id=self.model_ocid
-                )
+                chat_request.top_p = kwargs.get('top_p', self.top_p)
                 
-                # Create chat details
-                chat_detail = oci.generative_ai_inference.models.ChatDetails()
-                chat_detail.serving_mode = serving_mode
-                chat_detail.chat_request = chat_request
-                chat_detail.compartment_id = self.compartment_id
+                def send(endpoint):
+                    client = self.clients.get(endpoint.hostname)
+                    
+                    # Create serving mode with endpoint ID
+                    serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
+                        endpoint_id=endpoint.model_ocid
+                    )
+                    
+                    # Create chat details
+                    chat_detail = oci.generative_ai_inference.models.ChatDetails()
+                    chat_detail.serving_mode = serving_mode
+                    chat_detail.chat_request = chat_request
+                    chat_detail.compartment_id = self.compartment_id
+                    
+                    # Call the chat API within the remaining invocation budget
+                    apply_request_timeout(client, self.deadline, self.time_budget)
+                    if self.limiter is not None:
+                        return self.limiter.call(lambda: client.chat(chat_detail), self.deadline)
+                    return client.chat(chat_detail)
                 
-                # Call the chat API
-                response = self.client.chat(chat_detail)
+                # Send to the least loaded healthy endpoint in the pool
+                response = self.balancer.call(send)
                 
                 # Extract text from response
                 if (response.data and 
@@ -204,41 +405,122 @@ def build_llm(config: WorkflowConfig) -> OCIModel:
                     hasattr(response.data.chat_response.choices[0].message, 'content') and
                     response.data.chat_response.choices[0].message.content and
                     len(response.data.chat_response.choices[0].message.content) > 0):
-                    return response.data.chat_response.choices[0].message.content[0].text
+                    return Generation(text=response.data.chat_response.choices[0].message.content[0].text)
                 else:
-                    return "Error: No response generated"
+                    return Generation(text="Error: No response generated", generation_info={"error": "no_response"})
                     
             except Exception as e:
-                return f"Error generating text: {str(e)}"
+                return Generation(text=f"Error generating text: {str(e)}", generation_info={"error": str(e)})
     
-    return OCIGenAIModel(client, model_ocid, compartment_id)
+    return OCIGenAIModel(
+        clients,
+        shared_balancer(endpoints, config.endpoint_pool),
+        compartment_id,
+        deadline,
+        config.time_budget,
+        limiter_for(GENAI_TEXT, config.concurrency),
+        shared_llm_cache(config.llm_cache),
+    )
 
 
-def handler(ctx: Any, data: bytes) -> Dict[str, Any]:
-    payload = json.loads(data.decode("utf-8"))
-    object_name = payload["data"]["resourceName"]
-    event_time = payload["eventTime"]
-
-    context = DeliveryContext(
-        object_name=object_name,
-        expected_latitude=float(payload["additionalDetails"]["expectedLatitude"]),
-        expected_longitude=float(payload["additionalDetails"]["expectedLongitude"]),
-        promised_time_utc=datetime.fromisoformat(payload["additionalDetails"]["promisedTime"]),
-        delivered_time_utc=datetime.fromisoformat(event_time),
+def _expected_location(details: Dict[str, Any], config: WorkflowConfig) -> Tuple[float, float]:
+    """Explicit coordinates win; otherwise geocode ``deliveryStopId`` / ``deliveryAddress``."""
+    if details.get("expectedLatitude") is not None and details.get("expectedLongitude") is not None:
+        return float(details["expectedLatitude"]), float(details["expectedLongitude"])
+    location = shared_geocoder(config.geolocation).resolve(
+        address=details.get("deliveryAddress"), stop_id=details.get("deliveryStopId")
     )
+    if location is None:
+        raise ValueError(
+            "Event has no expectedLatitude/expectedLongitude and its deliveryStopId/deliveryAddress could not be geocoded"
+        )
+    return location
+
+
+def _context_from_event(payload: Dict[str, Any], config: WorkflowConfig) -> DeliveryContext:
+    details = payload["additionalDetails"]
+    expected_latitude, expected_longitude = _expected_location(details, config)
+    return DeliveryContext(
+        object_name=payload["data"]["resourceName"],
+        expected_latitude=expected_latitude,
+        expected_longitude=expected_longitude,
+        promised_time_utc=datetime.fromisoformat(details["promisedTime"]),
+        delivered_time_utc=datetime.fromisoformat(payload["eventTime"]),
+        driver_id=details.get("driverId"),
+        route_id=details.get("routeId"),
+        region=details.get("region"),
+        stop_id=details.get("deliveryStopId"),
+    )
+
 
+_spool: Optional[EventSpool] = None
+_spool_workers: Optional[SpoolWorkerPool] = None
+_spool_lock = threading.Lock()
+
+
+def _ensure_spool(config: WorkflowConfig) -> EventSpool:
+    """Open the spool and start its drain workers once per process."""
+    global _spool, _spool_workers
+    with _spool_lock:
+        if _spool is None:
+            _spool = EventSpool(config.spool.path, config.spool)
+            _spool_workers = SpoolWorkerPool(
+                _spool,
+                process=lambda context: process_delivery(context, config, retry_degraded=True),
+                governor=limiter_for("spool", config.concurrency),
+                workers=config.spool.workers,
+            )
+            _spool_workers.start()
+        return _spool
+
+
+def handler(ctx: Any, data: bytes) -> Dict[str, Any]:
+    payload = json.loads(data.decode("utf-8"))
     config = load_config()
-    llm = build_llm(config)
+    context = _context_from_event(payload, config)
+
+    # Spool mode: acknowledge immediately and let the workers drain at the governed rate
+    if config.spool.enabled:
+        spool_id = _ensure_spool(config).enqueue(context)
+        return {"status": "accepted", "spool_id": spool_id, "object_name": context.object_name}
+
+    return process_delivery(context, config, ctx)
+
+
+def process_delivery(
+    context: DeliveryContext, config: WorkflowConfig, ctx: Any = None, retry_degraded: bool = False
+) -> Dict[str, Any]:
+    """Run the quality pipeline for one delivery, then persist and alert.
+
+    With ``retry_degraded`` (spooled events) a result whose caption or damage
+    stage errored raises ``DegradedResultError`` before anything is persisted,
+    so the spool retries the event with backoff instead of acking it.
+    """
+    deadline = Deadline.from_invocation(ctx, config.time_budget)
+    llm = build_llm(config, deadline)
     workflow_output = run_quality_pipeline(
         config=config,
         llm=llm,
         context=context,
-        object_name=object_name,
+        object_name=context.object_name,
+        deadline=deadline,
     )
+    if retry_degraded:
+        error = vision_stage_error(workflow_output)
+        if error is not None:
+            raise DegradedResultError(error)
 
     # Persist results (placeholder for Autonomous Data Warehouse interaction)
     store_quality_event(config, workflow_output)
 
+    # Keep the driver_performance rows current without rescanning quality events
+    rollup = shared_driver_rollup(config.driver_rollup)
+    if rollup is not None:
+        rollup.record(workflow_output)
+    sketches = shared_quality_sketches(config.quality_sketches)
+    if sketches is not None:
+        sketches.record(workflow_output)
+
     # Trigger notification if assessment indicates review
     if workflow_output["assessment"].get("status") == "Review":
         trigger_alert(config, workflow_output)
@@ -247,8 +529,10 @@ def handler(ctx: Any, data: bytes) -> Dict[str, Any]:
 
 
 def store_quality_event(config: WorkflowConfig, workflow_output: Dict[str, Any]) -> None:
-    # Placeholder for database insertion logic.
-    pass
+    # Buffered Parquet files when enabled; Autonomous Database insertion is still a placeholder.
+    store = shared_result_store(config.result_store)
+    if store is not None:
+        store.append(workflow_output)
 
 
 def trigger_alert(config: WorkflowConfig, workflow_output: Dict[str, Any]) -> None:
@@ -0,0 +1,173 @@
+"""Request hedging for GenAI calls with long-tail latency."""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from .config import HedgingConfig
+
+T = TypeVar("T")
+
+
+class LatencyHistogram:
+    """Sliding window of recent call latencies for a single endpoint."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the nearest-rank percentile, or None when no samples exist."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+        return ordered[rank]
+
+
+class RequestHedger:
+    """Fire a duplicate request when the first one is slower than usual.
+
+    The hedge trigger is the configured percentile of recent latency for the
+    endpoint the primary request went to. Hedges are capped at ``max_hedge_ratio`` of all requests so a
+    degraded endpoint cannot double our spend. Losing requests cannot be
+    cancelled through the OCI SDK; they finish in the background and their
+    result is discarded.
+    """
+
+    def __init__(self, config: HedgingConfig):
+        self.config = config
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def histogram(self, endpoint: str) -> LatencyHistogram:
+        with self._lock:
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = LatencyHistogram(self.config.window)
+                self._histograms[endpoint] = histogram
+            return histogram
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "hedge_ratio": round(self._hedges / self._requests, 4) if self._requests else 0.0,
+            }
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while the histogram is cold."""
+        histogram = self.histogram(endpoint)
+        if histogram.count() < self.config.min_samples:
+            return None
+        delay = histogram.percentile(self.config.percentile)
+        if delay is None:
+            return None
+        return max(delay, self.config.min_delay_seconds)
+
+    def _reserve_hedge(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self.config.max_hedge_ratio * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.max_workers, thread_name_prefix="genai-hedge"
+                )
+            return self._executor
+
+    def _record_when_done(self, endpoint: str, future: Future) -> None:
+        """Record ``future``'s latency for ``endpoint`` when it finishes, even after losing to a hedge."""
+
+        def record(done: Future) -> None:
+            if not done.cancelled() and done.exception() is None:
+                self.histogram(endpoint).record(done.result()[1])
+
+        future.add_done_callback(record)
+
+    def _timed(self, fn: Callable[[], T]) -> Callable[[], Any]:
+        def run():
+            started = time.perf_counter()
+            result = fn()
+            return result, time.perf_counter() - started
+        return run
+
+    def call(self, endpoint: str, fn: Callable[[], T], hedge_fn: Optional[Callable[[], T]] = None) -> T:
+        """Run ``fn`` against ``endpoint``, hedging it with ``hedge_fn`` (default: ``fn``) when it runs long.
+
+        The histogram for ``endpoint`` only holds calls that ran there: a
+        ``hedge_fn`` that may go to another endpoint is not recorded.
+        """
+        with self._lock:
+            self._requests += 1
+
+        delay = self.hedge_delay(endpoint) if self.config.enabled else None
+        if delay is None:
+            result, elapsed = self._timed(fn)()
+            self.histogram(endpoint).record(elapsed)
+            return result
+
+        pool = self._pool()
+        primary = pool.submit(self._timed(fn))
+        self._record_when_done(endpoint, primary)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._reserve_hedge():
+            return primary.result()[0]
+
+        hedge = pool.submit(self._timed(hedge_fn or fn))
+        if hedge_fn is None:
+            self._record_when_done(endpoint, hedge)
+        pending = {primary, hedge}
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, _elapsed = future.result()
+                except Exception as err:
+                    last_error = err
+                    continue
+                if future is hedge:
+                    with self._lock:
+                        self._hedge_wins += 1
+                return result
+        assert last_error is not None
+        raise last_error
+
+
+_shared_hedger: Optional[RequestHedger] = None
+_shared_lock = threading.Lock()
+
+
+def shared_hedger(config: HedgingConfig) -> RequestHedger:
+    """Process-wide hedger so latency history survives across invocations."""
+    global _shared_hedger
+    with _shared_lock:
+        if _shared_hedger is None:
+            _shared_hedger = RequestHedger(config)
+        else:
+            _shared_hedger.config = config
+        return _shared_hedger
@@ -0,0 +1,216 @@
+"""Recover the JSON object from chatty or truncated model output in one pass.
+
+Model replies wrap their JSON in code fences, prose or trailing commentary,
+and are sometimes cut off by ``max_tokens``. ``extract_json_object`` scans
+the text once with a string-aware bracket matcher, parses the first balanced
+object (or the first object of a top-level array), and when the text ends
+mid-object closes the open string and brackets, falling back to the last
+complete member. The scan only moves forward, apart from a bounded number of
+retries, and repairs make a bounded number of ``json.loads`` attempts, so the
+cost stays linear in the reply length however malformed it is.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+_STRUCTURAL = re.compile(r'[{}\[\],"\\]')
+# Only an object (or an array of objects) can be an answer, so prose like "{note}" or "[1]" is skipped cheaply
+_CANDIDATE_START = re.compile(r'\{\s*["}]|\[\s*\{')
+# Truncation repairs: close where the text stopped, then cut back to this many earlier commas
+_MAX_COMMA_CUTS = 3
+# Unrepairable candidates are retried from their first nested object at most this often
+_MAX_RESTARTS = 2
+# Commas nested deeper than this are not used as repair cut points
+_MAX_CUT_DEPTH = 32
+
+
+def _first_object(value: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return value[0]
+    return None
+
+
+def _loads(text: str) -> Optional[Dict[str, Any]]:
+    try:
+        return _first_object(json.loads(text))
+    except (ValueError, RecursionError):
+        return None
+
+
+def _repair(fragment: str, stack: List[str], in_string: bool, escaped: bool,
+            cuts: List[Tuple[int, str]]) -> Optional[Dict[str, Any]]:
+    """Close a truncated object, or cut it back to the last complete members."""
+    if in_string:
+        if escaped:
+            fragment = fragment[:-1]
+        fragment += '"'
+    # A bare number or literal right at the cut may be incomplete ("0.3" of "0.35"); drop its member instead
+    if in_string or not fragment[-1:].isalnum() and fragment[-1:] not in ".-+":
+        closers = "".join(_CLOSERS[opener] for opener in reversed(stack))
+        candidate = fragment.rstrip()
+        if candidate.endswith(","):
+            candidate = candidate[:-1]
+        parsed = _loads(candidate + closers)
+        if parsed is not None:
+            return parsed
+    for position, open_brackets in reversed(cuts):
+        parsed = _loads(fragment[:position] + "".join(_CLOSERS[opener] for opener in reversed(open_brackets)))
+        if parsed is not None:
+            return parsed
+    return None
+
+
+def extract_json_object(
+    text: str, repair: bool = True, valid: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Optional[Dict[str, Any]]:
+    """Return the first JSON object in ``text``, or None when there is none.
+
+    A top-level array yields its first element when that is an object. With
+    ``repair``, an object cut off at the end of the text is closed. Once the
+    text turned out to be truncated, an object is only returned when
+    ``valid`` accepts it, so a repair that cut a required field or an enum
+    value short ("min" of "minor") is rejected rather than passed on.
+    """
+    if not text:
+        return None
+    stripped = text.strip()
+    if stripped[:1] in "{[":
+        parsed = _loads(stripped)
+        if parsed is not None:
+            return parsed
+
+    length = len(text)
+    position = 0
+    restarts = 0
+    truncated = False
+    brace = bracket = -2
+    while position < length:
+        # Next candidate start; each search only moves forward
+        if brace != -1 and brace < position:
+            brace = text.find("{", position)
+        if bracket != -1 and bracket < position:
+            bracket = text.find("[", position)
+        if brace == -1 and bracket == -1:
+            return None
+        start = brace if bracket == -1 or (brace != -1 and brace < bracket) else bracket
+        if not _CANDIDATE_START.match(text, start):
+            position = start + 1
+            continue
+
+        stack: List[str] = []
+        cuts: List[Tuple[int, str]] = []
+        in_string = escaped = False
+        index = length
+        end = -1
+        escaped_at = -1
+        first_child = -1
+        # Only structural characters matter; plain text between them is skipped by the regex engine
+        for match in _STRUCTURAL.finditer(text, start):
+            index = match.start()
+            if index == escaped_at:
+                continue
+            char = text[index]
+            if in_string:
+                if char == "\\":
+                    escaped_at = index + 1
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{" or char == "[":
+                stack.append(char)
+                if first_child == -1 and len(stack) == 2 and char == "{":
+                    first_child = index
+            elif char == "}" or char == "]":
+                if not stack or _CLOSERS[stack[-1]] != char:
+                    break
+                stack.pop()
+                if not stack:
+                    end = index + 1
+                    break
+            elif char == "," and len(stack) <= _MAX_CUT_DEPTH:
+                cuts.append((index, "".join(stack)))
+                if len(cuts) > _MAX_COMMA_CUTS:
+                    del cuts[0]
+        else:
+            index = length
+            escaped = in_string and escaped_at == length
+
+        if end != -1:
+            parsed = _loads(text[start:end])
+            if parsed is not None and (not truncated or valid is None or valid(parsed)):
+                return parsed
+            position = end
+        elif index >= length:
+            # Ran off the end inside the candidate: the reply was truncated
+            truncated = True
+            if repair:
+                parsed = _repair(text[start:], stack, in_string, escaped, [(cut - start, brackets) for cut, brackets in cuts])
+                if parsed is not None and (valid is None or valid(parsed)):
+                    return parsed
+            if first_child == -1 or restarts == _MAX_RESTARTS:
+                return None
+            # e.g. "[Note: {...}" where the bracket was prose
+            restarts += 1
+            position = first_child
+        else:
+            # Mismatched closer; resume after it
+            position = index + 1
+    return None
+
+
+class JsonObjectTracker:
+    """Incremental matcher for streamed replies: reports when the first top-level object closes.
+
+    Chunks are scanned once as they arrive. Balanced spans that are not valid
+    JSON (prose such as ``{note}``) are skipped, so only a real object ends
+    the stream.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.complete = False
+        self._scanned = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped_at = -1
+
+    def feed(self, chunk: str) -> bool:
+        """Add ``chunk``; True once a complete JSON object has been seen."""
+        if self.complete:
+            return True
+        self.text += chunk
+        text = self.text
+        for match in _STRUCTURAL.finditer(text, self._scanned):
+            index = match.start()
+            char = text[index]
+            if self._start == -1:
+                if char == "{":
+                    self._start, self._depth, self._in_string = index, 1, False
+                continue
+            if index == self._escaped_at:
+                continue
+            if self._in_string:
+                if char == "\\":
+                    self._escaped_at = index + 1
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{" or char == "[":
+                self._depth += 1
+            elif char == "}" or char == "]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if _loads(text[self._start:index + 1]) is not None:
+                        self.complete = True
+                        return True
+                    self._start = -1
+        self._scanned = len(text)
+        return False
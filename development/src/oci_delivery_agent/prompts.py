@@ -0,0 +1,253 @@
+"""Versioned prompt templates for the GenAI vision calls, rendered once per configuration."""
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from string import Template
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .compact import (
+    DESCRIPTION_WORDS,
+    EVIDENCE_WORDS,
+    LOCATION_CODES,
+    SCENE_CODES,
+    SHORT_TEXT_WORDS,
+    TIME_CODES,
+    WEATHER_CODES,
+    code_list,
+)
+from .config import DamageScoringConfig
+
+CAPTION_TEMPLATE_ID = "caption-json/v1"
+DAMAGE_TEMPLATE_ID = "damage-json/v1"
+COMPACT_CAPTION_TEMPLATE_ID = "caption-compact/v1"
+COMPACT_DAMAGE_TEMPLATE_ID = "damage-compact/v1"
+
+# Output budgets: the verbose schema's historical limit, and the compact schemas' worst case plus headroom
+DEFAULT_MAX_TOKENS = 800
+COMPACT_CAPTION_MAX_TOKENS = 240
+COMPACT_DAMAGE_MAX_TOKENS = 200
+
+_CAPTION_TEMPLATE = (
+    "You are a delivery scene analyzer. Analyze the provided image and produce ONLY a single JSON object (no markdown, no preface, no trailing text) with this exact structure:\n\n"
+    "{\n"
+    "  \"sceneType\": \"delivery|package|entrance|other\",\n"
+    "  \"packageVisible\": true|false,\n"
+    "  \"packageDescription\": \"string\",\n"
+    "  \"location\": {\n"
+    "    \"type\": \"doorstep|porch|mailbox|driveway|entrance|inside|other\",\n"
+    "    \"description\": \"string\"\n"
+    "  },\n"
+    "  \"environment\": {\n"
+    "    \"weather\": \"clear|rainy|cloudy|snowy|unknown\",\n"
+    "    \"timeOfDay\": \"morning|afternoon|evening|night|unknown\",\n"
+    "    \"conditions\": \"string\"\n"
+    "  },\n"
+    "  \"safetyAssessment\": {\n"
+    "    \"protected\": true|false,\n"
+    "    \"visible\": true|false,\n"
+    "    \"secure\": true|false,\n"
+    "    \"notes\": \"string\"\n"
+    "  },\n"
+    "  \"overallDescription\": \"string\"\n"
+    "}\n\n"
+    "Definitions:\n"
+    "- sceneType: primary scene category (delivery=package at destination, package=package only, entrance=door/entrance visible, other=none of these)\n"
+    "- packageVisible: whether any package/box/parcel is visible in the image\n"
+    "- packageDescription: short description of package(s) seen, or \"none\" if not visible\n"
+    "- location.type: where the package/scene is located\n"
+    "- location.description: brief description of the location (what you see)\n"
+    "- environment.weather: apparent weather conditions from visual cues\n"
+    "- environment.timeOfDay: estimated time based on lighting\n"
+    "- environment.conditions: brief description of environmental factors\n"
+    "- safetyAssessment.protected: is package sheltered from weather/elements\n"
+    "- safetyAssessment.visible: is package visible from street/public view\n"
+    "- safetyAssessment.secure: does location appear secure (not easily stolen)\n"
+    "- safetyAssessment.notes: brief assessment of delivery safety\n"
+    "- overallDescription: 2-3 sentence summary of the entire scene\n\n"
+    "Rules:\n"
+    "- If no package is visible, set packageVisible=false and packageDescription=\"none\", but still describe the scene.\n"
+    "- Keep descriptions factual and visual. No speculation about contents or ownership.\n"
+    "- For weather/time, use \"unknown\" if not clearly visible.\n"
+    "- Output MUST be valid JSON, UTF-8, no trailing commas, no extra commentary.\n\n"
+    "Now analyze the image and output the JSON only."
+)
+
+# The caption-context splice goes between the head and the tail
+_DAMAGE_HEAD = (
+    "You are a delivery damage inspector. Analyze the provided image and produce ONLY a single JSON object (no markdown, no preface, no trailing text) with this exact structure:\n\n"
+    "{\n"
+    "  \"overall\": { \"severity\": \"none|minor|moderate|severe\", \"score\": 0.0-1.0, \"rationale\": \"string\" },\n"
+    "  \"indicators\": {\n"
+    "    \"boxDeformation\": { \"present\": true|false, \"severity\": \"none|minor|moderate|severe\", \"evidence\": \"string\" },\n"
+    "    \"cornerDamage\":   { \"present\": true|false, \"severity\": \"none|minor|moderate|severe\", \"evidence\": \"string\" },\n"
+    "    \"leakage\":        { \"present\": true|false, \"severity\": \"none|minor|moderate|severe\", \"evidence\": \"string\" },\n"
+    "    \"packagingIntegrity\": { \"present\": true|false, \"severity\": \"none|minor|moderate|severe\", \"evidence\": \"string\" }\n"
+    "  },\n"
+    "  \"packageVisible\": true|false,\n"
+    "  \"uncertainties\": \"string\"\n"
+    "}\n\n"
+)
+
+_DAMAGE_TAIL = Template(
+    "Important: A 'package' includes ANY delivered items: cardboard boxes, plastic bags, envelopes, containers, parcels, or any other delivery items.\n\n"
+    "Definitions:\n"
+    "- boxDeformation: crushed corners, bent edges, bulging sides, structural collapse (applies to boxes, bags, containers).\n"
+    "- cornerDamage: crushed/abraded/torn/dented corners (for any package type with corners).\n"
+    "- leakage: liquid stains, wet spots, moisture damage (visible on or around any package).\n"
+    "- packagingIntegrity: tears, holes, dents, scratches, tape failure, visible damage to any package surface.\n\n"
+    "Rules:\n"
+    "- FIRST, identify if ANY delivery items (boxes, bags, coolers, envelopes, containers, parcels) are visible.\n"
+    "- If ANY delivery items are visible, set \"packageVisible\": true and assess damage on those items.\n"
+    "- If absolutely NO delivery items are visible, set \"packageVisible\": false and \"overall.severity\": \"none\", \"overall.score\": 0.0 with rationale.\n"
+    "- If delivery items are visible but no damage is visible, set all indicators.present=false, severity=\"none\", evidence=\"none\", overall.severity=\"none\", overall.score<=${none_max}.\n"
+    "- Calibrate score by worst indicator: severe ≈ ${severe_min}, moderate ≈ ${moderate_min}–${moderate_max}, minor ≈ ${minor_min}–${minor_max}, none ≤ ${none_max}.\n"
+    "- Keep evidence short and visual (what/where). Be precise, no speculation.\n"
+    "- If any of these keywords are observed: crushed, bent, bulging, tear, hole, dent, leak, wet, stain → minimum severity is 'minor' and score ≥ ${minor_min}.\n"
+    "- For plastic bags and soft containers: assess tears, holes, and structural integrity instead of box deformation.\n"
+    "- Output MUST be valid JSON, UTF-8, no trailing commas, no extra commentary.\n\n"
+    "Now analyze the image and output the JSON only."
+)
+
+
+# Compact schemas: short keys, enum codes and word-bounded text; compact.decode_* restores the verbose structure
+_COMPACT_CAPTION_TEMPLATE = (
+    "You are a delivery scene analyzer. Analyze the provided image and output ONLY one compact JSON object, no markdown, no extra text:\n"
+    "{\"s\":scene,\"pv\":1|0,\"pd\":\"package\",\"l\":location,\"ld\":\"where\",\"w\":weather,\"t\":time,"
+    "\"c\":\"conditions\",\"sf\":[protected,visible,secure],\"sn\":\"safety\",\"o\":\"summary\"}\n\n"
+    f"s (scene): {code_list(SCENE_CODES)}\n"
+    f"l (package location): {code_list(LOCATION_CODES)}\n"
+    f"w (weather): {code_list(WEATHER_CODES)}\n"
+    f"t (time of day from lighting): {code_list(TIME_CODES)}\n"
+    "pv: 1 if any package/box/parcel is visible, else 0\n"
+    "sf: 1|0 each for sheltered from weather, visible from the street, location looks secure\n"
+    f"pd, ld, c, sn: at most {SHORT_TEXT_WORDS} words each; pd=\"none\" when no package is visible\n"
+    f"o: one factual sentence of at most {DESCRIPTION_WORDS} words describing the scene\n\n"
+    "Rules: codes exactly as listed; u when weather/time is unclear; factual and visual only; valid JSON.\n"
+    "Output the JSON only."
+)
+
+_COMPACT_DAMAGE_HEAD = (
+    "You are a delivery damage inspector. Analyze the provided image and output ONLY one compact JSON object, no markdown, no extra text:\n"
+    "{\"o\":[sev,score,\"why\"],\"i\":{\"bd\":[p,sev,\"ev\"],\"cd\":[p,sev,\"ev\"],\"lk\":[p,sev,\"ev\"],\"pi\":[p,sev,\"ev\"]},\"pv\":1|0,\"u\":\"\"}\n\n"
+    "sev: 0=none 1=minor 2=moderate 3=severe. p: 1 if present else 0. score: 0.0-1.0 overall damage.\n"
+    f"why: at most {SHORT_TEXT_WORDS} words. ev: at most {EVIDENCE_WORDS} words of visual evidence, \"\" when not present. "
+    f"u: uncertainties, at most {SHORT_TEXT_WORDS} words or \"\".\n\n"
+)
+
+_COMPACT_DAMAGE_TAIL = Template(
+    "A package is ANY delivered item: box, bag, envelope, container or parcel.\n"
+    "bd: box deformation (crushed, bent, bulging, collapsed). cd: corner damage. lk: leakage (stains, wet spots). "
+    "pi: packaging integrity (tears, holes, dents, tape failure).\n\n"
+    "Rules:\n"
+    "- No delivery items visible: pv=0, o=[0,0.0,\"no package\"].\n"
+    "- Items visible without damage: every p=0 and sev=0, ev=\"\", o sev=0, score<=${none_max}.\n"
+    "- Calibrate score by worst indicator: severe ~${severe_min}, moderate ${moderate_min}-${moderate_max}, minor ${minor_min}-${minor_max}, none <=${none_max}.\n"
+    "- Crushed, bent, bulging, tear, hole, dent, leak, wet or stain seen: sev>=1 and score>=${minor_min}.\n"
+    "- For bags and soft containers assess tears, holes and structure instead of box deformation.\n"
+    "- Valid JSON only.\n"
+    "Output the JSON only."
+)
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """A prompt rendered for one configuration; ``version_id`` changes whenever its text does."""
+
+    template_id: str
+    version_id: str
+    head: str
+    tail: str = ""
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    # Replies use the compact schema and need compact.decode_* before use
+    compact: bool = False
+
+    @classmethod
+    def compile(
+        cls, template_id: str, head: str, tail: str = "", max_tokens: int = DEFAULT_MAX_TOKENS, compact: bool = False
+    ) -> "CompiledPrompt":
+        digest = hashlib.sha256((head + tail).encode("utf-8")).hexdigest()[:12]
+        return cls(template_id, f"{template_id}@{digest}", head, tail, max_tokens, compact)
+
+    def render(self, splice: str = "") -> str:
+        return f"{self.head}{splice}{self.tail}"
+
+
+def caption_context_splice(caption_context: Optional[Mapping[str, Any]]) -> str:
+    """The only per-call part of the damage prompt: packages found by the caption stage."""
+    if not caption_context:
+        return ""
+    pkg_visible = caption_context.get("packageVisible", False)
+    pkg_desc = caption_context.get("packageDescription", "")
+    if pkg_visible and pkg_desc:
+        return (
+            f"CONTEXT: Prior analysis identified packages in this image: {pkg_desc}\n"
+            f"Your damage assessment should evaluate these identified items.\n\n"
+        )
+    return ""
+
+
+@dataclass(frozen=True)
+class PromptSet:
+    caption: CompiledPrompt
+    damage: CompiledPrompt
+
+    def versions(self) -> Dict[str, str]:
+        return {"caption": self.caption.version_id, "damage": self.damage.version_id}
+
+
+def _thresholds(scoring: DamageScoringConfig) -> Tuple[float, ...]:
+    return (
+        scoring.none_max,
+        scoring.minor_min,
+        scoring.minor_max,
+        scoring.moderate_min,
+        scoring.moderate_max,
+        scoring.severe_min,
+    )
+
+
+_compiled: Dict[Tuple[Tuple[float, ...], bool], PromptSet] = {}
+_compiled_lock = threading.Lock()
+
+
+def compiled_prompts(scoring: DamageScoringConfig, compact: bool = False) -> PromptSet:
+    """Prompts for ``scoring``, rendered on first use and reused for identical thresholds.
+
+    With ``compact`` the prompts ask for the compact wire schema and carry
+    the smaller output budgets it needs.
+    """
+    key = (_thresholds(scoring), compact)
+    prompts = _compiled.get(key)
+    if prompts is not None:
+        return prompts
+    with _compiled_lock:
+        prompts = _compiled.get(key)
+        if prompts is None:
+            thresholds = dict(
+                none_max=scoring.none_max,
+                minor_min=scoring.minor_min,
+                minor_max=scoring.minor_max,
+                moderate_min=scoring.moderate_min,
+                moderate_max=scoring.moderate_max,
+                severe_min=scoring.severe_min,
+            )
+            if compact:
+                prompts = PromptSet(
+                    caption=CompiledPrompt.compile(
+                        COMPACT_CAPTION_TEMPLATE_ID, _COMPACT_CAPTION_TEMPLATE,
+                        max_tokens=COMPACT_CAPTION_MAX_TOKENS, compact=True,
+                    ),
+                    damage=CompiledPrompt.compile(
+                        COMPACT_DAMAGE_TEMPLATE_ID, _COMPACT_DAMAGE_HEAD, _COMPACT_DAMAGE_TAIL.substitute(thresholds),
+                        max_tokens=COMPACT_DAMAGE_MAX_TOKENS, compact=True,
+                    ),
+                )
+            else:
+                prompts = PromptSet(
+                    caption=CompiledPrompt.compile(CAPTION_TEMPLATE_ID, _CAPTION_TEMPLATE),
+                    damage=CompiledPrompt.compile(DAMAGE_TEMPLATE_ID, _DAMAGE_HEAD, _DAMAGE_TAIL.substitute(thresholds)),
+                )
+            _compiled[key] = prompts
+        return prompts
@@ -0,0 +1,233 @@
+"""Recompute quality indexes for stored results under a new configuration.
+
+Input is JSON Lines, one ``run_quality_pipeline`` result per line. Only the
+stored context, EXIF GPS and damage indicators are used, so no vision or LLM
+calls are made. Each output line keeps its original ``quality_metrics`` and
+gains ``score_versions[<version>]`` with the recomputed scores.
+
+A status flip compares the stored ``assessment.status`` with the status the
+pipeline's fast-path rules give under the new scores. The rules are applied
+whether or not ``FAST_PATHS_ENABLED`` is set, since they are the pipeline's
+only deterministic status rule. Rows whose scores changed but that no rule
+settles would go back to the review LLM, so they are counted as
+``undecided`` rather than guessed at.
+
+    python -m oci_delivery_agent.rescore results.jsonl rescored.jsonl --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .chains import DeliveryContext
+from .config import WorkflowConfig
+from .fast_paths import decide
+from .scoring import ScoringColumns, score_batch
+
+_SCORE_KEYS = ("location_accuracy", "timeliness", "package_quality", "quality_index")
+
+
+def score_version(config: WorkflowConfig) -> str:
+    """Stable id for every setting that feeds ``compute_quality_index``."""
+    settings = {
+        "weights": config.quality_weights.normalized(),
+        "max_distance_meters": config.geolocation.max_distance_meters,
+        "damage_scoring": asdict(config.damage_scoring),
+    }
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"score-{digest[:12]}"
+
+
+def _rule_status(result: Dict[str, Any], metrics: Dict[str, float], config: WorkflowConfig) -> Optional[str]:
+    """Status the pipeline's rules assign under ``metrics``; None when only the review LLM could decide."""
+    caption = result.get("caption_json")
+    if not isinstance(caption, dict):
+        return None
+    decision = decide(caption, result["damage_report"], metrics, replace(config.fast_paths, enabled=True))
+    return decision.assessment.get("status") if decision is not None else None
+
+
+@dataclass
+class RescoreReport:
+    """Diff summary of one re-score run."""
+
+    version: str
+    rows: int = 0
+    rescored: int = 0
+    skipped: int = 0
+    changed: int = 0
+    undecided: int = 0
+    flips: Dict[str, int] = field(default_factory=lambda: {"OK->Review": 0, "Review->OK": 0})
+    flipped_objects: List[str] = field(default_factory=list)
+    max_examples: int = 20
+
+    def merge(self, other: "RescoreReport") -> None:
+        self.rows += other.rows
+        self.rescored += other.rescored
+        self.skipped += other.skipped
+        self.changed += other.changed
+        self.undecided += other.undecided
+        for key, count in other.flips.items():
+            self.flips[key] += count
+        room = self.max_examples - len(self.flipped_objects)
+        self.flipped_objects.extend(other.flipped_objects[:room])
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "rows": self.rows,
+            "rescored": self.rescored,
+            "skipped": self.skipped,
+            "changed": self.changed,
+            "undecided": self.undecided,
+            "flips": dict(self.flips),
+            "flipped_objects": list(self.flipped_objects),
+        }
+
+
+def _record(result: Dict[str, Any]) -> Optional[Tuple[DeliveryContext, Dict[str, Any], Dict[str, Any]]]:
+    context = result.get("context")
+    # Photos rejected by the usability gate have no damage report to score
+    if not context or not isinstance(result.get("damage_report"), dict):
+        return None
+    return (
+        DeliveryContext(
+            object_name=context["object_name"],
+            expected_latitude=float(context["expected_latitude"]),
+            expected_longitude=float(context["expected_longitude"]),
+            promised_time_utc=datetime.fromisoformat(context["promised_time_utc"]),
+            delivered_time_utc=datetime.fromisoformat(context["delivered_time_utc"]),
+        ),
+        result.get("exif") or {},
+        result["damage_report"],
+    )
+
+
+def rescore_lines(lines: Sequence[str], config: WorkflowConfig) -> Tuple[List[str], RescoreReport]:
+    """Re-score one chunk of JSON lines; returns the rewritten lines and their diff."""
+    version = score_version(config)
+    report = RescoreReport(version)
+    results = [json.loads(line) for line in lines if line.strip()]
+    report.rows = len(results)
+
+    scorable = []
+    records = []
+    for position, result in enumerate(results):
+        record = _record(result)
+        if record is None:
+            report.skipped += 1
+            continue
+        scorable.append(position)
+        records.append(record)
+
+    if records:
+        scores = score_batch(
+            ScoringColumns.from_records(records),
+            config.quality_weights.normalized(),
+            config.geolocation.max_distance_meters,
+            config,
+        )
+        for row, position in enumerate(scorable):
+            result = results[position]
+            metrics = {key: float(scores[key][row]) for key in _SCORE_KEYS}
+            result.setdefault("score_versions", {})[version] = metrics
+            report.rescored += 1
+
+            old_index = (result.get("quality_metrics") or {}).get("quality_index")
+            if old_index is None or old_index == metrics["quality_index"]:
+                continue
+            report.changed += 1
+            before = (result.get("assessment") or {}).get("status")
+            after = _rule_status(result, metrics, config)
+            if before is None or after is None:
+                report.undecided += 1
+            elif before != after:
+                report.flips[f"{before}->{after}"] += 1
+                if len(report.flipped_objects) < report.max_examples:
+                    report.flipped_objects.append(result["context"]["object_name"])
+
+    return [json.dumps(result, default=str) for result in results], report
+
+
+def _rescore_chunk(args: Tuple[List[str], WorkflowConfig]) -> Tuple[List[str], RescoreReport]:
+    return rescore_lines(*args)
+
+
+def _run_chunks(tasks, workers: int):
+    """Yield chunk results in input order, keeping at most ``2 * workers`` chunks in flight."""
+    if workers == 1:
+        yield from map(_rescore_chunk, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for task in tasks:
+            pending.append(pool.submit(_rescore_chunk, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def rescore_file(
+    source: str,
+    destination: str,
+    config: WorkflowConfig,
+    workers: Optional[int] = None,
+    chunk_rows: int = 50_000,
+) -> RescoreReport:
+    """Re-score ``source`` into ``destination`` using ``workers`` processes (default: all cores)."""
+    workers = workers or os.cpu_count() or 1
+    report = RescoreReport(score_version(config))
+
+    def chunks():
+        with open(source, encoding="utf-8") as handle:
+            chunk: List[str] = []
+            for line in handle:
+                chunk.append(line)
+                if len(chunk) >= chunk_rows:
+                    yield chunk, config
+                    chunk = []
+            if chunk:
+                yield chunk, config
+
+    with open(destination, "w", encoding="utf-8") as output:
+        for lines, chunk_report in _run_chunks(chunks(), workers):
+            output.writelines(line + "\n" for line in lines)
+            report.merge(chunk_report)
+    return report
+
+
+def parse_args(argv: Any | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-score stored delivery results with the current WEIGHT_*, DAMAGE_* and SEVERITY_SCORE_* settings.")
+    parser.add_argument("source", help="JSON Lines file of stored pipeline results")
+    parser.add_argument("destination", help="Where to write results with the new score version")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-rows", dest="chunk_rows", type=int, default=50_000, help="Rows per worker task")
+    return parser.parse_args(argv)
+
+
+def main(argv: Any | None = None) -> Dict[str, Any]:
+    from .handlers import load_config
+
+    args = parse_args(argv)
+    report = rescore_file(
+        args.source,
+        args.destination,
+        load_config(),
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+    )
+    summary = report.summary()
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    main()
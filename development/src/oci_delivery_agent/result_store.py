@@ -0,0 +1,297 @@
+"""Columnar Parquet store for pipeline results.
+
+Each ``run_quality_pipeline`` result is flattened into rows for the
+``delivery_quality_events``, ``vision_analysis`` and ``damage_analysis``
+tables of docs/dashboard-specification.md. Rows are buffered and written as
+Hive-partitioned Parquet (``<table>/date=YYYY-MM-DD/region=<region>/``) with
+enum columns such as severity, sceneType and weather dictionary-encoded.
+pyarrow is optional; the store raises a clear error when it is missing.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import ResultStoreConfig
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is only needed when the store is enabled
+    pa = ds = pq = None
+
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+INDICATOR_COLUMNS = {
+    "boxDeformation": "box_deformation",
+    "cornerDamage": "corner_damage",
+    "leakage": "leakage",
+    "packagingIntegrity": "packaging_integrity",
+}
+
+Partition = Tuple[str, str]
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("The Parquet result store needs pyarrow; install it with `pip install pyarrow`.")
+
+
+def _enum():
+    return pa.dictionary(pa.int8(), pa.string())
+
+
+def table_schemas() -> Dict[str, Any]:
+    """Arrow schemas per table; partition columns (date, region) live in the path."""
+    _require_pyarrow()
+    damage_fields = [("delivery_id", pa.string()), ("overall_severity", _enum()), ("overall_score", pa.float64())]
+    for column in INDICATOR_COLUMNS.values():
+        damage_fields += [(f"{column}_present", pa.bool_()), (f"{column}_severity", _enum())]
+    return {
+        "delivery_quality_events": pa.schema([
+            ("id", pa.string()),
+            ("object_name", pa.string()),
+            ("delivery_date", pa.timestamp("us", tz="UTC")),
+            ("driver_id", pa.string()),
+            ("route_id", pa.string()),
+            ("quality_index", pa.float64()),
+            ("location_accuracy", pa.float64()),
+            ("timeliness", pa.float64()),
+            ("damage_score", pa.float64()),
+            ("assessment_status", _enum()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+        ]),
+        "vision_analysis": pa.schema([
+            ("delivery_id", pa.string()),
+            ("scene_type", _enum()),
+            ("package_visible", pa.bool_()),
+            ("package_description", pa.string()),
+            ("location_type", _enum()),
+            ("location_description", pa.string()),
+            ("weather", _enum()),
+            ("time_of_day", _enum()),
+            ("safety_protected", pa.bool_()),
+            ("safety_visible", pa.bool_()),
+            ("safety_secure", pa.bool_()),
+            ("overall_description", pa.string()),
+        ]),
+        "damage_analysis": pa.schema(damage_fields),
+    }
+
+
+def _utc(value: str) -> datetime:
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _label(value: Any) -> Optional[str]:
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _flag(value: Any) -> Optional[bool]:
+    return value if isinstance(value, bool) else None
+
+
+def flatten_result(workflow_output: Dict[str, Any], created_at: datetime) -> Tuple[Partition, Dict[str, List[Dict[str, Any]]]]:
+    """Split one pipeline result into its partition and per-table rows."""
+    context = workflow_output.get("context") or {}
+    metadata = workflow_output.get("metadata") or {}
+    object_name = context.get("object_name") or metadata.get("object_name") or ""
+    delivered = _utc(context["delivered_time_utc"]) if context.get("delivered_time_utc") else created_at
+    delivery_id = hashlib.sha256(f"{object_name}|{delivered.isoformat()}".encode("utf-8")).hexdigest()[:32]
+    metrics = workflow_output.get("quality_metrics") or {}
+    assessment = workflow_output.get("assessment") or {}
+    partition = (delivered.date().isoformat(), str(context.get("region") or DEFAULT_PARTITION))
+
+    rows: Dict[str, List[Dict[str, Any]]] = {
+        "delivery_quality_events": [{
+            "id": delivery_id,
+            "object_name": object_name,
+            "delivery_date": delivered,
+            "driver_id": context.get("driver_id"),
+            "route_id": context.get("route_id"),
+            "quality_index": _number(metrics.get("quality_index")),
+            "location_accuracy": _number(metrics.get("location_accuracy")),
+            "timeliness": _number(metrics.get("timeliness")),
+            "damage_score": _number(metrics.get("package_quality")),
+            "assessment_status": _label(assessment.get("status")),
+            "created_at": created_at,
+        }],
+        "vision_analysis": [],
+        "damage_analysis": [],
+    }
+
+    caption = workflow_output.get("caption_json")
+    if isinstance(caption, dict) and "error" not in caption:
+        location = caption.get("location") or {}
+        environment = caption.get("environment") or {}
+        safety = caption.get("safetyAssessment") or {}
+        rows["vision_analysis"].append({
+            "delivery_id": delivery_id,
+            "scene_type": _label(caption.get("sceneType")),
+            "package_visible": _flag(caption.get("packageVisible")),
+            "package_description": caption.get("packageDescription"),
+            "location_type": _label(location.get("type")),
+            "location_description": location.get("description"),
+            "weather": _label(environment.get("weather")),
+            "time_of_day": _label(environment.get("timeOfDay")),
+            "safety_protected": _flag(safety.get("protected")),
+            "safety_visible": _flag(safety.get("visible")),
+            "safety_secure": _flag(safety.get("secure")),
+            "overall_description": caption.get("overallDescription"),
+        })
+
+    damage = workflow_output.get("damage_report")
+    if isinstance(damage, dict) and isinstance(damage.get("overall"), dict):
+        indicators = damage.get("indicators") or {}
+        row = {
+            "delivery_id": delivery_id,
+            "overall_severity": _label(damage["overall"].get("severity")),
+            "overall_score": _number(damage["overall"].get("score")),
+        }
+        for name, column in INDICATOR_COLUMNS.items():
+            indicator = indicators.get(name) or {}
+            row[f"{column}_present"] = _flag(indicator.get("present"))
+            row[f"{column}_severity"] = _label(indicator.get("severity"))
+        rows["damage_analysis"].append(row)
+
+    return partition, rows
+
+
+class ParquetResultStore:
+    """Buffers flattened rows and writes one Parquet file per table and partition on flush."""
+
+    def __init__(self, config: ResultStoreConfig, clock: Callable[[], float] = time.time):
+        _require_pyarrow()
+        self.config = config
+        self.schemas = table_schemas()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer: Dict[Tuple[str, Partition], List[Dict[str, Any]]] = defaultdict(list)
+        self._buffered_rows = 0
+        self._last_flush = clock()
+        self._written: Dict[str, Dict[str, int]] = {
+            table: {"rows": 0, "files": 0, "compressed_bytes": 0, "uncompressed_bytes": 0} for table in self.schemas
+        }
+
+    def append(self, workflow_output: Dict[str, Any]) -> None:
+        created_at = datetime.fromtimestamp(self._clock(), tz=timezone.utc)
+        partition, rows = flatten_result(workflow_output, created_at)
+        with self._lock:
+            for table, table_rows in rows.items():
+                if table_rows:
+                    self._buffer[(table, partition)].extend(table_rows)
+                    self._buffered_rows += len(table_rows)
+            due = (
+                self._buffered_rows >= self.config.max_buffered_rows
+                or self._clock() - self._last_flush >= self.config.flush_interval_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> List[str]:
+        """Write buffered rows; returns the paths of the new files."""
+        with self._flush_lock:
+            with self._lock:
+                buffer, self._buffer = self._buffer, defaultdict(list)
+                self._buffered_rows = 0
+                self._last_flush = self._clock()
+            paths = []
+            for (table, (day, region)), rows in buffer.items():
+                directory = os.path.join(self.config.path, table, f"date={day}", f"region={region}")
+                path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                    pq.write_table(
+                        pa.Table.from_pylist(rows, schema=self.schemas[table]),
+                        path,
+                        compression=self.config.compression,
+                        row_group_size=self.config.row_group_rows,
+                    )
+                except Exception as error:
+                    print(f"Warning: writing {len(rows)} {table} rows failed, keeping them buffered: {error}")
+                    with self._lock:
+                        self._buffer[(table, (day, region))].extend(rows)
+                        self._buffered_rows += len(rows)
+                    continue
+                compressed, uncompressed = _column_chunk_bytes(path)
+                stats = self._written[table]
+                stats["rows"] += len(rows)
+                stats["files"] += 1
+                stats["compressed_bytes"] += compressed
+                stats["uncompressed_bytes"] += uncompressed
+                paths.append(path)
+            return paths
+
+    def scan(self, table: str, columns: Sequence[str], filter: Any = None) -> "pa.Table":
+        """Read only ``columns`` of ``table``; ``date`` and ``region`` come from the partition path."""
+        dataset = ds.dataset(os.path.join(self.config.path, table), format="parquet", partitioning="hive")
+        return dataset.to_table(columns=list(columns), filter=filter)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Rows, files and compression ratio written per table."""
+        with self._lock:
+            written = {table: dict(stats) for table, stats in self._written.items()}
+        for stats in written.values():
+            compressed = stats["compressed_bytes"]
+            stats["compression_ratio"] = round(stats["uncompressed_bytes"] / compressed, 2) if compressed else None
+        return written
+
+
+def _column_chunk_bytes(path: str) -> Tuple[int, int]:
+    metadata = pq.ParquetFile(path).metadata
+    compressed = uncompressed = 0
+    for group in range(metadata.num_row_groups):
+        row_group = metadata.row_group(group)
+        for column in range(row_group.num_columns):
+            chunk = row_group.column(column)
+            compressed += chunk.total_compressed_size
+            uncompressed += chunk.total_uncompressed_size
+    return compressed, uncompressed
+
+
+def column_bytes(root: str, table: str) -> Dict[str, int]:
+    """Compressed bytes per column across a table's files: what a column-pruned scan reads."""
+    _require_pyarrow()
+    totals: Dict[str, int] = defaultdict(int)
+    for fragment in ds.dataset(os.path.join(root, table), format="parquet", partitioning="hive").get_fragments():
+        metadata = fragment.metadata
+        for group in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group)
+            for column in range(row_group.num_columns):
+                chunk = row_group.column(column)
+                totals[chunk.path_in_schema] += chunk.total_compressed_size
+    return dict(totals)
+
+
+_store: Optional[ParquetResultStore] = None
+_store_lock = threading.Lock()
+
+
+def shared_result_store(config: ResultStoreConfig) -> Optional[ParquetResultStore]:
+    """Process-wide store, or None when disabled; buffered rows flush at exit."""
+    global _store
+    if not config.enabled:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ParquetResultStore(config)
+            atexit.register(_store.flush)
+        return _store
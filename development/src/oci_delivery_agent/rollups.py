@@ -0,0 +1,285 @@
+"""Incremental ``driver_performance`` rollups fed by each pipeline result.
+
+Every result updates per (driver, day) running sums and a per-driver trend in
+O(1). Pending sums are flushed as deltas into a SQLite ``driver_performance``
+table on an interval, so the Driver dashboard reads precomputed rows instead
+of scanning ``delivery_quality_events``. Deltas add up on conflict, so several
+function instances can share one table.
+"""
+from __future__ import annotations
+
+import atexit
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import DriverRollupConfig
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS driver_performance (
+    driver_id TEXT NOT NULL,
+    performance_date TEXT NOT NULL,
+    avg_quality_score REAL NOT NULL,
+    on_time_percentage REAL NOT NULL,
+    total_deliveries INTEGER NOT NULL,
+    quality_trend TEXT NOT NULL,
+    quality_sum REAL NOT NULL,
+    on_time_deliveries INTEGER NOT NULL,
+    trend_score REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (driver_id, performance_date)
+);
+"""
+
+# Column references on the right of SET see the row as it was before the update
+_UPSERT = """
+INSERT INTO driver_performance (
+    driver_id, performance_date, avg_quality_score, on_time_percentage, total_deliveries,
+    quality_trend, quality_sum, on_time_deliveries, trend_score, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (driver_id, performance_date) DO UPDATE SET
+    total_deliveries = total_deliveries + excluded.total_deliveries,
+    quality_sum = quality_sum + excluded.quality_sum,
+    on_time_deliveries = on_time_deliveries + excluded.on_time_deliveries,
+    avg_quality_score = ROUND(
+        (quality_sum + excluded.quality_sum) / (total_deliveries + excluded.total_deliveries), 2
+    ),
+    on_time_percentage = ROUND(
+        100.0 * (on_time_deliveries + excluded.on_time_deliveries) / (total_deliveries + excluded.total_deliveries), 2
+    ),
+    quality_trend = excluded.quality_trend,
+    trend_score = excluded.trend_score,
+    updated_at = excluded.updated_at
+"""
+
+
+@dataclass
+class DayTotals:
+    """Sums for one (driver, day) not yet written to the table."""
+
+    deliveries: int = 0
+    quality_sum: float = 0.0
+    on_time: int = 0
+
+
+@dataclass
+class DriverTrend:
+    """Fast and slow EWMAs of a driver's quality index; their gap is the trend."""
+
+    fast: float = 0.0
+    slow: float = 0.0
+    samples: int = 0
+
+    def update(self, quality: float, fast_alpha: float, slow_alpha: float) -> None:
+        if self.samples == 0:
+            self.fast = self.slow = quality
+        else:
+            self.fast += fast_alpha * (quality - self.fast)
+            self.slow += slow_alpha * (quality - self.slow)
+        self.samples += 1
+
+    @property
+    def score(self) -> float:
+        return self.fast - self.slow
+
+    def label(self, threshold: float, min_samples: int) -> str:
+        if self.samples < min_samples:
+            return "stable"
+        if self.score > threshold:
+            return "improving"
+        if self.score < -threshold:
+            return "declining"
+        return "stable"
+
+
+def _utc(moment: datetime) -> datetime:
+    if moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+class DriverPerformanceStore:
+    """SQLite ``driver_performance`` table shaped after docs/dashboard-specification.md."""
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def apply(self, rows: List[Tuple[Any, ...]]) -> None:
+        """Add one batch of deltas in a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(_UPSERT, rows)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def rows(self, driver_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Dashboard columns, newest day first."""
+        query = (
+            "SELECT driver_id, performance_date, avg_quality_score, on_time_percentage, total_deliveries, quality_trend "
+            "FROM driver_performance"
+        )
+        params: Tuple[Any, ...] = ()
+        if driver_id is not None:
+            query += " WHERE driver_id = ?"
+            params = (driver_id,)
+        query += " ORDER BY performance_date DESC, driver_id"
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+class DriverPerformanceRollup:
+    """In-memory rollup that flushes deltas to a ``DriverPerformanceStore``."""
+
+    def __init__(
+        self,
+        config: DriverRollupConfig,
+        store: Optional[DriverPerformanceStore] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.config = config
+        self.store = store if store is not None else DriverPerformanceStore(config.path)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Tuple[str, date], DayTotals] = {}
+        self._trends: Dict[str, DriverTrend] = {}
+        self._last_flush = clock()
+        self.recorded = 0
+        self.skipped = 0
+        self.flushes = 0
+
+    def add(self, driver_id: str, day: date, quality_index: float, on_time: bool) -> None:
+        """Fold one delivery into the running sums; flushes when a bound is reached."""
+        config = self.config
+        with self._lock:
+            totals = self._pending.get((driver_id, day))
+            if totals is None:
+                totals = self._pending[(driver_id, day)] = DayTotals()
+            totals.deliveries += 1
+            totals.quality_sum += quality_index
+            totals.on_time += on_time
+
+            trend = self._trends.get(driver_id)
+            if trend is None:
+                trend = self._trends[driver_id] = DriverTrend()
+            trend.update(quality_index, config.trend_fast_alpha, config.trend_slow_alpha)
+
+            self.recorded += 1
+            due = (
+                len(self._pending) >= config.max_pending_rows
+                or self._clock() - self._last_flush >= config.flush_interval_seconds
+            )
+        if due:
+            self.flush()
+
+    def record(self, workflow_output: Dict[str, Any]) -> bool:
+        """Add one ``run_quality_pipeline`` result; results without a driver are skipped."""
+        context = workflow_output.get("context") or {}
+        quality_index = (workflow_output.get("quality_metrics") or {}).get("quality_index")
+        driver_id = context.get("driver_id")
+        if not driver_id or quality_index is None:
+            with self._lock:
+                self.skipped += 1
+            return False
+        promised = _utc(datetime.fromisoformat(context["promised_time_utc"]))
+        delivered = _utc(datetime.fromisoformat(context["delivered_time_utc"]))
+        self.add(str(driver_id), delivered.date(), float(quality_index), delivered <= promised)
+        return True
+
+    def flush(self) -> int:
+        """Write pending deltas; returns the number of (driver, day) rows written."""
+        config = self.config
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._last_flush = self._clock()
+                trends = {
+                    driver_id: (
+                        self._trends[driver_id].label(config.trend_threshold, config.trend_min_samples),
+                        round(self._trends[driver_id].score, 4),
+                    )
+                    for driver_id, _ in pending
+                }
+            if not pending:
+                return 0
+
+            now = self._clock()
+            rows = []
+            for (driver_id, day), totals in pending.items():
+                label, score = trends[driver_id]
+                rows.append((
+                    driver_id,
+                    day.isoformat(),
+                    round(totals.quality_sum / totals.deliveries, 2),
+                    round(100.0 * totals.on_time / totals.deliveries, 2),
+                    totals.deliveries,
+                    label,
+                    totals.quality_sum,
+                    totals.on_time,
+                    score,
+                    now,
+                ))
+            try:
+                self.store.apply(rows)
+            except Exception as error:
+                print(f"Warning: driver_performance flush failed, keeping {len(pending)} rows pending: {error}")
+                self._restore(pending)
+                return 0
+            self.flushes += 1
+            return len(rows)
+
+    def _restore(self, pending: Dict[Tuple[str, date], DayTotals]) -> None:
+        with self._lock:
+            for key, totals in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = totals
+                else:
+                    current.deliveries += totals.deliveries
+                    current.quality_sum += totals.quality_sum
+                    current.on_time += totals.on_time
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "recorded": self.recorded,
+                "skipped": self.skipped,
+                "pending_rows": len(self._pending),
+                "drivers": len(self._trends),
+                "flushes": self.flushes,
+            }
+
+
+_rollup: Optional[DriverPerformanceRollup] = None
+_rollup_lock = threading.Lock()
+
+
+def shared_driver_rollup(config: DriverRollupConfig) -> Optional[DriverPerformanceRollup]:
+    """Process-wide rollup, or None when rollups are disabled; pending rows flush at exit."""
+    global _rollup
+    if not config.enabled:
+        return None
+    with _rollup_lock:
+        if _rollup is None:
+            _rollup = DriverPerformanceRollup(config)
+            atexit.register(_rollup.flush)
+        return _rollup
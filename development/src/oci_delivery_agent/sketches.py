@@ -0,0 +1,304 @@
+"""Mergeable per-hour quantile sketches for driver, route and region percentiles.
+
+Scores leave ``compute_quality_index`` rounded to three decimals, so a sparse
+count per 0.001 level is an exact sketch of at most 1001 bins: merging is
+adding counts, and any window's p10/p50/p90 comes from merging its hourly
+sketches. Sketches are updated as results are produced and flushed to a
+SQLite ``quality_sketches`` table as compact varint blobs.
+"""
+from __future__ import annotations
+
+import atexit
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from .config import SketchConfig
+
+RESOLUTION = 1000
+ENTITY_FIELDS = {"driver": "driver_id", "route": "route_id", "region": "region"}
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+_FORMAT_VERSION = 1
+_EPOCH = datetime(1970, 1, 1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quality_sketches (
+    entity_type TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    sketch BLOB NOT NULL,
+    PRIMARY KEY (entity_type, entity_id, metric, hour)
+);
+"""
+
+SketchKey = Tuple[str, str, str, int]
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _varints(data: bytes, offset: int = 0) -> Iterable[int]:
+    value = shift = 0
+    for byte in memoryview(data)[offset:]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+
+def hour_of(moment: datetime) -> int:
+    """Hours since the epoch; naive datetimes are taken as UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((moment - _EPOCH).total_seconds() // 3600)
+
+
+class QuantileSketch:
+    """Counts per 0.001 level in [0, 1]; exact for scores rounded to three decimals."""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+
+    def add(self, value: float, count: int = 1) -> None:
+        level = min(max(round(value * RESOLUTION), 0), RESOLUTION)
+        self.counts[level] = self.counts.get(level, 0) + count
+        self.total += count
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        counts = self.counts
+        for level, count in other.counts.items():
+            counts[level] = counts.get(level, 0) + count
+        self.total += other.total
+        return self
+
+    def merge_bytes(self, data: bytes) -> "QuantileSketch":
+        """Merge a serialized sketch without building an intermediate object."""
+        if not data or data[0] != _FORMAT_VERSION:
+            raise ValueError("Unsupported quantile sketch format")
+        counts = self.counts
+        values = _varints(data, 1)
+        level = 0
+        for delta in values:
+            level += delta
+            count = next(values)
+            counts[level] = counts.get(level, 0) + count
+            self.total += count
+        return self
+
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[float, Optional[float]]:
+        """Nearest-rank quantiles: the smallest value with at least ``q * total`` values at or below it."""
+        if self.total == 0:
+            return {q: None for q in qs}
+        targets = sorted((max(1, math.ceil(round(q * self.total, 9))), q) for q in qs)
+        answers: Dict[float, Optional[float]] = {}
+        seen = 0
+        position = 0
+        for level in sorted(self.counts):
+            seen += self.counts[level]
+            while position < len(targets) and targets[position][0] <= seen:
+                answers[targets[position][1]] = level / RESOLUTION
+                position += 1
+            if position == len(targets):
+                break
+        return {q: answers[q] for q in qs}
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles((q,))[q]
+
+    def to_bytes(self) -> bytes:
+        """Version byte, then (level delta, count) varint pairs in level order."""
+        out = bytearray((_FORMAT_VERSION,))
+        previous = 0
+        for level in sorted(self.counts):
+            _put_varint(out, level - previous)
+            _put_varint(out, self.counts[level])
+            previous = level
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "QuantileSketch":
+        return cls().merge_bytes(data)
+
+
+class QualitySketchStore:
+    """SQLite table of serialized hourly sketches."""
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def merge_in(self, sketches: Dict[SketchKey, QuantileSketch]) -> None:
+        """Merge pending sketches into the stored ones in a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, sketch in sketches.items():
+                    row = self._conn.execute(
+                        "SELECT sketch FROM quality_sketches "
+                        "WHERE entity_type = ? AND entity_id = ? AND metric = ? AND hour = ?",
+                        key,
+                    ).fetchone()
+                    merged = QuantileSketch().merge(sketch)
+                    if row is not None:
+                        merged.merge_bytes(row[0])
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO quality_sketches "
+                        "(entity_type, entity_id, metric, hour, count, sketch) VALUES (?, ?, ?, ?, ?, ?)",
+                        (*key, merged.total, merged.to_bytes()),
+                    )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def window(self, entity_type: str, entity_id: str, metric: str, start_hour: int, end_hour: int) -> Tuple[QuantileSketch, int]:
+        """Merged sketch for hours in ``[start_hour, end_hour)`` and the number of sketches merged."""
+        with self._lock:
+            blobs = self._conn.execute(
+                "SELECT sketch FROM quality_sketches "
+                "WHERE entity_type = ? AND entity_id = ? AND metric = ? AND hour >= ? AND hour < ?",
+                (entity_type, entity_id, metric, start_hour, end_hour),
+            ).fetchall()
+        merged = QuantileSketch()
+        for (blob,) in blobs:
+            merged.merge_bytes(blob)
+        return merged, len(blobs)
+
+
+class QualitySketches:
+    """Pending hourly sketches per (entity, metric), flushed to a ``QualitySketchStore``."""
+
+    def __init__(
+        self,
+        config: SketchConfig,
+        store: Optional[QualitySketchStore] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.config = config
+        self.store = store if store is not None else QualitySketchStore(config.path)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[SketchKey, QuantileSketch] = {}
+        self._last_flush = clock()
+        self.recorded = 0
+        self.flushes = 0
+
+    def add(self, entity_type: str, entity_id: str, metric: str, hour: int, value: float) -> None:
+        with self._lock:
+            key = (entity_type, entity_id, metric, hour)
+            sketch = self._pending.get(key)
+            if sketch is None:
+                sketch = self._pending[key] = QuantileSketch()
+            sketch.add(value)
+            due = (
+                len(self._pending) >= self.config.max_pending_sketches
+                or self._clock() - self._last_flush >= self.config.flush_interval_seconds
+            )
+        if due:
+            self.flush()
+
+    def record(self, workflow_output: Dict[str, Any]) -> int:
+        """Add one ``run_quality_pipeline`` result to every entity it names; returns sketches touched."""
+        context = workflow_output.get("context") or {}
+        metrics = workflow_output.get("quality_metrics") or {}
+        if "delivered_time_utc" not in context:
+            return 0
+        hour = hour_of(datetime.fromisoformat(context["delivered_time_utc"]))
+        touched = 0
+        for entity_type, field_name in ENTITY_FIELDS.items():
+            entity_id = context.get(field_name)
+            if not entity_id:
+                continue
+            for metric in self.config.metrics:
+                if metrics.get(metric) is not None:
+                    self.add(entity_type, str(entity_id), metric, hour, float(metrics[metric]))
+                    touched += 1
+        if touched:
+            with self._lock:
+                self.recorded += 1
+        return touched
+
+    def flush(self) -> int:
+        """Merge pending sketches into the store; returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._last_flush = self._clock()
+            if not pending:
+                return 0
+            try:
+                self.store.merge_in(pending)
+            except Exception as error:
+                print(f"Warning: quality sketch flush failed, keeping {len(pending)} sketches pending: {error}")
+                with self._lock:
+                    for key, sketch in pending.items():
+                        current = self._pending.get(key)
+                        self._pending[key] = sketch if current is None else current.merge(sketch)
+                return 0
+            self.flushes += 1
+            return len(pending)
+
+    def quantiles(
+        self,
+        entity_type: str,
+        entity_id: str,
+        start: datetime,
+        end: datetime,
+        metric: str = "quality_index",
+        qs: Sequence[float] = DEFAULT_QUANTILES,
+    ) -> Dict[str, Any]:
+        """Quantiles of ``metric`` for one entity over ``[start, end)`` from the stored sketches."""
+        sketch, merged = self.store.window(entity_type, entity_id, metric, hour_of(start), hour_of(end))
+        return {
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "metric": metric,
+            "count": sketch.total,
+            "sketches_merged": merged,
+            "quantiles": {f"p{round(q * 100):g}": value for q, value in sketch.quantiles(qs).items()},
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"recorded": self.recorded, "pending_sketches": len(self._pending), "flushes": self.flushes}
+
+
+_sketches: Optional[QualitySketches] = None
+_sketches_lock = threading.Lock()
+
+
+def shared_quality_sketches(config: SketchConfig) -> Optional[QualitySketches]:
+    """Process-wide sketches, or None when disabled; pending sketches flush at exit."""
+    global _sketches
+    if not config.enabled:
+        return None
+    with _sketches_lock:
+        if _sketches is None:
+            _sketches = QualitySketches(config)
+            atexit.register(_sketches.flush)
+        return _sketches
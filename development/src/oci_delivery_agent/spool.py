@@ -0,0 +1,300 @@
+"""Durable on-disk spool decoupling event ingest from vision processing."""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .chains import DeliveryContext
+from .concurrency import AdaptiveLimiter, is_throttle
+from .config import SpoolConfig
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    visible_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS spool_visible ON spool (visible_at, id);
+CREATE TABLE IF NOT EXISTS dead_letter (
+    id INTEGER PRIMARY KEY,
+    event TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    failed_at REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT
+);
+"""
+
+
+def context_to_event(context: DeliveryContext) -> Dict[str, Any]:
+    return {
+        "object_name": context.object_name,
+        "expected_latitude": context.expected_latitude,
+        "expected_longitude": context.expected_longitude,
+        "promised_time_utc": context.promised_time_utc.isoformat(),
+        "delivered_time_utc": context.delivered_time_utc.isoformat(),
+        "driver_id": context.driver_id,
+        "route_id": context.route_id,
+        "region": context.region,
+        "stop_id": context.stop_id,
+    }
+
+
+def context_from_event(event: Dict[str, Any]) -> DeliveryContext:
+    return DeliveryContext(
+        object_name=event["object_name"],
+        expected_latitude=float(event["expected_latitude"]),
+        expected_longitude=float(event["expected_longitude"]),
+        promised_time_utc=datetime.fromisoformat(event["promised_time_utc"]),
+        delivered_time_utc=datetime.fromisoformat(event["delivered_time_utc"]),
+        driver_id=event.get("driver_id"),
+        route_id=event.get("route_id"),
+        region=event.get("region"),
+        stop_id=event.get("stop_id"),
+    )
+
+
+# Outcomes of ``EventSpool.nack``
+RETRIED = "retried"
+DEAD_LETTERED = "dead_lettered"
+# The visibility timeout expired and another worker owns the event now
+LOST_CLAIM = "lost_claims"
+
+
+class DegradedResultError(RuntimeError):
+    """The pipeline finished, but a vision stage returned an error instead of an analysis."""
+
+
+def vision_stage_error(result: Any) -> Optional[str]:
+    """The caption or damage error in a pipeline result, or None when both stages produced an analysis.
+
+    Photos rejected by the usability gate are a deliberate outcome, not an error.
+    """
+    if not isinstance(result, dict):
+        return None
+    caption = result.get("caption_json")
+    if isinstance(caption, dict) and "error" in caption and caption["error"] != "unusable_photo":
+        return f"caption: {caption['error']}"
+    damage = result.get("damage_report")
+    if isinstance(damage, dict) and "error" in damage:
+        return f"damage: {damage['error']}"
+    return None
+
+
+@dataclass
+class SpoolItem:
+    """A claimed event; invisible to other workers until acked, nacked or timed out."""
+
+    id: int
+    context: DeliveryContext
+    attempts: int
+    enqueued_at: float
+    claimed_by: str
+
+
+class EventSpool:
+    """SQLite-backed queue with visibility timeouts, retry counts and a dead-letter table.
+
+    Ingest is a single indexed insert in WAL mode, so its latency does not
+    depend on how fast the vision backend drains the queue.
+    """
+
+    def __init__(self, path: str, config: SpoolConfig, clock: Callable[[], float] = time.time):
+        self.config = config
+        self._clock = clock
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, context: DeliveryContext) -> int:
+        now = self._clock()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO spool (event, enqueued_at, visible_at) VALUES (?, ?, ?)",
+                (json.dumps(context_to_event(context)), now, now),
+            )
+            return int(cursor.lastrowid)
+
+    def claim(self, worker_id: str) -> Optional[SpoolItem]:
+        """Claim the oldest visible event, hiding it for the visibility timeout."""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, event, attempts, enqueued_at FROM spool WHERE visible_at <= ? ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE spool SET visible_at = ?, attempts = attempts + 1, claimed_by = ? WHERE id = ?",
+                    (now + self.config.visibility_timeout_seconds, worker_id, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return SpoolItem(
+            id=row[0],
+            context=context_from_event(json.loads(row[1])),
+            attempts=row[2] + 1,
+            enqueued_at=row[3],
+            claimed_by=worker_id,
+        )
+
+    def ack(self, item: SpoolItem) -> bool:
+        """Remove a processed event; False when the claim expired and another worker reclaimed it."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM spool WHERE id = ? AND claimed_by = ?", (item.id, item.claimed_by)
+            )
+            return cursor.rowcount == 1
+
+    def nack(self, item: SpoolItem, error: str) -> str:
+        """Return the event for retry with backoff; dead-letter it once attempts are exhausted.
+
+        Returns ``RETRIED``, ``DEAD_LETTERED``, or ``LOST_CLAIM`` when the event is
+        no longer claimed by this worker and was left to its new owner.
+        """
+        now = self._clock()
+        with self._lock:
+            if item.attempts >= self.config.max_attempts:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO dead_letter (id, event, enqueued_at, failed_at, attempts, last_error) "
+                        "SELECT id, event, enqueued_at, ?, attempts, ? FROM spool WHERE id = ? AND claimed_by = ?",
+                        (now, error, item.id, item.claimed_by),
+                    )
+                    moved = self._conn.execute(
+                        "DELETE FROM spool WHERE id = ? AND claimed_by = ?", (item.id, item.claimed_by)
+                    ).rowcount
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                return DEAD_LETTERED if moved == 1 else LOST_CLAIM
+            backoff = min(
+                self.config.retry_backoff_seconds * (2 ** (item.attempts - 1)),
+                self.config.max_retry_backoff_seconds,
+            )
+            cursor = self._conn.execute(
+                "UPDATE spool SET visible_at = ?, claimed_by = NULL, last_error = ? WHERE id = ? AND claimed_by = ?",
+                (now + backoff, error, item.id, item.claimed_by),
+            )
+            return RETRIED if cursor.rowcount == 1 else LOST_CLAIM
+
+    def depth(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM spool").fetchone()[0])
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, event, attempts, last_error, failed_at FROM dead_letter ORDER BY id"
+            ).fetchall()
+        return [
+            {"id": row[0], "event": json.loads(row[1]), "attempts": row[2], "last_error": row[3], "failed_at": row[4]}
+            for row in rows
+        ]
+
+
+class SpoolWorkerPool:
+    """Threads that drain the spool no faster than the adaptive governor allows.
+
+    Each worker takes a governor slot before claiming an event, so the number
+    of pipelines in flight tracks the AIMD limit: it shrinks when processing
+    slows down or GenAI throttles, and grows back as the backend recovers.
+    """
+
+    def __init__(
+        self,
+        spool: EventSpool,
+        process: Callable[[DeliveryContext], Any],
+        governor: AdaptiveLimiter,
+        workers: int = 4,
+        idle_sleep_seconds: float = 0.5,
+    ):
+        self._spool = spool
+        self._process = process
+        self._governor = governor
+        self._workers = workers
+        self._idle_sleep = idle_sleep_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self.stats = {"processed": 0, RETRIED: 0, DEAD_LETTERED: 0, LOST_CLAIM: 0}
+
+    def _bump(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def run_once(self, worker_id: str) -> bool:
+        """Process a single event; return False when the spool had nothing visible."""
+        if not self._governor.acquire(timeout=self._idle_sleep):
+            return True
+        try:
+            item = self._spool.claim(worker_id)
+            if item is None:
+                return False
+            started = time.perf_counter()
+            try:
+                self._process(item.context)
+            except Exception as err:
+                if is_throttle(err):
+                    self._governor.on_throttle()
+                else:
+                    self._governor.on_error()
+                outcome = self._spool.nack(item, f"{type(err).__name__}: {err}")
+                if outcome == LOST_CLAIM:
+                    print(f"Warning: spool event {item.id} outlived its visibility timeout; left to its new owner")
+                self._bump(outcome)
+                return True
+            self._governor.on_success(time.perf_counter() - started)
+            if self._spool.ack(item):
+                self._bump("processed")
+            else:
+                print(f"Warning: spool event {item.id} outlived its visibility timeout and was reclaimed before its ack")
+                self._bump(LOST_CLAIM)
+            return True
+        finally:
+            self._governor.release()
+
+    def _loop(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            if not self.run_once(worker_id):
+                self._stop.wait(self._idle_sleep)
+
+    def start(self) -> None:
+        for index in range(self._workers):
+            worker_id = f"{uuid.uuid4().hex[:8]}-{index}"
+            thread = threading.Thread(target=self._loop, args=(worker_id,), name=f"spool-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
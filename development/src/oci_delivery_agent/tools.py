@@ -1,18 +1,28 @@
 """LangChain tools wrapping OCI services for the delivery workflow."""
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
 import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from langchain.tools import BaseTool
 from PIL import Image, ExifTags
 
-from .config import WorkflowConfig
+from .balancer import resolve_endpoints, shared_balancer
+from .cache import sha256_hex, shared_cache, shared_object_cache
+from .cascade import resolve_fast_endpoints, run_cascade
+from .compact import decode_caption, decode_damage, has_known_severities
+from .concurrency import GENAI_VISION, OBJECT_STORAGE, limiter_for
+from .config import GenAIEndpoint, WorkflowConfig
+from .deadline import Deadline, DeadlineExceeded, ThreadLocalClients, apply_request_timeout
+from .hedging import shared_hedger
+from .json_extract import JsonObjectTracker, extract_json_object
+from .prompts import PromptSet, caption_context_splice, compiled_prompts
 
 try:  # pragma: no cover - optional dependency for real OCI calls
     import oci
@@ -20,12 +30,21 @@ except Exception:  # pragma: no cover - fall back to local mode when OCI SDK mis
     oci = None
 
 
+class ObjectNotFoundError(FileNotFoundError):
+    """Object Storage answered 404 (now or within the missing-object TTL)."""
+
+
 class ObjectStorageClient:
     """Wrapper that prefers live OCI access but supports local testing."""
 
-    def __init__(self, config: WorkflowConfig):
+    def __init__(self, config: WorkflowConfig, deadline: Optional[Deadline] = None):
         self._config = config
-        self._client = self._build_oci_client()
+        self._deadline = deadline
+        # Per-thread SDK clients, since the deadline timeout is set on the client itself
+        self._clients = ThreadLocalClients(lambda _key: self._build_oci_client())
+        self._limiter = limiter_for(OBJECT_STORAGE, config.concurrency)
+        self._cache = shared_object_cache(config.object_cache)
+        self._missing = shared_cache("missing_objects", config.missing_object_cache)
 
     def _build_oci_client(self):  # pragma: no cover - requires OCI SDK & credentials
         if oci is None:
@@ -61,31 +80,77 @@ class ObjectStorageClient:
             },
         }
 
+    def _get_oci_object(self, resolved_name: str) -> Dict[str, Any]:
+        """Read through the ETag cache: serve fresh entries, revalidate stale ones, download misses."""
+        storage = self._config.object_storage
+        cache_key = f"{storage.namespace}/{storage.bucket_name}/{resolved_name}"
+        cached = self._cache.lookup(cache_key) if self._cache is not None else None
+        if cached is not None and self._cache.is_fresh(cached):
+            return self._object_result(resolved_name, cached.data, cached.content_type, cached.etag, "cache")
+
+        conditional = {"if_none_match": cached.etag} if cached is not None and cached.etag else {}
+        client = self._clients.get()
+        apply_request_timeout(client, self._deadline, self._config.time_budget)
+        try:
+            response = self._limiter.call(lambda: client.get_object(
+                namespace_name=storage.namespace,
+                bucket_name=storage.bucket_name,
+                object_name=resolved_name,
+                **conditional,
+            ), self._deadline)
+        except Exception as err:
+            status = getattr(err, "status", None)
+            if conditional and status == 304:
+                cached = self._cache.not_modified(cache_key, cached)
+                return self._object_result(resolved_name, cached.data, cached.content_type, cached.etag, "cache_revalidated")
+            if status == 404:
+                if cached is not None:
+                    self._cache.forget(cache_key)
+                if self._missing is not None:
+                    self._missing.set(cache_key, b"404")
+                raise ObjectNotFoundError(f"Object {resolved_name} not found in {storage.bucket_name}") from err
+            raise
+
+        payload = response.data.content
+        content_type = response.headers.get("Content-Type", "application/octet-stream")
+        etag = response.headers.get("ETag")
+        if self._cache is not None:
+            self._cache.store_object(cache_key, payload, etag, content_type)
+        return self._object_result(resolved_name, payload, content_type, etag, "oci")
+
+    @staticmethod
+    def _object_result(
+        resolved_name: str, payload: bytes, content_type: str, etag: Optional[str], source: str
+    ) -> Dict[str, Any]:
+        metadata = {
+            "content_type": content_type,
+            "size": len(payload),
+            "object_name": resolved_name,
+            "retrieved_at": datetime.utcnow().isoformat(),
+            "source": source,
+        }
+        if etag:
+            metadata["etag"] = etag
+        return {"data": payload, "metadata": metadata}
+
     def get_object(self, object_name: str) -> Dict[str, Any]:
         resolved_name = self._resolve_object_name(object_name)
         
         # Try OCI first if client exists and namespace/bucket are not test values
-        if (self._client is not None and 
-            self._config.object_storage.namespace != "test" and 
-            self._config.object_storage.bucket_name != "test"):  # pragma: no cover - network interaction
+        storage = self._config.object_storage
+        if (self._clients.get() is not None and 
+            storage.namespace != "test" and 
+            storage.bucket_name != "test"):  # pragma: no cover - network interaction
+            missing_key = f"{storage.namespace}/{storage.bucket_name}/{resolved_name}"
+            if self._missing is not None and self._missing.get(missing_key) is not None:
+                raise ObjectNotFoundError(f"Object {resolved_name} not found in {storage.bucket_name} (cached 404)")
             try:
-                response = self._client.get_object(
-                    namespace_name=self._config.object_storage.namespace,
-                    bucket_name=self._config.object_storage.bucket_name,
-                    object_name=resolved_name,
-                )
-                payload = response.data.content
-                metadata = {
-                    "content_type": response.headers.get("Content-Type", "application/octet-stream"),
-                    "size": len(payload),
-                    "object_name": resolved_name,
-                    "retrieved_at": datetime.utcnow().isoformat(),
-                    "source": "oci",
-                }
-                return {"data": payload, "metadata": metadata}
-            except Exception:
-                # Fall back to local on any error
-                pass
+                return self._get_oci_object(resolved_name)
+            except (ObjectNotFoundError, DeadlineExceeded):
+                raise
+            except Exception as err:
+                # Transient or configuration errors fall back to local assets
+                print(f"Warning: Object Storage read failed for {resolved_name}, trying local assets: {err}")
 
         # Use local fallback
         local = self._load_local_file(resolved_name)
@@ -99,46 +164,90 @@ class ObjectStorageClient:
 class VisionClient:
     """Wrapper around OCI Vision deployments."""
 
-    def __init__(self, config: WorkflowConfig):
+    def __init__(self, config: WorkflowConfig, deadline: Optional[Deadline] = None):
         self._config = config
-        self._client = None
+        self._deadline = deadline
+        self._clients = ThreadLocalClients(self._build_genai_client)
+        self._hedger = shared_hedger(config.hedging)
+        self._limiter = limiter_for(GENAI_VISION, config.concurrency)
+        self._cache = shared_cache("vision", config.vision_cache)
+
+    def _cache_key(
+        self, image_bytes: bytes, prompt_version: str, splice: str, endpoints: List[GenAIEndpoint]
+    ) -> Optional[str]:
+        """Image digest + prompt version + caption-context digest + model OCIDs; None when caching is disabled."""
+        if self._cache is None:
+            return None
+        models = "+".join(endpoint.model_ocid for endpoint in endpoints)
+        return f"{sha256_hex(image_bytes)}:{prompt_version}:{sha256_hex(splice)}:{models}"
 
-    def _get_genai_client(self):
-        """Initialize OCI GenAI client for vision"""
-        if self._client is None:
+    def _build_genai_client(self, hostname: str):
+        """Initialize OCI GenAI client for vision, one per endpoint hostname and thread"""
+        try:
+            import oci
+            from oci.generative_ai_inference import GenerativeAiInferenceClient
+            
+            # Load OCI configuration
             try:
-                import oci
-                from oci.generative_ai_inference import GenerativeAiInferenceClient
-                
-                # Load OCI configuration
-                try:
-                    oci_config = oci.config.from_file()
-                except Exception as config_error:
-                    print(f"Warning: Could not load OCI config file: {config_error}")
-                    oci_config = oci.config.from_file("~/.oci/config")
-                
-                # Get GenAI configuration from environment
-                hostname = os.environ.get('OCI_GENAI_HOSTNAME')
-                if not hostname:
-                    raise ValueError("OCI_GENAI_HOSTNAME must be set")
-                
-                # Remove endpoint path if included in hostname
-                if '/20231130/actions/generateText' in hostname:
-                    hostname = hostname.replace('/20231130/actions/generateText', '')
-                
-                # Initialize GenAI client
-                self._client = GenerativeAiInferenceClient(
-                    config=oci_config,
-                    service_endpoint=hostname,
-                    retry_strategy=oci.retry.NoneRetryStrategy(),
-                    timeout=(10, 240)
+                oci_config = oci.config.from_file()
+            except Exception as config_error:
+                print(f"Warning: Could not load OCI config file: {config_error}")
+                oci_config = oci.config.from_file("~/.oci/config")
+            
+            # Initialize GenAI client
+            return GenerativeAiInferenceClient(
+                config=oci_config,
+                service_endpoint=hostname,
+                retry_strategy=oci.retry.NoneRetryStrategy(),
+                timeout=(
+                    self._config.time_budget.connect_timeout_seconds,
+                    self._config.time_budget.read_timeout_seconds,
                 )
-                
-            except Exception as e:
-                print(f"Error initializing OCI GenAI client: {e}")
-                raise RuntimeError(f"Failed to initialize OCI GenAI client: {e}")
-        
-        return self._client
+            )
+            
+        except Exception as e:
+            print(f"Error initializing OCI GenAI client: {e}")
+            raise RuntimeError(f"Failed to initialize OCI GenAI client: {e}")
+
+    def _get_genai_client(self, hostname: str):
+        """The calling thread's client for ``hostname``; hedged duplicates never share one."""
+        return self._clients.get(hostname)
+
+    def _chat(self, endpoint: GenAIEndpoint, chat_request: Any, compartment_id: str) -> Optional[str]:
+        """Send one chat request to ``endpoint`` within the remaining invocation budget; returns the reply text."""
+        import oci
+
+        client = self._get_genai_client(endpoint.hostname)
+        apply_request_timeout(client, self._deadline, self._config.time_budget)
+
+        chat_detail = oci.generative_ai_inference.models.ChatDetails()
+        chat_detail.serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
+            endpoint_id=endpoint.model_ocid
+        )
+        chat_detail.chat_request = chat_request
+        chat_detail.compartment_id = compartment_id
+        # A streamed reply is read inside the limiter slot, since the call is not over until it is
+        return self._limiter.call(lambda: _reply_text(client.chat(chat_detail)), self._deadline)
+
+    def _ask(self, stage: str, endpoints: List[GenAIEndpoint], chat_request: Any, compartment_id: str) -> Optional[str]:
+        """Send ``chat_request`` to the least loaded endpoint of a pool, hedged against slow replicas when enabled."""
+        balancer = shared_balancer(endpoints, self._config.endpoint_pool)
+
+        def send(endpoint: GenAIEndpoint) -> Optional[str]:
+            return self._chat(endpoint, chat_request, compartment_id)
+
+        # Hedge delays come from the latency of the endpoint the primary is pinned to;
+        # the duplicate is balanced afresh, so it usually lands on another replica
+        primary = balancer.select()
+        return self._hedger.call(
+            f"{primary.model_ocid}/{stage}",
+            lambda: balancer.call(send, primary),
+            lambda: balancer.call(send),
+        )
+
+    def _prompts(self) -> PromptSet:
+        """Prompts compiled for the current scoring thresholds (rendered once per configuration)."""
+        return compiled_prompts(self._config.damage_scoring, self._config.vision.compact_output)
 
     def _damage_json_prompt(self, caption_context: Optional[Dict[str, Any]] = None) -> str:
         """Return strict JSON-only prompt for damage assessment.
@@ -146,173 +255,28 @@ class VisionClient:
         Args:
             caption_context: Optional caption results to provide context about visible packages
         """
-        # Get scoring thresholds from config
-        scoring = self._config.damage_scoring
-        
-        # Build context section if caption was provided
-        context_section = ""
-        if caption_context:
-            pkg_visible = caption_context.get("packageVisible", False)
-            pkg_desc = caption_context.get("packageDescription", "")
-            if pkg_visible and pkg_desc:
-                context_section = (
-                    f"CONTEXT: Prior analysis identified packages in this image: {pkg_desc}\n"
-                    f"Your damage assessment should evaluate these identified items.\n\n"
-                )
-        
-        return (
-            "You are a delivery damage inspector. Analyze the provided image and produce ONLY a single JSON object (no markdown, no preface, no trailing text) with this exact structure:\n\n"
-            "{\n"
-            "  \"overall\": { \"severity\": \"none|minor|moderate|severe\", \"score\": 0.0-1.0, \"rationale\": \"string\" },\n"
-            "  \"indicators\": {\n"
-            "    \"boxDeformation\": { \"present\": true|false, \"severity\": \"none|minor|moderate|severe\", \"evidence\": \"string\" },\n"
-            "    \"cornerDamage\":   { \"present\": true|false, \"severity\": \"none|minor|moderate|severe\", \"evidence\": \"string\" },\n"
-            "    \"leakage\":        { \"present\": true|false, \"severity\": \"none|minor|moderate|severe\", \"evidence\": \"string\" },\n"
-            "    \"packagingIntegrity\": { \"present\": true|false, \"severity\": \"none|minor|moderate|severe\", \"evidence\": \"string\" }\n"
-            "  },\n"
-            "  \"packageVisible\": true|false,\n"
-            "  \"uncertainties\": \"string\"\n"
-            "}\n\n"
-            f"{context_section}"
-            "Important: A 'package' includes ANY delivered items: cardboard boxes, plastic bags, envelopes, containers, parcels, or any other delivery items.\n\n"
-            "Definitions:\n"
-            "- boxDeformation: crushed corners, bent edges, bulging sides, structural collapse (applies to boxes, bags, containers).\n"
-            "- cornerDamage: crushed/abraded/torn/dented corners (for any package type with corners).\n"
-            "- leakage: liquid stains, wet spots, moisture damage (visible on or around any package).\n"
-            "- packagingIntegrity: tears, holes, dents, scratches, tape failure, visible damage to any package surface.\n\n"
-            "Rules:\n"
-            "- FIRST, identify if ANY delivery items (boxes, bags, coolers, envelopes, containers, parcels) are visible.\n"
-            "- If ANY delivery items are visible, set \"packageVisible\": true and assess damage on those items.\n"
-            "- If absolutely NO delivery items are visible, set \"packageVisible\": false and \"overall.severity\": \"none\", \"overall.score\": 0.0 with rationale.\n"
-            f"- If delivery items are visible but no damage is visible, set all indicators.present=false, severity=\"none\", evidence=\"none\", overall.severity=\"none\", overall.score<={scoring.none_max}.\n"
-            f"- Calibrate score by worst indicator: severe ≈ {scoring.severe_min}, moderate ≈ {scoring.moderate_min}–{scoring.moderate_max}, minor ≈ {scoring.minor_min}–{scoring.minor_max}, none ≤ {scoring.none_max}.\n"
-            "- Keep evidence short and visual (what/where). Be precise, no speculation.\n"
-            f"- If any of these keywords are observed: crushed, bent, bulging, tear, hole, dent, leak, wet, stain → minimum severity is 'minor' and score ≥ {scoring.minor_min}.\n"
-            "- For plastic bags and soft containers: assess tears, holes, and structural integrity instead of box deformation.\n"
-            "- Output MUST be valid JSON, UTF-8, no trailing commas, no extra commentary.\n\n"
-            "Now analyze the image and output the JSON only."
-        )
+        return self._prompts().damage.render(caption_context_splice(caption_context))
 
-    def _parse_damage_json(self, raw_text: str) -> Optional[Dict[str, Any]]:
-        """Parse a JSON report from model text; try substring recovery if needed."""
-        clean = raw_text.strip()
-        if clean.startswith("```"):
-            lines = [
-                line for line in clean.splitlines()
-                if not line.strip().startswith("```")
-            ]
-            clean = "\n".join(lines).strip()
-        try:
-            return json.loads(clean)
-        except Exception:
-            start = clean.find("{")
-            end = clean.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                snippet = clean[start : end + 1]
-                try:
-                    return json.loads(snippet)
-                except Exception:
-                    return None
-            return None
+    def _parse_damage_json(self, raw_text: str, compact: bool = False) -> Optional[Dict[str, Any]]:
+        """Parse a JSON report from model text, recovering it from fences, prose or truncation.
 
-    def _parse_caption_json(self, raw_text: str) -> Optional[Dict[str, Any]]:
-        """Parse caption JSON from model text; try substring recovery if needed."""
-        clean = raw_text.strip()
-        
-        # Remove markdown code blocks
-        if clean.startswith("```"):
-            lines = [
-                line for line in clean.splitlines()
-                if not line.strip().startswith("```")
-            ]
-            clean = "\n".join(lines).strip()
-        
-        # Try direct JSON parsing first
-        try:
-            return json.loads(clean)
-        except Exception:
-            pass
-        
-        # Try to find JSON object boundaries
-        start = clean.find("{")
-        end = clean.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            snippet = clean[start : end + 1]
-            try:
-                return json.loads(snippet)
-            except Exception:
-                pass
-        
-        # Try to find JSON array boundaries (in case it's wrapped in array)
-        start = clean.find("[")
-        end = clean.rfind("]")
-        if start != -1 and end != -1 and end > start:
-            snippet = clean[start : end + 1]
-            try:
-                parsed = json.loads(snippet)
-                if isinstance(parsed, list) and len(parsed) > 0:
-                    return parsed[0]  # Return first object if it's an array
-            except Exception:
-                pass
-        
-        # Try to extract JSON from common patterns
-        import re
-        json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-        matches = re.findall(json_pattern, clean, re.DOTALL)
-        for match in matches:
-            try:
-                return json.loads(match)
-            except Exception:
-                continue
-        
-        return None
+        A truncated report is only kept when its severities survived intact.
+        """
+        report = extract_json_object(raw_text, valid=has_known_severities)
+        if report is not None and compact:
+            return decode_damage(report)
+        return report
+
+    def _parse_caption_json(self, raw_text: str, compact: bool = False) -> Optional[Dict[str, Any]]:
+        """Parse caption JSON from model text, recovering it from fences, prose or truncation."""
+        caption = extract_json_object(raw_text)
+        if caption is not None and compact:
+            return decode_caption(caption)
+        return caption
 
     def _caption_json_prompt(self) -> str:
         """Return structured JSON prompt for delivery scene caption."""
-        return (
-            "You are a delivery scene analyzer. Analyze the provided image and produce ONLY a single JSON object (no markdown, no preface, no trailing text) with this exact structure:\n\n"
-            "{\n"
-            "  \"sceneType\": \"delivery|package|entrance|other\",\n"
-            "  \"packageVisible\": true|false,\n"
-            "  \"packageDescription\": \"string\",\n"
-            "  \"location\": {\n"
-            "    \"type\": \"doorstep|porch|mailbox|driveway|entrance|inside|other\",\n"
-            "    \"description\": \"string\"\n"
-            "  },\n"
-            "  \"environment\": {\n"
-            "    \"weather\": \"clear|rainy|cloudy|snowy|unknown\",\n"
-            "    \"timeOfDay\": \"morning|afternoon|evening|night|unknown\",\n"
-            "    \"conditions\": \"string\"\n"
-            "  },\n"
-            "  \"safetyAssessment\": {\n"
-            "    \"protected\": true|false,\n"
-            "    \"visible\": true|false,\n"
-            "    \"secure\": true|false,\n"
-            "    \"notes\": \"string\"\n"
-            "  },\n"
-            "  \"overallDescription\": \"string\"\n"
-            "}\n\n"
-            "Definitions:\n"
-            "- sceneType: primary scene category (delivery=package at destination, package=package only, entrance=door/entrance visible, other=none of these)\n"
-            "- packageVisible: whether any package/box/parcel is visible in the image\n"
-            "- packageDescription: short description of package(s) seen, or \"none\" if not visible\n"
-            "- location.type: where the package/scene is located\n"
-            "- location.description: brief description of the location (what you see)\n"
-            "- environment.weather: apparent weather conditions from visual cues\n"
-            "- environment.timeOfDay: estimated time based on lighting\n"
-            "- environment.conditions: brief description of environmental factors\n"
-            "- safetyAssessment.protected: is package sheltered from weather/elements\n"
-            "- safetyAssessment.visible: is package visible from street/public view\n"
-            "- safetyAssessment.secure: does location appear secure (not easily stolen)\n"
-            "- safetyAssessment.notes: brief assessment of delivery safety\n"
-            "- overallDescription: 2-3 sentence summary of the entire scene\n\n"
-            "Rules:\n"
-            "- If no package is visible, set packageVisible=false and packageDescription=\"none\", but still describe the scene.\n"
-            "- Keep descriptions factual and visual. No speculation about contents or ownership.\n"
-            "- For weather/time, use \"unknown\" if not clearly visible.\n"
-            "- Output MUST be valid JSON, UTF-8, no trailing commas, no extra commentary.\n\n"
-            "Now analyze the image and output the JSON only."
-        )
+        return self._prompts().caption.render()
 
     def generate_caption(self, image_bytes: bytes) -> str:
         """Generate structured delivery scene caption using OCI GenAI Vision."""
@@ -320,22 +284,26 @@ class VisionClient:
             import oci
             import base64
             
-            # Get GenAI client
-            client = self._get_genai_client()
-            
             # Encode image to base64
             encoded_image = base64.b64encode(image_bytes).decode('utf-8')
             
             # Get configuration
-            model_ocid = os.environ.get('OCI_TEXT_MODEL_OCID')
+            endpoints = resolve_endpoints(self._config.endpoint_pool)
             compartment_id = os.environ.get('OCI_COMPARTMENT_ID')
             
-            if not model_ocid or not compartment_id:
+            if not endpoints or not compartment_id:
                 return json.dumps({"error": "missing_credentials"})
             
             # Structured caption prompt
+            prompt = self._prompts().caption
+            fast_endpoints = resolve_fast_endpoints(self._config.cascade)
+            cache_key = self._cache_key(image_bytes, prompt.version_id, "", fast_endpoints + endpoints)
+            if cache_key is not None:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    return cached.decode("utf-8")
             text_content = oci.generative_ai_inference.models.TextContent()
-            text_content.text = self._caption_json_prompt()
+            text_content.text = prompt.render()
             
             # EXACT COPY from working console test - try ImageUrl first, fallback to source
             try:
@@ -362,52 +330,34 @@ class VisionClient:
             chat_request = oci.generative_ai_inference.models.GenericChatRequest()
             chat_request.api_format = oci.generative_ai_inference.models.BaseChatRequest.API_FORMAT_GENERIC
             chat_request.messages = [message]
-            chat_request.max_tokens = 800
+            chat_request.max_tokens = prompt.max_tokens
             chat_request.temperature = 0.2
             chat_request.frequency_penalty = 0
             chat_request.presence_penalty = 0
             chat_request.top_p = 0.85
             chat_request.top_k = -1
-            chat_request.is_stream = False
-            
-            # Serving mode
-            serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
-                endpoint_id=model_ocid
-            )
-            
-            # Chat details
-            chat_detail = oci.generative_ai_inference.models.ChatDetails()
-            chat_detail.serving_mode = serving_mode
-            chat_detail.chat_request = chat_request
-            chat_detail.compartment_id = compartment_id
+            chat_request.is_stream = self._config.vision.stream_responses
             
-            # Get response
-            response = client.chat(chat_detail)
+            def ask(pool: List[GenAIEndpoint]) -> Dict[str, Any]:
+                caption_text = self._ask("caption", pool, chat_request, compartment_id)
+                if not caption_text:
+                    return {"error": "no_caption_generated"}
+                caption_json = self._parse_caption_json(caption_text, prompt.compact)
+                # Fallback: return raw text wrapped in JSON
+                return caption_json if caption_json is not None else {"unstructured": caption_text}
             
-            # Parse response and extract JSON
-            if (response.data and 
-                hasattr(response.data, 'chat_response') and 
-                response.data.chat_response and
-                hasattr(response.data.chat_response, 'choices') and 
-                response.data.chat_response.choices and
-                len(response.data.chat_response.choices) > 0 and
-                hasattr(response.data.chat_response.choices[0], 'message') and
-                response.data.chat_response.choices[0].message and
-                hasattr(response.data.chat_response.choices[0].message, 'content') and
-                response.data.chat_response.choices[0].message.content and
-                len(response.data.chat_response.choices[0].message.content) > 0):
-                
-                caption_text = response.data.chat_response.choices[0].message.content[0].text
-                
-                # Try to parse as JSON
-                caption_json = self._parse_caption_json(caption_text)
-                if caption_json is not None:
-                    return json.dumps(caption_json)
-                else:
-                    # Fallback: return raw text wrapped in JSON
-                    return json.dumps({"unstructured": caption_text})
+            # Fast model first when the cascade is on, escalating uncertain answers to the main pool
+            record = None
+            if fast_endpoints:
+                caption_json, record = run_cascade("caption", ask, fast_endpoints, endpoints, self._config.cascade)
             else:
-                return json.dumps({"error": "no_caption_generated"})
+                caption_json = ask(endpoints)
+            
+            if cache_key is not None and "error" not in caption_json and "unstructured" not in caption_json:
+                self._cache.set(cache_key, json.dumps(caption_json).encode("utf-8"))
+            if record is not None:
+                caption_json = dict(caption_json, cascade=record)
+            return json.dumps(caption_json)
                 
         except Exception as e:
             print(f"Error generating caption: {e}")
@@ -424,22 +374,27 @@ class VisionClient:
             import oci
             import base64
             
-            # Get GenAI client
-            client = self._get_genai_client()
-            
             # Encode image to base64
             encoded_image = base64.b64encode(image_bytes).decode('utf-8')
             
             # Get configuration
-            model_ocid = os.environ.get('OCI_TEXT_MODEL_OCID')
+            endpoints = resolve_endpoints(self._config.endpoint_pool)
             compartment_id = os.environ.get('OCI_COMPARTMENT_ID')
             
-            if not model_ocid or not compartment_id:
+            if not endpoints or not compartment_id:
                 return {"error": "missing_credentials"}
             
-            # Strict JSON prompt for robust downstream parsing
+            # Strict JSON prompt for robust downstream parsing; the scoring thresholds are part of its version
+            prompt = self._prompts().damage
+            splice = caption_context_splice(caption_context)
+            fast_endpoints = resolve_fast_endpoints(self._config.cascade)
+            cache_key = self._cache_key(image_bytes, prompt.version_id, splice, fast_endpoints + endpoints)
+            if cache_key is not None:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    return json.loads(cached)
             text_content = oci.generative_ai_inference.models.TextContent()
-            text_content.text = self._damage_json_prompt(caption_context)
+            text_content.text = prompt.render(splice)
             
             # EXACT COPY from working console test - try ImageUrl first, fallback to source
             try:
@@ -466,58 +421,82 @@ class VisionClient:
             chat_request = oci.generative_ai_inference.models.GenericChatRequest()
             chat_request.api_format = oci.generative_ai_inference.models.BaseChatRequest.API_FORMAT_GENERIC
             chat_request.messages = [message]
-            chat_request.max_tokens = 800
+            chat_request.max_tokens = prompt.max_tokens
             chat_request.temperature = 0.1
             chat_request.frequency_penalty = 0
             chat_request.presence_penalty = 0
             chat_request.top_p = 0.85
             chat_request.top_k = -1
-            chat_request.is_stream = False
-            
-            # EXACT COPY from working console test
-            serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
-                endpoint_id=model_ocid
-            )
+            chat_request.is_stream = self._config.vision.stream_responses
             
-            # EXACT COPY from working console test
-            chat_detail = oci.generative_ai_inference.models.ChatDetails()
-            chat_detail.serving_mode = serving_mode
-            chat_detail.chat_request = chat_request
-            chat_detail.compartment_id = compartment_id
+            def ask(pool: List[GenAIEndpoint]) -> Dict[str, Any]:
+                assessment = self._ask("damage", pool, chat_request, compartment_id)
+                if not assessment:
+                    return {"error": "no_response"}
+                report = self._parse_damage_json(assessment, prompt.compact)
+                # Fallback: return error if JSON parsing failed
+                return report if report is not None else {"error": "json_parse_failed"}
             
-            # EXACT COPY from working console test
-            response = client.chat(chat_detail)
+            # Fast model first when the cascade is on; uncertain or damaged findings go to the main pool
+            record = None
+            if fast_endpoints:
+                report, record = run_cascade("damage", ask, fast_endpoints, endpoints, self._config.cascade)
+            else:
+                report = ask(endpoints)
             
-            # Parse JSON and extract only indicators
-            if (response.data and 
-                hasattr(response.data, 'chat_response') and 
-                response.data.chat_response and
-                hasattr(response.data.chat_response, 'choices') and 
-                response.data.chat_response.choices and
-                len(response.data.chat_response.choices) > 0 and
-                hasattr(response.data.chat_response.choices[0], 'message') and
-                response.data.chat_response.choices[0].message and
-                hasattr(response.data.chat_response.choices[0].message, 'content') and
-                response.data.chat_response.choices[0].message.content and
-                len(response.data.chat_response.choices[0].message.content) > 0):
-                
-                assessment = response.data.chat_response.choices[0].message.content[0].text
-                report = self._parse_damage_json(assessment)
-                
-                if report is not None:
-                    # Return complete report
-                    return report
-                else:
-                    # Fallback: return error if JSON parsing failed
-                    return {"error": "json_parse_failed"}
-
-            return {"error": "no_response"}
+            if cache_key is not None and "error" not in report:
+                self._cache.set(cache_key, json.dumps(report).encode("utf-8"))
+            if record is not None:
+                report = dict(report, cascade=record)
+            return report
             
         except Exception as e:
             print(f"Error detecting damage: {e}")
             return {"error": str(e)}
 
 
+def _event_text(data: str) -> str:
+    """Text delta of one streamed chat event (GENERIC or COHERE format)."""
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return ""
+    if not isinstance(payload, dict):
+        return ""
+    message = payload.get("message")
+    if isinstance(message, dict):
+        return "".join(part.get("text", "") for part in message.get("content") or [] if isinstance(part, dict))
+    return payload.get("text", "") if isinstance(payload.get("text"), str) else ""
+
+
+def _read_stream(events: Any) -> Optional[str]:
+    """Read server-sent chunks until the reply's JSON object closes, then drop the connection.
+
+    Closing the response stops the rest of the generation (trailing
+    commentary, or tokens up to ``max_tokens``) from being waited for.
+    """
+    tracker = JsonObjectTracker()
+    try:
+        for event in events.events():
+            piece = _event_text(event.data)
+            if piece and tracker.feed(piece):
+                break
+    finally:
+        events.close()
+    return tracker.text or None
+
+
+def _reply_text(response: Any) -> Optional[str]:
+    """Text of a chat reply, streamed or not; None when the reply is empty."""
+    data = response.data
+    if hasattr(data, "events"):
+        return _read_stream(data)
+    try:
+        return data.chat_response.choices[0].message.content[0].text or None
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+
 def extract_exif(image_bytes: bytes) -> Dict[str, Any]:
     with Image.open(io.BytesIO(image_bytes)) as img:
         exif_data_raw = img._getexif() or {}
@@ -606,18 +585,18 @@ class ObjectRetrievalTool(BaseTool):
     name: str = "retrieve_delivery_photo"
     description: str = "Fetch delivery photo bytes and metadata from OCI Object Storage."
 
-    def __init__(self, config: WorkflowConfig):
+    def __init__(self, config: WorkflowConfig, deadline: Optional[Deadline] = None):
         super().__init__()
         self._config = config
-        self._client = ObjectStorageClient(config)
+        self._client = ObjectStorageClient(config, deadline)
 
     def _run(self, object_name: str) -> str:
         result = self._client.get_object(object_name)
         payload = base64.b64encode(result["data"]).decode("utf-8")
         return json.dumps({"payload": payload, "metadata": result["metadata"]})
 
-    async def _arun(self, object_name: str) -> str:  # pragma: no cover - async not implemented
-        raise NotImplementedError
+    async def _arun(self, object_name: str) -> str:
+        return await asyncio.to_thread(self._run, object_name)
 
 
 class ExifExtractionTool(BaseTool):
@@ -629,35 +608,35 @@ class ExifExtractionTool(BaseTool):
         exif = extract_exif(image_bytes)
         return json.dumps(exif, default=str)
 
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover - async not implemented
-        raise NotImplementedError
+    async def _arun(self, encoded_payload: str) -> str:
+        return await asyncio.to_thread(self._run, encoded_payload)
 
 
 class ImageCaptionTool(BaseTool):
     name: str = "caption_image"
     description: str = "Generate structured delivery scene analysis as JSON (sceneType, package, location, environment, safetyAssessment)."
 
-    def __init__(self, config: WorkflowConfig):
+    def __init__(self, config: WorkflowConfig, deadline: Optional[Deadline] = None):
         super().__init__()
-        self._client = VisionClient(config)
+        self._client = VisionClient(config, deadline)
 
     def _run(self, encoded_payload: str) -> str:
         image_bytes = base64.b64decode(encoded_payload)
         caption = self._client.generate_caption(image_bytes)
         return caption
 
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover
-        raise NotImplementedError
+    async def _arun(self, encoded_payload: str) -> str:
+        return await asyncio.to_thread(self._run, encoded_payload)
 
 
 class DamageDetectionTool(BaseTool):
     name: str = "detect_damage"
     description: str = "Extract per-indicator damage assessment as JSON (boxDeformation, cornerDamage, leakage, packagingIntegrity)."
 
-    def __init__(self, config: WorkflowConfig):
+    def __init__(self, config: WorkflowConfig, deadline: Optional[Deadline] = None):
         super().__init__()
         self._config = config
-        self._client = VisionClient(config)
+        self._client = VisionClient(config, deadline)
 
     def _run(self, encoded_payload: str, caption_context: Optional[str] = None) -> str:
         """Run damage detection, optionally using caption context.
@@ -679,16 +658,20 @@ class DamageDetectionTool(BaseTool):
         result = self._client.detect_damage(image_bytes, caption_context=context_dict)
         return json.dumps(result)
 
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover
-        raise NotImplementedError
+    async def _arun(self, encoded_payload: str, caption_context: Optional[str] = None) -> str:
+        return await asyncio.to_thread(self._run, encoded_payload, caption_context)
+
 
+def toolset(config: WorkflowConfig, deadline: Optional[Deadline] = None) -> Dict[str, BaseTool]:
+    """Factory returning all tools keyed by workflow stage.
 
-def toolset(config: WorkflowConfig) -> Dict[str, BaseTool]:
-    """Factory returning all tools keyed by workflow stage."""
+    When a ``deadline`` is supplied every OCI call made by the tools is given
+    the remaining invocation budget as its timeout.
+    """
 
     return {
-        "retrieval": ObjectRetrievalTool(config),
+        "retrieval": ObjectRetrievalTool(config, deadline),
         "exif": ExifExtractionTool(),
-        "caption": ImageCaptionTool(config),
-        "damage": DamageDetectionTool(config),
+        "caption": ImageCaptionTool(config, deadline),
+        "damage": DamageDetectionTool(config, deadline),
     }
@@ -0,0 +1,128 @@
+"""CPU-side usability gate for delivery photos, run before any GenAI call.
+
+Blurry pocket shots, black frames and tiny thumbnails cannot be assessed, yet
+each costs a caption and a damage call before the pipeline finds out. The
+gate decodes one reduced-scale grayscale preview (JPEG draft mode) and
+checks it in about a millisecond:
+
+* resolution: the short side of the original photo;
+* sharpness: variance of the 4-neighbour Laplacian of the preview;
+* exposure: mean luminance and the share of clipped dark and bright pixels;
+* contrast: the luminance standard deviation (flat frames have none).
+
+The same preview feeds the burst-duplicate hash, so the photo is decoded once.
+numpy is optional: ``load_config`` leaves the gate off when it is missing,
+and ``assess`` raises a clear error if called without it.
+"""
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from PIL import Image
+
+from .config import UsabilityConfig
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is only needed when the gate is enabled
+    np = None
+
+# Histogram bins counted as clipped shadows / highlights
+_DARK_BINS = 16
+_BRIGHT_BINS = 240
+
+
+@dataclass
+class Preview:
+    """Reduced grayscale image plus the dimensions of the original photo."""
+
+    image: Image.Image
+    width: int
+    height: int
+
+
+@dataclass
+class UsabilityReport:
+    usable: bool
+    reasons: List[str] = field(default_factory=list)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    def issues(self) -> List[str]:
+        """Human-readable reasons for the assessment."""
+        return [_MESSAGES[reason].format(**self.metrics) for reason in self.reasons]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"usable": self.usable, "reasons": list(self.reasons), **self.metrics}
+
+
+_MESSAGES = {
+    "undecodable": "Photo could not be decoded",
+    "low_resolution": "Photo resolution too low ({width}x{height})",
+    "blurry": "Photo too blurry (sharpness {sharpness})",
+    "too_dark": "Photo too dark (mean luminance {mean_luminance}, {dark_fraction:.0%} black)",
+    "overexposed": "Photo overexposed (mean luminance {mean_luminance}, {bright_fraction:.0%} blown out)",
+    "low_contrast": "Photo has no visible detail (contrast {contrast})",
+}
+
+
+def gate_available() -> bool:
+    """Whether numpy is installed, so the gate can run."""
+    return np is not None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The photo usability gate needs numpy; install it with `pip install numpy`.")
+
+
+def decode_preview(image_bytes: bytes, max_side: int = 256) -> Optional[Preview]:
+    """Grayscale preview with its long side at most ``max_side``, or None when the bytes cannot be decoded."""
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        width, height = image.size
+        # JPEG decodes straight to a reduced scale; other formats decode in full and are shrunk
+        image.draft("L", (max_side, max_side))
+        image = image.convert("L")
+        image.thumbnail((max_side, max_side), Image.Resampling.BILINEAR)
+        return Preview(image, width, height)
+    except Exception as err:
+        print(f"Warning: could not decode image preview: {err}")
+        return None
+
+
+def assess(preview: Optional[Preview], config: UsabilityConfig) -> UsabilityReport:
+    """Check resolution, sharpness, exposure and contrast of a decoded preview."""
+    _require_numpy()
+    if preview is None:
+        return UsabilityReport(False, ["undecodable"])
+    pixels = np.asarray(preview.image)
+    values = pixels.astype(np.float32)
+    laplacian = (
+        values[1:-1, :-2] + values[1:-1, 2:] + values[:-2, 1:-1] + values[2:, 1:-1] - 4.0 * values[1:-1, 1:-1]
+    )
+    histogram = np.bincount(pixels.ravel(), minlength=256)
+    total = pixels.size
+    metrics = {
+        "width": preview.width,
+        "height": preview.height,
+        "sharpness": round(float(laplacian.var()), 1) if laplacian.size else 0.0,
+        "mean_luminance": round(float(values.mean()), 1),
+        "contrast": round(float(values.std()), 1),
+        "dark_fraction": round(float(histogram[:_DARK_BINS].sum()) / total, 3),
+        "bright_fraction": round(float(histogram[_BRIGHT_BINS:].sum()) / total, 3),
+    }
+
+    reasons = []
+    if min(preview.width, preview.height) < config.min_short_side:
+        reasons.append("low_resolution")
+    if metrics["mean_luminance"] < config.min_mean_luminance or metrics["dark_fraction"] > config.max_clipped_fraction:
+        reasons.append("too_dark")
+    if metrics["mean_luminance"] > config.max_mean_luminance or metrics["bright_fraction"] > config.max_clipped_fraction:
+        reasons.append("overexposed")
+    if metrics["contrast"] < config.min_contrast:
+        reasons.append("low_contrast")
+    if metrics["sharpness"] < config.min_sharpness:
+        reasons.append("blurry")
+    return UsabilityReport(not reasons, reasons, metrics)
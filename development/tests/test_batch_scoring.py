@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized batch scorer against the scalar quality-index functions.
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+SEVERITIES = ["none", "minor", "moderate", "severe", "unclear"]
+# Key order of the damage prompt's indicators object
+PROMPT_ORDER = ["boxDeformation", "cornerDamage", "leakage", "packagingIntegrity"]
+MIN_ROWS_PER_SECOND = 500_000
+
+
+def _random_record(rng):
+    from oci_delivery_agent.chains import DeliveryContext
+
+    expected = (40.7128 + rng.uniform(-0.5, 0.5), -74.0060 + rng.uniform(-0.5, 0.5))
+    promised = datetime(2024, 1, 1) + timedelta(seconds=rng.randrange(0, 30 * 86400))
+    delivered = promised + timedelta(seconds=rng.choice([rng.randrange(-7200, 0), rng.randrange(0, 6 * 3600)]),
+                                     microseconds=rng.randrange(0, 10**6))
+    context = DeliveryContext("photo.jpg", expected[0], expected[1], promised, delivered)
+
+    exif = {}
+    if rng.random() < 0.9:
+        offset = rng.choice([0.0001, 0.0003, 0.001])
+        exif = {"GPSInfo": {"latitude": expected[0] + rng.uniform(-offset, offset),
+                            "longitude": expected[1] + rng.uniform(-offset, offset)}}
+
+    style = rng.random()
+    if style < 0.7:
+        # Reports arrive in prompt order or any other key order the model chooses
+        names = list(PROMPT_ORDER)
+        if rng.random() < 0.5:
+            rng.shuffle(names)
+        report = {
+            "overall": {"score": round(rng.random(), 2)},
+            "indicators": {
+                name: {"present": rng.random() < 0.4, "severity": rng.choice(SEVERITIES)} for name in names
+            },
+        }
+    elif style < 0.9:
+        report = {"overall": {"score": rng.random()}}
+    else:
+        report = {"damage": rng.random()}
+    return context, exif, report
+
+
+def test_identical_to_scalar():
+    """Every score matches compute_quality_index exactly, with and without weighted scoring."""
+    print("🧮 Testing batch scores against scalar scores")
+    print("=" * 60)
+
+    from oci_delivery_agent.chains import compute_quality_index
+    from oci_delivery_agent.config import DamageScoringConfig, ObjectStorageConfig, VisionConfig, WorkflowConfig
+    from oci_delivery_agent.scoring import ScoringColumns, score_batch
+
+    rng = random.Random(7)
+    records = [_random_record(rng) for _ in range(20000)]
+    # Hand-made ties: 1.5h and 0.5h late land exactly on rounding boundaries after scaling
+    records[0][0].delivered_time_utc = records[0][0].promised_time_utc + timedelta(minutes=90)
+    columns = ScoringColumns.from_records(records)
+    weights = {"timeliness": 0.3, "location_accuracy": 0.3, "damage_score": 0.4}
+
+    for weighted in (True, False):
+        config = WorkflowConfig(
+            object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+            vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+            damage_scoring=DamageScoringConfig(use_weighted_scoring=weighted),
+        )
+        batch = score_batch(columns, weights, 50.0, config)
+        for row, (context, exif, report) in enumerate(records):
+            scalar = compute_quality_index(
+                context=context, exif=exif, damage_report=report,
+                weights=weights, max_distance_meters=50.0, config=config,
+            )
+            for key, value in scalar.items():
+                assert batch[key][row] == value, (row, key, batch[key][row], value)
+        print(f"✅ weighted={weighted}: {len(records)} rows identical")
+
+
+def test_throughput():
+    """Columns built directly score at over half a million rows per second (about 1.7M locally)."""
+    print("\n⚡ Testing batch throughput")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import ObjectStorageConfig, VisionConfig, WorkflowConfig
+    from oci_delivery_agent.scoring import INDICATORS, ScoringColumns, score_batch
+
+    size = 1_000_000
+    generator = np.random.default_rng(11)
+    expected_lat = 40.7 + generator.uniform(-1, 1, size)
+    expected_lon = -74.0 + generator.uniform(-1, 1, size)
+    promised = 1_704_067_200 * 10**6 + generator.integers(0, 30 * 86400 * 10**6, size)
+    columns = ScoringColumns(
+        latitude=expected_lat + generator.uniform(-0.001, 0.001, size),
+        longitude=expected_lon + generator.uniform(-0.001, 0.001, size),
+        expected_latitude=expected_lat,
+        expected_longitude=expected_lon,
+        promised_us=promised,
+        delivered_us=promised + generator.integers(-2 * 3600 * 10**6, 6 * 3600 * 10**6, size),
+        has_indicators=np.ones(size, dtype=bool),
+        damage_probability=generator.uniform(0, 1, size),
+        severity_codes={name: generator.integers(0, 5, size).astype(np.uint8) for name in INDICATORS},
+    )
+    config = WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+    )
+    weights = {"timeliness": 0.3, "location_accuracy": 0.3, "damage_score": 0.4}
+
+    started = time.perf_counter()
+    result = score_batch(columns, weights, 50.0, config)
+    elapsed = time.perf_counter() - started
+
+    assert len(result["quality_index"]) == size
+    assert size / elapsed > MIN_ROWS_PER_SECOND, f"{size / elapsed:,.0f} rows/s"
+    print(f"✅ {size:,} rows in {elapsed:.2f}s ({size / elapsed:,.0f} rows/s)")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Batch Scoring Test")
+    print("=" * 60)
+
+    test_identical_to_scalar()
+    test_throughput()
+
+    print("\n🎉 All batch scoring tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
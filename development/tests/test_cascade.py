@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Test the fast-then-large vision model cascade: escalation rules, blended latency/cost and the pipeline record.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+ASSET_ROOT = os.path.join(os.path.dirname(__file__), '..', 'assets')
+
+CAPTION = {
+    "sceneType": "delivery",
+    "packageVisible": True,
+    "packageDescription": "brown cardboard box",
+    "location": {"type": "doorstep", "description": "front door"},
+    "environment": {"weather": "clear", "timeOfDay": "morning", "conditions": "dry"},
+    "safetyAssessment": {"protected": True, "visible": True, "secure": True, "notes": ""},
+    "overallDescription": "A box on the doorstep.",
+}
+CLEAN = {"overall": {"severity": "none", "score": 0.05, "rationale": "intact"}, "packageVisible": True, "uncertainties": ""}
+DENTED = {"overall": {"severity": "minor", "score": 0.35, "rationale": "dented corner"}, "packageVisible": True, "uncertainties": ""}
+HEDGED = dict(CLEAN, uncertainties="back side not visible")
+
+FAST_SECONDS = 0.02
+LARGE_SECONDS = 0.08
+
+
+def test_escalation_rules():
+    """Parse failures, unknown package visibility, uncertainties and any damage escalate."""
+    print("🪜 Testing escalation rules")
+    print("=" * 60)
+
+    from oci_delivery_agent.cascade import (
+        PACKAGE_UNKNOWN,
+        PARSE_FAILURE,
+        SEVERITY,
+        UNCERTAINTIES,
+        escalation_reason,
+    )
+
+    assert escalation_reason("caption", CAPTION) is None
+    assert escalation_reason("caption", {"unstructured": "A box."}) == PARSE_FAILURE
+    assert escalation_reason("caption", {"error": "no_caption_generated"}) == PARSE_FAILURE
+    assert escalation_reason("caption", dict(CAPTION, packageVisible="maybe")) == PACKAGE_UNKNOWN
+
+    assert escalation_reason("damage", CLEAN) is None
+    assert escalation_reason("damage", dict(CLEAN, uncertainties="None")) is None
+    assert escalation_reason("damage", HEDGED) == UNCERTAINTIES
+    assert escalation_reason("damage", DENTED) == SEVERITY
+    assert escalation_reason("damage", {"packageVisible": True}) == SEVERITY  # no severity at all
+    assert escalation_reason("damage", {"error": "json_parse_failed"}) == PARSE_FAILURE
+    print("✅ Confident clean answers stay on the fast model; everything else escalates")
+
+
+def _fake_chat(replies, calls):
+    """Stand-in for VisionClient._chat: the fast model is quicker; ``replies`` maps (tier, stage) to text."""
+
+    def chat(endpoint, chat_request, compartment_id):
+        tier = "fast" if endpoint.model_ocid.endswith("fast") else "large"
+        stage = "caption" if chat_request.temperature == 0.2 else "damage"
+        calls.append((tier, stage))
+        time.sleep(FAST_SECONDS if tier == "fast" else LARGE_SECONDS)
+        return replies[(tier, stage)]
+
+    return chat
+
+
+def _config(enabled=True, **overrides):
+    from oci_delivery_agent.config import (
+        CascadeConfig,
+        EndpointPoolConfig,
+        GenAIEndpoint,
+        ObjectStorageConfig,
+        VisionConfig,
+        WorkflowConfig,
+    )
+
+    return WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+        endpoint_pool=EndpointPoolConfig(
+            endpoints=[GenAIEndpoint(hostname="https://genai.invalid", model_ocid="ocid1.test.large")]
+        ),
+        cascade=CascadeConfig(
+            enabled=enabled,
+            fast_endpoints=[GenAIEndpoint(hostname="https://genai.invalid", model_ocid="ocid1.test.fast")],
+        ),
+        **overrides,
+    )
+
+
+def test_vision_client_cascade():
+    """Mostly-clean traffic stays on the fast model; blended latency and cost beat large-only."""
+    print("\n⏱️  Testing blended latency and cost")
+    print("-" * 40)
+
+    from oci_delivery_agent.cascade import FAST, LARGE, cascade_metrics, delivery_summary
+    from oci_delivery_agent.tools import VisionClient
+
+    # Eight clean doorstep shots, one dented box, one fast-model reply that does not parse
+    traffic = [CLEAN] * 8 + [DENTED, "garbled"]
+    config = _config()
+    before = cascade_metrics(config.cascade)
+    summaries = []
+    large_only_seconds = 0.0
+    previous = os.environ.get("OCI_COMPARTMENT_ID")
+    os.environ["OCI_COMPARTMENT_ID"] = "ocid1.compartment.test"
+    try:
+        for index, fast_damage in enumerate(traffic):
+            calls = []
+            replies = {
+                ("fast", "caption"): json.dumps(CAPTION),
+                ("large", "caption"): json.dumps(CAPTION),
+                ("fast", "damage"): fast_damage if isinstance(fast_damage, str) else json.dumps(fast_damage),
+                ("large", "damage"): json.dumps(DENTED if fast_damage is DENTED else CLEAN),
+            }
+            client = VisionClient(config)
+            client._chat = _fake_chat(replies, calls)
+            image = f"\xff\xd8cascade-{index}".encode("latin-1")
+            caption = json.loads(client.generate_caption(image))
+            caption_record = caption.pop("cascade")
+            report = client.detect_damage(image, caption_context=caption)
+            damage_record = report.pop("cascade")
+            assert caption == CAPTION and caption_record["tier"] == FAST and not caption_record["escalated"]
+            if fast_damage is CLEAN:
+                assert damage_record["tier"] == FAST and calls == [("fast", "caption"), ("fast", "damage")]
+                assert report == CLEAN
+            else:
+                assert damage_record["tier"] == LARGE and damage_record["escalated"]
+                assert damage_record["reason"] == ("severity" if fast_damage is DENTED else "parse_failure")
+                assert calls[-1] == ("large", "damage")
+                assert report == (DENTED if fast_damage is DENTED else CLEAN)
+
+            # Same delivery with the cascade off: every call goes to the large model
+            baseline = VisionClient(_config(enabled=False))
+            baseline._chat = _fake_chat(replies, [])
+            started = time.perf_counter()
+            assert "cascade" not in json.loads(baseline.generate_caption(image))
+            assert "cascade" not in baseline.detect_damage(image, caption_context=caption)
+            large_only_seconds += time.perf_counter() - started
+
+            summaries.append(delivery_summary({"caption": caption_record, "damage": damage_record}))
+    finally:
+        if previous is None:
+            os.environ.pop("OCI_COMPARTMENT_ID", None)
+        else:
+            os.environ["OCI_COMPARTMENT_ID"] = previous
+
+    cascade_seconds = sum(summary["seconds"] for summary in summaries)
+    cascade_cost = sum(summary["cost"] for summary in summaries)
+    assert sum(summary["escalations"] for summary in summaries) == 2
+    assert cascade_cost == 10 * 2 * 0.25 + 2 * 1.0
+    assert cascade_seconds < large_only_seconds
+    assert cascade_cost < 10 * 2 * 1.0
+
+    after = cascade_metrics(config.cascade)
+    damage = after["stages"]["damage"]
+    assert damage["calls"] - before["stages"].get("damage", {}).get("calls", 0) == 10
+    assert damage["escalations"] - before["stages"].get("damage", {}).get("escalations", 0) == 2
+    assert after["deliveries"] - before["deliveries"] == 10
+    assert after["cost_per_delivery"] < after["large_only_cost_per_delivery"]
+    print(f"✅ 2/20 calls escalated; per delivery {cascade_seconds / 10:.3f}s / cost {cascade_cost / 10:.2f} "
+          f"vs large-only {large_only_seconds / 10:.3f}s / cost 2.00")
+    print(f"✅ {json.dumps(after)}")
+
+
+def test_pipeline_reports_cascade():
+    """The pipeline strips the cascade record from the stage outputs and reports it per delivery."""
+    print("\n🚚 Testing pipeline cascade record")
+    print("-" * 40)
+
+    from langchain_community.llms import FakeListLLM
+    from oci_delivery_agent.chains import DeliveryContext, run_quality_pipeline
+    from oci_delivery_agent.tools import VisionClient
+
+    replies = {
+        ("fast", "caption"): json.dumps(CAPTION),
+        ("large", "caption"): json.dumps(CAPTION),
+        ("fast", "damage"): json.dumps(HEDGED),
+        ("large", "damage"): json.dumps(CLEAN),
+    }
+    calls = []
+    original = VisionClient._chat
+    previous = os.environ.get("OCI_COMPARTMENT_ID")
+    os.environ["OCI_COMPARTMENT_ID"] = "ocid1.compartment.test"
+    VisionClient._chat = lambda self, *args: _fake_chat(replies, calls)(*args)
+    try:
+        context = DeliveryContext(
+            object_name="deliveries/damage2.jpg",
+            expected_latitude=40.7128,
+            expected_longitude=-74.0060,
+            promised_time_utc=datetime(2024, 1, 15, 10, 0),
+            delivered_time_utc=datetime(2024, 1, 15, 9, 30),
+        )
+        llm = FakeListLLM(responses=["Box on the doorstep.", '{"status": "OK", "issues": [], "insights": "fine"}'])
+        result = run_quality_pipeline(
+            config=_config(local_asset_root=ASSET_ROOT), llm=llm, context=context, object_name=context.object_name
+        )
+    finally:
+        VisionClient._chat = original
+        if previous is None:
+            os.environ.pop("OCI_COMPARTMENT_ID", None)
+        else:
+            os.environ["OCI_COMPARTMENT_ID"] = previous
+
+    assert calls == [("fast", "caption"), ("fast", "damage"), ("large", "damage")]
+    assert "cascade" not in result["caption_json"] and "cascade" not in result["damage_report"]
+    assert result["damage_report"] == CLEAN
+    delivery = result["cascade"]["delivery"]
+    assert delivery["escalations"] == 1 and delivery["cost"] == 0.25 + 0.25 + 1.0
+    assert delivery["stages"]["damage"]["reason"] == "uncertainties"
+    assert result["cascade"]["totals"]["escalation_rate"] > 0
+    print(f"✅ {json.dumps(delivery)}")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Model Cascade Test")
+    print("=" * 60)
+
+    test_escalation_rules()
+    test_vision_client_cascade()
+    test_pipeline_reports_cascade()
+
+    print("\n🎉 All model cascade tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
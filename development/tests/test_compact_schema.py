@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Test the compact vision wire schema: decoding, prompt budgets and output size against the verbose schema.
+"""
+
+import copy
+import json
+import os
+import re
+import sys
+import time
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Replies in the style the verbose prompts produce
+VERBOSE_CAPTION = {
+    "sceneType": "delivery",
+    "packageVisible": True,
+    "packageDescription": "A medium-sized brown cardboard box sealed with clear packing tape and a white shipping label",
+    "location": {
+        "type": "doorstep",
+        "description": "The package is placed on a concrete doorstep directly in front of a dark green front door",
+    },
+    "environment": {
+        "weather": "cloudy",
+        "timeOfDay": "afternoon",
+        "conditions": "Overcast sky with diffuse lighting; the ground appears dry and there is no visible precipitation",
+    },
+    "safetyAssessment": {
+        "protected": True,
+        "visible": True,
+        "secure": False,
+        "notes": "The box sits under a small overhang so it is sheltered, but it is clearly visible from the street",
+    },
+    "overallDescription": (
+        "A brown cardboard box has been delivered to the doorstep of a residential house with a green door. "
+        "The package sits under a small roof overhang on a dry concrete step. "
+        "The scene is well lit under an overcast afternoon sky."
+    ),
+}
+VERBOSE_DAMAGE = {
+    "overall": {
+        "severity": "minor",
+        "score": 0.35,
+        "rationale": "One corner of the box is visibly crushed, but the packaging is otherwise intact with no leaks",
+    },
+    "indicators": {
+        "boxDeformation": {"present": False, "severity": "none", "evidence": "none"},
+        "cornerDamage": {
+            "present": True,
+            "severity": "minor",
+            "evidence": "The lower left front corner is crushed inward and the cardboard is slightly abraded",
+        },
+        "leakage": {"present": False, "severity": "none", "evidence": "none"},
+        "packagingIntegrity": {"present": False, "severity": "none", "evidence": "none"},
+    },
+    "packageVisible": True,
+    "uncertainties": "The back side of the box is not visible in the image, so damage there cannot be assessed",
+}
+
+# The same findings within the compact prompts' word limits
+BOUNDED_CAPTION = copy.deepcopy(VERBOSE_CAPTION)
+BOUNDED_CAPTION.update(
+    packageDescription="brown taped cardboard box",
+    overallDescription="Brown box on a dry doorstep under an overhang, green door, overcast afternoon.",
+)
+BOUNDED_CAPTION["location"]["description"] = "doorstep before green front door"
+BOUNDED_CAPTION["environment"]["conditions"] = "overcast, dry ground"
+BOUNDED_CAPTION["safetyAssessment"]["notes"] = "sheltered but visible from street"
+BOUNDED_DAMAGE = copy.deepcopy(VERBOSE_DAMAGE)
+BOUNDED_DAMAGE["overall"]["rationale"] = "one crushed corner, otherwise intact"
+BOUNDED_DAMAGE["indicators"]["cornerDamage"]["evidence"] = "lower left corner crushed"
+BOUNDED_DAMAGE["uncertainties"] = "back side not visible"
+
+# Rough output-token estimate: words and punctuation marks each count as one
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+SECONDS_PER_TOKEN = 0.002
+
+
+def _tokens(text):
+    return len(_TOKEN.findall(text))
+
+
+def test_round_trip_and_tolerant_decoding():
+    """Compact replies expand to the verbose structure; sloppy codes still decode."""
+    print("🗜️  Testing compact schema decoding")
+    print("=" * 60)
+
+    from oci_delivery_agent.compact import decode_caption, decode_damage, encode_caption, encode_damage
+
+    assert decode_caption(encode_caption(VERBOSE_CAPTION)) == VERBOSE_CAPTION
+    assert decode_damage(encode_damage(VERBOSE_DAMAGE)) == VERBOSE_DAMAGE
+
+    # Verbose replies pass through untouched
+    assert decode_caption(VERBOSE_CAPTION) is VERBOSE_CAPTION
+    assert decode_damage(VERBOSE_DAMAGE) is VERBOSE_DAMAGE
+
+    caption = decode_caption({"s": "Delivery", "pv": "1", "l": "PO", "w": "x", "sf": [1]})
+    assert caption["sceneType"] == "delivery" and caption["packageVisible"] is True
+    assert caption["location"]["type"] == "porch" and caption["environment"]["weather"] == "unknown"
+    assert caption["safetyAssessment"] == {"protected": True, "visible": False, "secure": False, "notes": ""}
+    assert caption["packageDescription"] == "none"
+
+    report = decode_damage({"o": ["2", "1.4"], "i": {"lk": [1, "moderate", "wet stain"], "bd": "bad"}, "pv": 1})
+    assert report["overall"] == {"severity": "moderate", "score": 1.0, "rationale": ""}
+    assert report["indicators"]["leakage"] == {"present": True, "severity": "moderate", "evidence": "wet stain"}
+    assert report["indicators"]["boxDeformation"] == {"present": False, "severity": "none", "evidence": "none"}
+    assert set(report["indicators"]) == set(VERBOSE_DAMAGE["indicators"])
+    print("✅ Round trips are lossless and malformed fields fall back to safe defaults")
+
+
+def test_compact_prompts_carry_smaller_budgets():
+    """Compact prompts are versioned separately and set smaller max_tokens."""
+    print("\n📏 Testing compact prompt budgets")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import DamageScoringConfig
+    from oci_delivery_agent.prompts import DEFAULT_MAX_TOKENS, compiled_prompts
+
+    verbose = compiled_prompts(DamageScoringConfig())
+    compact = compiled_prompts(DamageScoringConfig(), compact=True)
+    assert compiled_prompts(DamageScoringConfig(), compact=True) is compact
+    assert verbose.caption.max_tokens == verbose.damage.max_tokens == DEFAULT_MAX_TOKENS
+    assert not verbose.caption.compact and compact.caption.compact and compact.damage.compact
+    assert compact.caption.max_tokens < DEFAULT_MAX_TOKENS and compact.damage.max_tokens < DEFAULT_MAX_TOKENS
+    assert compact.versions()["damage"] != verbose.versions()["damage"]
+    assert "score<=0.1" in compact.damage.render()
+    assert "score<=0.05" in compiled_prompts(DamageScoringConfig(none_max=0.05), compact=True).damage.render()
+    print(f"✅ {compact.versions()} with max_tokens "
+          f"{compact.caption.max_tokens}/{compact.damage.max_tokens} (verbose {DEFAULT_MAX_TOKENS})")
+
+
+def _analyze(compact):
+    """Run caption and damage through VisionClient with a stub that 'generates' at a fixed rate per token."""
+    from oci_delivery_agent.compact import encode_caption, encode_damage
+    from oci_delivery_agent.config import (
+        EndpointPoolConfig,
+        GenAIEndpoint,
+        ObjectStorageConfig,
+        VisionConfig,
+        WorkflowConfig,
+    )
+    from oci_delivery_agent.tools import VisionClient
+
+    config = WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test", compact_output=compact),
+        endpoint_pool=EndpointPoolConfig(
+            endpoints=[GenAIEndpoint(hostname="https://genai.invalid", model_ocid="ocid1.test.vision")]
+        ),
+    )
+    generated = {}
+
+    def fake_chat(endpoint, chat_request, compartment_id):
+        stage = "caption" if chat_request.temperature == 0.2 else "damage"
+        if compact:
+            payload = encode_caption(BOUNDED_CAPTION) if stage == "caption" else encode_damage(BOUNDED_DAMAGE)
+            text = json.dumps(payload, separators=(",", ":"))
+        else:
+            text = json.dumps(VERBOSE_CAPTION if stage == "caption" else VERBOSE_DAMAGE, indent=2)
+        tokens = _tokens(text)
+        assert tokens <= chat_request.max_tokens, (stage, tokens, chat_request.max_tokens)
+        generated[stage] = tokens
+        time.sleep(tokens * SECONDS_PER_TOKEN)
+        return text
+
+    client = VisionClient(config)
+    client._chat = fake_chat
+    started = time.perf_counter()
+    caption = json.loads(client.generate_caption(b"\xff\xd8compact-test"))
+    report = client.detect_damage(b"\xff\xd8compact-test", caption_context=caption)
+    return caption, report, generated, time.perf_counter() - started
+
+
+def test_compact_output_cuts_tokens_and_latency():
+    """The compact schema decodes to the same findings with far fewer generated tokens."""
+    print("\n⏱️  Testing output tokens and latency, verbose vs compact")
+    print("-" * 40)
+
+    from oci_delivery_agent.chains import compute_damage_score
+    from oci_delivery_agent.config import ObjectStorageConfig, VisionConfig, WorkflowConfig
+
+    previous = os.environ.get("OCI_COMPARTMENT_ID")
+    os.environ["OCI_COMPARTMENT_ID"] = "ocid1.compartment.test"
+    try:
+        verbose_caption, verbose_report, verbose_tokens, verbose_seconds = _analyze(compact=False)
+        compact_caption, compact_report, compact_tokens, compact_seconds = _analyze(compact=True)
+    finally:
+        if previous is None:
+            os.environ.pop("OCI_COMPARTMENT_ID", None)
+        else:
+            os.environ["OCI_COMPARTMENT_ID"] = previous
+
+    assert verbose_caption == VERBOSE_CAPTION and verbose_report == VERBOSE_DAMAGE
+    assert compact_caption == BOUNDED_CAPTION and compact_report == BOUNDED_DAMAGE
+
+    # Everything scored downstream is identical
+    scoring = WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+    )
+    assert compute_damage_score(compact_report, scoring) == compute_damage_score(verbose_report, scoring)
+    for key in ("sceneType", "packageVisible", "location", "environment", "safetyAssessment"):
+        structured = {k: v for k, v in verbose_caption[key].items() if k not in ("description", "conditions", "notes")} \
+            if isinstance(verbose_caption[key], dict) else verbose_caption[key]
+        compacted = {k: v for k, v in compact_caption[key].items() if k not in ("description", "conditions", "notes")} \
+            if isinstance(compact_caption[key], dict) else compact_caption[key]
+        assert structured == compacted, key
+
+    verbose_total = sum(verbose_tokens.values())
+    compact_total = sum(compact_tokens.values())
+    assert compact_total < verbose_total * 0.6
+    assert compact_seconds < verbose_seconds
+    for stage in ("caption", "damage"):
+        print(f"✅ {stage}: {verbose_tokens[stage]} -> {compact_tokens[stage]} output tokens")
+    print(f"✅ Total {verbose_total} -> {compact_total} tokens; "
+          f"at {SECONDS_PER_TOKEN * 1000:.0f} ms/token {verbose_seconds:.2f}s -> {compact_seconds:.2f}s")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Compact Schema Test")
+    print("=" * 60)
+
+    test_round_trip_and_tolerant_decoding()
+    test_compact_prompts_carry_smaller_budgets()
+    test_compact_output_cuts_tokens_and_latency()
+
+    print("\n🎉 All compact schema tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Test adaptive (AIMD) concurrency control for OCI calls.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class ThrottledError(Exception):
+    status = 429
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_additive_increase_multiplicative_decrease():
+    """Healthy calls grow the limit; throttles halve it."""
+    print("📈 Testing AIMD limit adjustments")
+    print("=" * 60)
+
+    from oci_delivery_agent.concurrency import AdaptiveLimiter
+    from oci_delivery_agent.config import ConcurrencyConfig
+
+    clock = FakeClock()
+    limiter = AdaptiveLimiter("genai", ConcurrencyConfig(initial_limit=4, max_limit=8, enabled=True), clock=clock)
+
+    for _ in range(40):
+        limiter.call(lambda: None)
+    grown = limiter.limit
+    assert grown > 4
+    print(f"✅ Limit grew to {grown} after healthy calls")
+
+    def throttled():
+        raise ThrottledError("Too many requests")
+
+    try:
+        limiter.call(throttled)
+    except ThrottledError:
+        pass
+    cut = limiter.limit
+    assert cut < grown
+
+    # A second throttle inside the cooldown window is not counted twice
+    limiter.on_throttle()
+    assert limiter.snapshot()["throttles"] == 2
+    assert limiter.limit == cut
+
+    clock.now += 5
+    limiter.on_throttle()
+    assert limiter.limit < cut
+    print(f"✅ Limit cut to {limiter.limit} after throttling: {limiter.snapshot()}")
+
+
+def test_latency_inflation_cuts_limit():
+    """Latency far above the smoothed baseline is treated like congestion."""
+    from oci_delivery_agent.concurrency import AdaptiveLimiter
+    from oci_delivery_agent.config import ConcurrencyConfig
+
+    limiter = AdaptiveLimiter(
+        "object_storage",
+        ConcurrencyConfig(initial_limit=16, max_limit=16, warmup_samples=5),
+        clock=FakeClock(),
+    )
+    for _ in range(10):
+        limiter.on_success(0.1)
+    limiter.on_success(1.0)
+    assert limiter.limit == 8
+
+
+def test_limit_bounds_threaded_callers():
+    """Threaded callers never exceed the current limit."""
+    print("\n🧵 Testing threaded callers")
+    print("-" * 40)
+
+    from oci_delivery_agent.concurrency import AdaptiveLimiter
+    from oci_delivery_agent.config import ConcurrencyConfig
+
+    limiter = AdaptiveLimiter("genai", ConcurrencyConfig(initial_limit=2, max_limit=2, enabled=True))
+    active = []
+    peak = [0]
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active.append(1)
+            peak[0] = max(peak[0], len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for future in [pool.submit(limiter.call, work) for _ in range(16)]:
+            future.result()
+
+    assert peak[0] <= 2
+    print(f"✅ Peak in-flight {peak[0]} with limit {limiter.limit}")
+
+
+def test_async_callers_share_the_limit():
+    """The async path waits on the same slots as threaded callers."""
+    from oci_delivery_agent.concurrency import AdaptiveLimiter
+    from oci_delivery_agent.config import ConcurrencyConfig
+
+    limiter = AdaptiveLimiter("genai", ConcurrencyConfig(initial_limit=1, max_limit=1, enabled=True))
+    in_flight = []
+
+    def work():
+        in_flight.append(limiter.snapshot()["in_flight"])
+        time.sleep(0.01)
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(*(limiter.call_async(work) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["ok"] * 5
+    assert max(in_flight) == 1
+
+
+def test_slot_wait_bounded_by_deadline():
+    """A queued call gives up when the invocation deadline runs out instead of waiting for a slot."""
+    print("\n⏳ Testing deadline-bounded slot wait")
+    print("-" * 40)
+
+    from oci_delivery_agent.concurrency import GENAI_TEXT, GENAI_VISION, AdaptiveLimiter, limiter_for
+    from oci_delivery_agent.config import ConcurrencyConfig
+    from oci_delivery_agent.deadline import Deadline, DeadlineExceeded
+
+    limiter = AdaptiveLimiter("genai_vision", ConcurrencyConfig(initial_limit=1, max_limit=1, enabled=True))
+    assert limiter.acquire()  # a long call holds the only slot
+    started = time.perf_counter()
+    try:
+        limiter.call(lambda: "late", Deadline(0.1))
+        raise AssertionError("expected DeadlineExceeded")
+    except DeadlineExceeded:
+        waited = time.perf_counter() - started
+    limiter.release()
+    assert 0.05 < waited < 1.0
+    assert limiter.snapshot()["in_flight"] == 0
+    assert limiter.call(lambda: "ok", Deadline(1.0)) == "ok"
+
+    # Vision and text calls keep separate latency baselines
+    assert limiter_for(GENAI_VISION, ConcurrencyConfig()) is not limiter_for(GENAI_TEXT, ConcurrencyConfig())
+    print(f"✅ Gave up after {waited:.2f}s of a 0.1s budget")
+
+
+def test_disabled_by_default_and_reconfigure_clamps():
+    """Limits are opt-in, and a new config's bounds apply to the current limit at once."""
+    print("\n🔧 Testing default and reconfiguration")
+    print("-" * 40)
+
+    from oci_delivery_agent.concurrency import AdaptiveLimiter, limiter_for
+    from oci_delivery_agent.config import ConcurrencyConfig
+    from oci_delivery_agent.handlers import load_config
+
+    previous = os.environ.pop("ADAPTIVE_CONCURRENCY_ENABLED", None)
+    try:
+        assert not load_config().concurrency.enabled
+    finally:
+        if previous is not None:
+            os.environ["ADAPTIVE_CONCURRENCY_ENABLED"] = previous
+    limiter = AdaptiveLimiter("genai", ConcurrencyConfig(initial_limit=1, max_limit=1))
+    assert limiter.acquire()
+    # With limits off nothing waits for the occupied slot
+    assert limiter.call(lambda: "unlimited") == "unlimited"
+    limiter.release()
+
+    limiter = limiter_for("reconfigure-test", ConcurrencyConfig(enabled=True, initial_limit=16, max_limit=32))
+    assert limiter.limit == 16
+    limiter_for("reconfigure-test", ConcurrencyConfig(enabled=True, initial_limit=2, max_limit=4))
+    assert limiter.limit == 4
+    limiter_for("reconfigure-test", ConcurrencyConfig(enabled=True, min_limit=8, initial_limit=8, max_limit=8))
+    assert limiter.limit == 8
+    print("✅ Off by default; limit clamped to 4, then raised to the new floor of 8")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Adaptive Concurrency Test")
+    print("=" * 60)
+
+    test_additive_increase_multiplicative_decrease()
+    test_latency_inflation_cuts_limit()
+    test_limit_bounds_threaded_callers()
+    test_async_callers_share_the_limit()
+    test_slot_wait_bounded_by_deadline()
+    test_disabled_by_default_and_reconfigure_clamps()
+
+    print("\n🎉 All concurrency tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
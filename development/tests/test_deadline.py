@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test invocation deadline propagation and per-stage time budgets.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+ASSET_ROOT = os.path.join(os.path.dirname(__file__), '..', 'assets')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeInvokeContext:
+    def __init__(self, seconds_left):
+        self._deadline = (datetime.now(timezone.utc) + timedelta(seconds=seconds_left)).isoformat()
+
+    def Deadline(self):
+        return self._deadline
+
+
+def test_deadline_countdown():
+    """Remaining budget shrinks with the clock and clips request timeouts."""
+    print("⏱️  Testing Deadline countdown")
+    print("=" * 60)
+
+    from oci_delivery_agent.deadline import Deadline, DeadlineExceeded
+
+    clock = FakeClock()
+    deadline = Deadline(60, clock=clock)
+    assert deadline.request_timeout(10, 240) == (10, 60)
+
+    clock.now += 55
+    assert deadline.can_afford(5)
+    assert not deadline.can_afford(6)
+    assert deadline.request_timeout(10, 240) == (5, 5)
+
+    clock.now += 10
+    assert deadline.expired()
+    try:
+        deadline.request_timeout()
+    except DeadlineExceeded:
+        print("✅ Expired deadline refuses new requests")
+    else:
+        raise AssertionError("expired deadline should raise DeadlineExceeded")
+
+
+def test_deadline_from_invocation():
+    """The Fn deadline wins over the configured timeout when it is sooner."""
+    print("\n📡 Testing Deadline.from_invocation")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import TimeBudgetConfig
+    from oci_delivery_agent.deadline import Deadline
+
+    budget = TimeBudgetConfig(invocation_timeout_seconds=300, safety_margin_seconds=10)
+
+    from_ctx = Deadline.from_invocation(FakeInvokeContext(120), budget)
+    assert 100 < from_ctx.remaining() <= 110
+
+    without_ctx = Deadline.from_invocation(object(), budget)
+    assert 280 < without_ctx.remaining() <= 290
+    print(f"✅ ctx budget={from_ctx.remaining():.1f}s, default budget={without_ctx.remaining():.1f}s")
+
+
+def test_apply_request_timeout():
+    """OCI clients get the remaining budget as their per-call timeout."""
+    print("\n🔧 Testing apply_request_timeout")
+    print("-" * 40)
+
+    from types import SimpleNamespace
+    from oci_delivery_agent.config import TimeBudgetConfig
+    from oci_delivery_agent.deadline import Deadline, apply_request_timeout
+
+    client = SimpleNamespace(base_client=SimpleNamespace(timeout=(10, 240)))
+    apply_request_timeout(client, Deadline(30, clock=FakeClock()), TimeBudgetConfig())
+    assert client.base_client.timeout == (10, 30)
+
+    apply_request_timeout(client, None, TimeBudgetConfig())
+    assert client.base_client.timeout == (10, 30)
+    print("✅ Timeout tuple clipped to remaining budget")
+
+
+def test_thread_local_clients():
+    """Concurrent calls with different deadlines each time their own client."""
+    print("\n🧵 Testing per-thread clients")
+    print("-" * 40)
+
+    import threading
+    from types import SimpleNamespace
+    from oci_delivery_agent.config import TimeBudgetConfig
+    from oci_delivery_agent.deadline import Deadline, ThreadLocalClients, apply_request_timeout
+
+    built = []
+
+    def factory(hostname):
+        client = SimpleNamespace(hostname=hostname, base_client=SimpleNamespace(timeout=(10, 240)))
+        built.append(client)
+        return client
+
+    clients = ThreadLocalClients(factory)
+    assert clients.get("a") is clients.get("a") and clients.get("a") is not clients.get("b")
+
+    both_set = threading.Barrier(2)
+    seen = {}
+
+    def call(name, budget):
+        client = clients.get("a")
+        apply_request_timeout(client, Deadline(budget, clock=FakeClock()), TimeBudgetConfig())
+        both_set.wait()  # the other thread has set its timeout too
+        seen[name] = client.base_client.timeout
+
+    threads = [threading.Thread(target=call, args=("short", 5)), threading.Thread(target=call, args=("long", 60))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen == {"short": (5, 5), "long": (10, 60)}
+    assert len(built) == 4  # a and b here, plus one a per worker thread
+    print(f"✅ Deadline timeouts stay per thread: {seen}")
+
+
+def test_pipeline_degrades_when_budget_short():
+    """Optional LLM stages are skipped instead of overrunning the deadline."""
+    print("\n🧯 Testing graceful degradation of optional stages")
+    print("-" * 50)
+
+    from langchain_community.llms import FakeListLLM
+    from oci_delivery_agent.chains import DeliveryContext, run_quality_pipeline
+    from oci_delivery_agent.config import ObjectStorageConfig, VisionConfig, WorkflowConfig
+    from oci_delivery_agent.deadline import Deadline
+
+    config = WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="", image_caption_model_endpoint=""),
+        local_asset_root=ASSET_ROOT,
+    )
+    context = DeliveryContext(
+        object_name="deliveries/damage1.jpg",
+        expected_latitude=0.0,
+        expected_longitude=0.0,
+        promised_time_utc=datetime(2024, 1, 15, 10, 0),
+        delivered_time_utc=datetime(2024, 1, 15, 9, 30),
+    )
+    # An LLM with no canned responses fails loudly if any chain is invoked
+    llm = FakeListLLM(responses=[])
+
+    result = run_quality_pipeline(
+        config=config,
+        llm=llm,
+        context=context,
+        object_name=context.object_name,
+        deadline=Deadline(5),
+    )
+
+    assert result["time_budget"]["skipped_stages"] == ["caption_summary", "review"]
+    assert result["assessment"]["status"] == "Review"
+    print(f"✅ Skipped stages: {result['time_budget']['skipped_stages']}")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Deadline Propagation Test")
+    print("=" * 60)
+
+    test_deadline_countdown()
+    test_deadline_from_invocation()
+    test_apply_request_timeout()
+    test_thread_local_clients()
+    test_pipeline_degrades_when_budget_short()
+
+    print("\n🎉 All deadline tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test perceptual-hash dedup of burst photos, including precision/recall on a held-out set.
+"""
+
+import io
+import itertools
+import json
+import os
+import sys
+from dataclasses import replace
+from datetime import datetime
+
+from PIL import Image, ImageEnhance
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+ASSET_ROOT = os.path.join(os.path.dirname(__file__), '..', 'assets')
+DELIVERY_PHOTOS = [os.path.join(ASSET_ROOT, "deliveries", f"damage{index}.jpg") for index in range(1, 6)]
+
+
+def _jpeg(image, quality=85):
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def _burst_variants(image):
+    """Shots a driver's second or third photo typically differ by."""
+    width, height = image.size
+    yield _jpeg(image, quality=60)
+    yield _jpeg(ImageEnhance.Brightness(image).enhance(1.1))
+    yield _jpeg(image.crop((int(width * 0.03), int(height * 0.03), int(width * 0.97), int(height * 0.97))))
+    yield _jpeg(image.rotate(2, resample=Image.Resampling.BICUBIC))
+    yield _jpeg(image.crop((int(width * 0.05), 0, width, height)))
+    yield _jpeg(image.resize((width // 3, height // 3)))
+
+
+def test_held_out_precision_recall():
+    """Near-duplicates of one doorstep match; different deliveries never do."""
+    print("🔍 Testing dedup precision/recall on held-out burst set")
+    print("=" * 60)
+
+    from oci_delivery_agent.config import DedupConfig
+    from oci_delivery_agent.dedup import perceptual_hash, precision_recall
+
+    config = DedupConfig()
+    originals = {}
+    pairs = []
+    for path in DELIVERY_PHOTOS:
+        with open(path, "rb") as handle:
+            data = handle.read()
+        image = Image.open(io.BytesIO(data)).convert("RGB")
+        image.thumbnail((2048, 2048))
+        originals[path] = perceptual_hash(data)
+        for variant in _burst_variants(image):
+            pairs.append((originals[path], perceptual_hash(variant), True))
+    for first, second in itertools.combinations(DELIVERY_PHOTOS, 2):
+        pairs.append((originals[first], originals[second], False))
+
+    report = precision_recall(pairs, config.max_distance)
+    assert report["precision"] == 1.0
+    assert report["recall"] >= 0.8
+    print(f"✅ {json.dumps(report)}")
+
+
+def test_burst_index_window_and_groups():
+    """Matches are limited to the same delivery group and time window."""
+    print("\n🪟 Testing burst index window")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import DedupConfig
+    from oci_delivery_agent.dedup import BurstIndex
+
+    index = BurstIndex(DedupConfig(enabled=True, window_seconds=60))
+    index.add("route-7@1.0,2.0", "route-7/a.jpg", 0b1010, 1_000.0, '{"packageVisible": true}', {"overall": {}})
+
+    match = index.find("route-7@1.0,2.0", 0b1011, 1_030.0)
+    assert match.object_name == "route-7/a.jpg" and match.distance == 1
+    assert index.find("route-7@1.0,2.0", 0b1011, 1_100.0) is None  # outside the window
+    assert index.find("route-8@1.0,2.0", 0b1010, 1_000.0) is None  # other delivery
+    print("✅ Window and grouping respected")
+
+
+def test_pipeline_reuses_earlier_analysis():
+    """A burst duplicate skips the caption and damage calls."""
+    print("\n♻️  Testing pipeline reuse")
+    print("-" * 40)
+
+    from langchain_community.llms import FakeListLLM
+    from oci_delivery_agent.chains import DeliveryContext, run_quality_pipeline
+    from oci_delivery_agent.config import DedupConfig, ObjectStorageConfig, VisionConfig, WorkflowConfig
+    from oci_delivery_agent.dedup import burst_group, perceptual_hash, shared_burst_index
+
+    config = WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="", image_caption_model_endpoint=""),
+        dedup=DedupConfig(enabled=True),
+        local_asset_root=ASSET_ROOT,
+    )
+    context = DeliveryContext(
+        object_name="deliveries/damage1.jpg",
+        expected_latitude=40.7128,
+        expected_longitude=-74.0060,
+        promised_time_utc=datetime(2024, 1, 15, 10, 0),
+        delivered_time_utc=datetime(2024, 1, 15, 9, 30, 5),
+        driver_id="driver-1",
+        route_id="route-7",
+        stop_id="stop-12",
+    )
+
+    def group_of(ctx):
+        return burst_group(
+            ctx.object_name,
+            ctx.expected_latitude,
+            ctx.expected_longitude,
+            ctx.driver_id,
+            ctx.route_id,
+            ctx.stop_id,
+            ctx.promised_time_utc.isoformat(),
+        )
+
+    # Another package at the same doorstep, or an event with no delivery identity, never shares the group
+    neighbour = replace(context, stop_id="stop-13")
+    assert group_of(neighbour) != group_of(context)
+    assert group_of(replace(context, driver_id=None, route_id=None, stop_id=None)) is None
+
+    with open(DELIVERY_PHOTOS[0], "rb") as handle:
+        earlier = _jpeg(Image.open(handle).convert("RGB"), quality=60)
+    report = {"overall": {"severity": "minor", "score": 0.35}, "packageVisible": True}
+    shared_burst_index(config.dedup).add(
+        group_of(context),
+        "deliveries/burst-0.jpg",
+        perceptual_hash(earlier),
+        datetime(2024, 1, 15, 9, 30).timestamp(),
+        json.dumps({"packageVisible": True, "overallDescription": "Box on the porch."}),
+        report,
+    )
+
+    result = run_quality_pipeline(
+        config=config,
+        llm=FakeListLLM(responses=["Box on the porch.", '{"status": "Pass", "issues": [], "insights": "ok"}']),
+        context=context,
+        object_name=context.object_name,
+    )
+
+    assert result["dedup"]["duplicate_of"] == "deliveries/burst-0.jpg"
+    assert result["damage_report"] == report
+
+    other = run_quality_pipeline(
+        config=config,
+        llm=FakeListLLM(responses=["Box on the porch.", '{"status": "Pass", "issues": [], "insights": "ok"}']),
+        context=neighbour,
+        object_name=neighbour.object_name,
+    )
+    assert other["dedup"]["duplicate_of"] is None and other["damage_report"] != report
+    print(f"✅ Reused analysis: {result['dedup']}")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Burst Dedup Test")
+    print("=" * 60)
+
+    test_held_out_precision_recall()
+    test_burst_index_window_and_groups()
+    test_pipeline_reuses_earlier_analysis()
+
+    print("\n🎉 All dedup tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test incremental driver_performance rollups against a full recompute.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _result(driver_id, delivered, late_minutes, quality_index):
+    promised = delivered - timedelta(minutes=late_minutes)
+    return {
+        "context": {
+            "object_name": "photo.jpg",
+            "promised_time_utc": promised.isoformat(),
+            "delivered_time_utc": delivered.isoformat(),
+            "driver_id": driver_id,
+        },
+        "quality_metrics": {"quality_index": quality_index},
+    }
+
+
+def test_matches_full_recompute():
+    """Rows flushed in several batches from two instances equal a scan of every event."""
+    print("📊 Testing rollups against a full recompute")
+    print("=" * 60)
+
+    from oci_delivery_agent.config import DriverRollupConfig
+    from oci_delivery_agent.rollups import DriverPerformanceRollup, DriverPerformanceStore
+
+    rng = random.Random(5)
+    results = []
+    for _ in range(3000):
+        delivered = datetime(2024, 5, 1, 6) + timedelta(minutes=rng.randrange(0, 3 * 24 * 60))
+        results.append(_result(f"driver-{rng.randrange(8)}", delivered, rng.randrange(-60, 60), round(rng.random(), 3)))
+    results.append({"context": {"object_name": "legacy.jpg"}, "quality_metrics": {"quality_index": 0.5}})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = DriverRollupConfig(enabled=True, path=os.path.join(tmpdir, "driver.sqlite3"), max_pending_rows=10)
+        clock = FakeClock()
+        first = DriverPerformanceRollup(config, clock=clock)
+        second = DriverPerformanceRollup(config, store=DriverPerformanceStore(config.path), clock=clock)
+        for index, result in enumerate(results):
+            (first if index % 2 else second).record(result)
+        first.flush()
+        second.flush()
+        rows = {(row["driver_id"], row["performance_date"]): row for row in first.store.rows()}
+
+    assert first.flushes > 1 and second.skipped == 1
+
+    expected = defaultdict(lambda: [0, 0.0, 0])
+    for result in results[:-1]:
+        context = result["context"]
+        delivered = datetime.fromisoformat(context["delivered_time_utc"])
+        totals = expected[(context["driver_id"], delivered.date().isoformat())]
+        totals[0] += 1
+        totals[1] += result["quality_metrics"]["quality_index"]
+        totals[2] += delivered <= datetime.fromisoformat(context["promised_time_utc"])
+
+    assert set(rows) == set(expected)
+    for key, (deliveries, quality_sum, on_time) in expected.items():
+        row = rows[key]
+        assert row["total_deliveries"] == deliveries
+        assert row["avg_quality_score"] == round(quality_sum / deliveries, 2), (key, row)
+        assert row["on_time_percentage"] == round(100.0 * on_time / deliveries, 2), (key, row)
+    print(f"✅ {len(rows)} driver-day rows match the recompute")
+
+
+def test_periodic_flush_and_trend():
+    """Rows appear once the flush interval passes, and the trend follows recent quality."""
+    print("\n📈 Testing periodic flush and quality trend")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import DriverRollupConfig
+    from oci_delivery_agent.rollups import DriverPerformanceRollup, DriverPerformanceStore
+
+    clock = FakeClock()
+    config = DriverRollupConfig(enabled=True, flush_interval_seconds=60.0)
+    rollup = DriverPerformanceRollup(config, store=DriverPerformanceStore(":memory:"), clock=clock)
+    start = datetime(2024, 5, 1, 9)
+
+    for index in range(20):
+        rollup.record(_result("up", start + timedelta(minutes=index), 0, 0.5 + index * 0.02))
+        rollup.record(_result("down", start + timedelta(minutes=index), 10, 0.9 - index * 0.02))
+        rollup.record(_result("steady", start + timedelta(minutes=index), -5, 0.8))
+    assert rollup.store.rows() == []
+
+    clock.now += 61
+    rollup.record(_result("steady", start + timedelta(minutes=30), -5, 0.8))
+    trends = {row["driver_id"]: row for row in rollup.store.rows()}
+
+    assert trends["up"]["quality_trend"] == "improving"
+    assert trends["down"]["quality_trend"] == "declining"
+    assert trends["steady"]["quality_trend"] == "stable"
+    assert trends["down"]["on_time_percentage"] == 0.0 and trends["steady"]["on_time_percentage"] == 100.0
+    assert trends["steady"]["total_deliveries"] == 21
+    labels = ", ".join(f"{name}={row['quality_trend']}" for name, row in sorted(trends.items()))
+    print(f"✅ {labels}")
+
+
+def test_record_throughput():
+    """Recording is constant time per event."""
+    print("\n⚡ Testing record throughput")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import DriverRollupConfig
+    from oci_delivery_agent.rollups import DriverPerformanceRollup, DriverPerformanceStore
+
+    config = DriverRollupConfig(enabled=True, flush_interval_seconds=3600.0, max_pending_rows=100_000)
+    rollup = DriverPerformanceRollup(config, store=DriverPerformanceStore(":memory:"))
+    day = datetime(2024, 5, 1).date()
+
+    events = 200_000
+    started = time.perf_counter()
+    for index in range(events):
+        rollup.add(f"driver-{index % 500}", day, 0.8, index % 3 != 0)
+    elapsed = time.perf_counter() - started
+    written = rollup.flush()
+
+    assert written == 500
+    print(f"✅ {events:,} events in {elapsed:.2f}s ({events / elapsed:,.0f} events/s), {written} rows flushed")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Driver Rollup Test")
+    print("=" * 60)
+
+    test_matches_full_recompute()
+    test_periodic_flush_and_trend()
+    test_record_throughput()
+
+    print("\n🎉 All driver rollup tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test load balancing across several GenAI endpoints using local stand-in servers.
+"""
+
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _start_stand_in(delay_seconds, status=200):
+    """Start a local HTTP server that answers every POST after ``delay_seconds``."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay_seconds)
+            body = b'{"text": "ok"}'
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _chat(endpoint):
+    request = urllib.request.Request(
+        f"{endpoint.hostname}/20231130/actions/chat", data=b"{}", method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return endpoint.model_ocid, response.read()
+
+
+def _pool(servers):
+    from oci_delivery_agent.config import GenAIEndpoint
+
+    return [
+        GenAIEndpoint(hostname=f"http://127.0.0.1:{server.server_address[1]}", model_ocid=f"endpoint-{index}")
+        for index, server in enumerate(servers)
+    ]
+
+
+def test_parse_endpoints():
+    """OCI_GENAI_ENDPOINTS entries are hostname|ocid pairs."""
+    print("🔧 Testing endpoint parsing")
+    print("=" * 60)
+
+    from oci_delivery_agent.balancer import parse_endpoints
+
+    endpoints = parse_endpoints(
+        "https://inference.generativeai.us-chicago-1.oci.oraclecloud.com/20231130/actions/generateText|ocid-a,"
+        " https://inference.generativeai.eu-frankfurt-1.oci.oraclecloud.com|ocid-b"
+    )
+    assert [e.model_ocid for e in endpoints] == ["ocid-a", "ocid-b"]
+    assert endpoints[0].hostname == "https://inference.generativeai.us-chicago-1.oci.oraclecloud.com"
+
+    try:
+        parse_endpoints("https://missing-ocid")
+    except ValueError:
+        print("✅ Malformed entries rejected")
+    else:
+        raise AssertionError("entry without OCID should be rejected")
+
+
+def test_latency_weighted_prefers_fast_endpoint():
+    """The fast stand-in receives most of the traffic."""
+    print("\n⚖️  Testing latency-weighted balancing")
+    print("-" * 45)
+
+    from oci_delivery_agent.balancer import EndpointBalancer
+    from oci_delivery_agent.config import EndpointPoolConfig
+
+    fast, slow = _start_stand_in(0.01), _start_stand_in(0.15)
+    try:
+        balancer = EndpointBalancer(_pool([fast, slow]), EndpointPoolConfig(strategy="latency_weighted"))
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: balancer.call(_chat)[0], range(40)))
+    finally:
+        fast.shutdown()
+        slow.shutdown()
+
+    fast_share = results.count("endpoint-0") / len(results)
+    assert fast_share > 0.6
+    print(f"✅ Fast endpoint served {fast_share:.0%} of requests: {balancer.snapshot()}")
+
+
+def test_least_outstanding_spreads_concurrent_load():
+    """Equal endpoints share concurrent load evenly."""
+    from oci_delivery_agent.balancer import EndpointBalancer
+    from oci_delivery_agent.config import EndpointPoolConfig
+
+    servers = [_start_stand_in(0.05) for _ in range(3)]
+    try:
+        balancer = EndpointBalancer(_pool(servers), EndpointPoolConfig())
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda _: balancer.call(_chat)[0], range(30)))
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    counts = [results.count(f"endpoint-{index}") for index in range(3)]
+    assert min(counts) >= 5, counts
+
+
+def test_failing_endpoint_is_ejected():
+    """Consecutive failures take an endpoint out of rotation."""
+    print("\n🚑 Testing health-based ejection")
+    print("-" * 40)
+
+    from oci_delivery_agent.balancer import EndpointBalancer
+    from oci_delivery_agent.config import EndpointPoolConfig
+
+    healthy, broken = _start_stand_in(0.0), _start_stand_in(0.0, status=500)
+    try:
+        balancer = EndpointBalancer(
+            _pool([broken, healthy]),
+            EndpointPoolConfig(failure_threshold=2, ejection_seconds=60),
+        )
+        failures = 0
+        served = []
+        for _ in range(10):
+            try:
+                served.append(balancer.call(_chat)[0])
+            except Exception:
+                failures += 1
+    finally:
+        healthy.shutdown()
+        broken.shutdown()
+
+    snapshot = {state["model_ocid"]: state for state in balancer.snapshot()}
+    assert failures == 2
+    assert snapshot["endpoint-0"]["ejected"]
+    assert served.count("endpoint-1") == 8
+    print(f"✅ Broken endpoint ejected after {failures} failures")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Endpoint Balancer Test")
+    print("=" * 60)
+
+    test_parse_endpoints()
+    test_latency_weighted_prefers_fast_endpoint()
+    test_least_outstanding_spreads_concurrent_load()
+    test_failing_endpoint_is_ejected()
+
+    print("\n🎉 All endpoint balancer tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test the face detection cache shared by the face-blur function and FaceBlurringTool.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+# face_cache.py is a stdlib-only module of the face-blur function; load it by path
+# so that function's own oci_delivery_agent package never lands on sys.path
+FACE_CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'face-blur-function', 'src', 'face_cache.py')
+
+
+def _face_cache():
+    spec = importlib.util.spec_from_file_location("face_cache", FACE_CACHE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+IMAGE = b"\xff\xd8delivery photo with two people in the background"
+HAAR_PARAMS = {"scale_factor": 1.05, "min_neighbors": 3, "min_face_size": [20, 20]}
+VISION_PARAMS = {"max_results": 100, "return_landmarks": True, "min_dimension": 600, "confidence_threshold": 0.0}
+VISION_FACES = [{"x": 10, "y": 12, "width": 40, "height": 40, "confidence": 0.98},
+                {"x": 200, "y": 30, "width": 22, "height": 24, "confidence": 0.71}]
+HAAR_FACES = [{"x": 11, "y": 12, "width": 39, "height": 41, "confidence": 1.0}]
+
+
+class NotFound(Exception):
+    status = 404
+
+
+class FakeObjectStorage:
+    """Just enough of the OCI Object Storage client for the sidecar objects."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, namespace_name, bucket_name, object_name):
+        if object_name not in self.objects:
+            raise NotFound(object_name)
+        return SimpleNamespace(data=SimpleNamespace(content=self.objects[object_name]))
+
+    def put_object(self, namespace_name, bucket_name, object_name, put_object_body, content_type):
+        self.objects[object_name] = put_object_body
+
+
+def _detector(faces, calls):
+    def detect():
+        calls.append(1)
+        return list(faces)
+    return detect
+
+
+def test_keys_match_detector_and_params():
+    """Entries are keyed on detector plus settings; other settings of the same detector miss."""
+    print("🔑 Testing detector keys")
+    print("=" * 60)
+
+    face_cache = _face_cache()
+    key = face_cache.detector_key(face_cache.HAAR_DETECTOR, HAAR_PARAMS)
+    assert key == face_cache.detector_key(face_cache.HAAR_DETECTOR, dict(reversed(list(HAAR_PARAMS.items()))))
+    assert key != face_cache.detector_key(face_cache.HAAR_DETECTOR, dict(HAAR_PARAMS, min_neighbors=5))
+    assert key != face_cache.detector_key(face_cache.OCI_VISION_DETECTOR, HAAR_PARAMS)
+
+    cache = face_cache.FaceCache()
+    cache.store(IMAGE, face_cache.HAAR_DETECTOR, HAAR_PARAMS, HAAR_FACES)
+    own = [(face_cache.HAAR_DETECTOR, HAAR_PARAMS)]
+    assert cache.lookup(IMAGE, own)["faces"] == HAAR_FACES
+    assert cache.lookup(IMAGE, [(face_cache.HAAR_DETECTOR, dict(HAAR_PARAMS, min_neighbors=5))]) is None
+    assert cache.lookup(IMAGE + b"!", own) is None
+    assert cache.stats == {"hits": 1, "misses": 2, "stores": 1}
+    print("✅ Same settings hit in any key order; other settings and other images miss")
+
+
+def test_default_reuses_only_own_detector():
+    """Without FACE_CACHE_ACCEPT each caller reuses only its own boxes."""
+    print("\n🛡️  Testing default accept list")
+    print("-" * 40)
+
+    face_cache = _face_cache()
+    previous = {name: os.environ.pop(name, None) for name in ("FACE_CACHE_ACCEPT", "FACE_CACHE_ALLOW_LOWER_RECALL")}
+    try:
+        assert face_cache.accepted_detectors_from_env(face_cache.OCI_VISION_DETECTOR) == ["oci_vision"]
+        assert not face_cache.allow_lower_recall_from_env()
+
+        cache = face_cache.FaceCache()
+        cache.store(IMAGE, face_cache.HAAR_DETECTOR, HAAR_PARAMS, HAAR_FACES)
+        calls = []
+        faces, detector, source = face_cache.detect_with_cache(
+            cache, IMAGE, face_cache.OCI_VISION_DETECTOR, VISION_PARAMS, _detector(VISION_FACES, calls)
+        )
+        assert (faces, detector, source, len(calls)) == (VISION_FACES, "oci_vision", face_cache.DETECTED, 1)
+
+        # The Haar tool does not pick up Vision's boxes either until it opts in
+        cache = face_cache.FaceCache()
+        cache.store(IMAGE, face_cache.OCI_VISION_DETECTOR, VISION_PARAMS, VISION_FACES)
+        faces, detector, source = face_cache.detect_with_cache(
+            cache, IMAGE, face_cache.HAAR_DETECTOR, HAAR_PARAMS, _detector(HAAR_FACES, calls)
+        )
+        assert (detector, source, len(calls)) == ("haar", face_cache.DETECTED, 2)
+    finally:
+        for name, value in previous.items():
+            if value is not None:
+                os.environ[name] = value
+    print("✅ Both callers ran their own detector")
+
+
+def test_accept_order_and_cross_detector_fallback():
+    """Accepted detectors are tried in order; lower-recall boxes need a second opt-in."""
+    print("\n🔀 Testing accept order and cross-detector reuse")
+    print("-" * 40)
+
+    face_cache = _face_cache()
+    storage = FakeObjectStorage()
+    blur_function = face_cache.FaceCache(storage, "ns", "bucket")
+    pipeline = face_cache.FaceCache(storage, "ns", "bucket")
+
+    # The face-blur function runs first and leaves its boxes in the sidecar object
+    calls = []
+    faces, detector, source = face_cache.detect_with_cache(
+        blur_function, IMAGE, face_cache.OCI_VISION_DETECTOR, VISION_PARAMS, _detector(VISION_FACES, calls),
+        accepted=["oci_vision"], allow_lower_recall=False,
+    )
+    assert source == face_cache.DETECTED and len(calls) == 1
+    assert list(storage.objects) == [f"face-cache/{face_cache.content_hash(IMAGE)}.json"]
+
+    # Haar with Vision accepted reuses the higher-recall boxes from another process
+    faces, detector, source = face_cache.detect_with_cache(
+        pipeline, IMAGE, face_cache.HAAR_DETECTOR, HAAR_PARAMS, _detector(HAAR_FACES, calls),
+        accepted=["oci_vision", "haar"], allow_lower_recall=False,
+    )
+    assert (faces, detector, source, len(calls)) == (VISION_FACES, "oci_vision", face_cache.CACHE, 1)
+
+    # Once both entries exist the accept list decides which one wins
+    pipeline.store(IMAGE, face_cache.HAAR_DETECTOR, HAAR_PARAMS, HAAR_FACES)
+    candidates = face_cache.lookup_candidates(face_cache.HAAR_DETECTOR, HAAR_PARAMS, ["haar", "oci_vision"])
+    assert candidates == [("haar", HAAR_PARAMS), ("oci_vision", None)]
+    assert pipeline.lookup(IMAGE, candidates)["detector"] == "haar"
+    candidates = face_cache.lookup_candidates(face_cache.HAAR_DETECTOR, HAAR_PARAMS, ["oci_vision", "haar"])
+    assert pipeline.lookup(IMAGE, candidates)["detector"] == "oci_vision"
+
+    # The Vision privacy blur drops Haar from its accept list unless lower recall is allowed too
+    fresh = face_cache.FaceCache(storage, "ns", "bucket")
+    assert face_cache.lookup_candidates(
+        face_cache.OCI_VISION_DETECTOR, dict(VISION_PARAMS, max_results=5), ["haar", "oci_vision"]
+    ) == [("oci_vision", dict(VISION_PARAMS, max_results=5))]
+    faces, detector, source = face_cache.detect_with_cache(
+        fresh, IMAGE, face_cache.OCI_VISION_DETECTOR, dict(VISION_PARAMS, max_results=5),
+        _detector(VISION_FACES, calls), accepted=["haar", "oci_vision"], allow_lower_recall=False,
+    )
+    assert source == face_cache.DETECTED and len(calls) == 2
+    faces, detector, source = face_cache.detect_with_cache(
+        fresh, IMAGE, face_cache.OCI_VISION_DETECTOR, dict(VISION_PARAMS, min_dimension=300),
+        _detector(VISION_FACES, calls), accepted=["haar", "oci_vision"], allow_lower_recall=True,
+    )
+    assert (faces, detector, source, len(calls)) == (HAAR_FACES, "haar", face_cache.CACHE, 2)
+
+    stored = json.loads(storage.objects[f"face-cache/{face_cache.content_hash(IMAGE)}.json"])
+    assert sorted(entry["detector"] for entry in stored.values()) == ["haar", "oci_vision", "oci_vision"]
+    print(f"✅ {len(calls)} detections for 5 lookups; sidecar holds {len(stored)} entries")
+
+
+def test_cache_errors_are_misses():
+    """A failing sidecar read or write falls back to detection."""
+    face_cache = _face_cache()
+
+    class Broken:
+        def get_object(self, **kwargs):
+            raise RuntimeError("object storage unavailable")
+
+        def put_object(self, **kwargs):
+            raise RuntimeError("object storage unavailable")
+
+    calls = []
+    faces, detector, source = face_cache.detect_with_cache(
+        face_cache.FaceCache(Broken(), "ns", "bucket"), IMAGE, face_cache.HAAR_DETECTOR, HAAR_PARAMS,
+        _detector(HAAR_FACES, calls), accepted=["haar"], allow_lower_recall=False,
+    )
+    assert (faces, source, len(calls)) == (HAAR_FACES, face_cache.DETECTED, 1)
+
+
+def main():
+    """Main test function"""
+    print("🚀 Face Cache Test")
+    print("=" * 60)
+
+    test_keys_match_detector_and_params()
+    test_default_reuses_only_own_detector()
+    test_accept_order_and_cross_detector_fallback()
+    test_cache_errors_are_misses()
+
+    print("\n🎉 All face cache tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Test the rule-based fast paths that settle clear-cut deliveries without the text LLM stages.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+CAPTION = {
+    "sceneType": "delivery",
+    "packageVisible": True,
+    "packageDescription": "brown cardboard box",
+    "location": {"type": "doorstep", "description": "front door"},
+    "environment": {"weather": "clear", "timeOfDay": "morning", "conditions": "dry"},
+    "safetyAssessment": {"protected": True, "visible": True, "secure": True, "notes": ""},
+    "overallDescription": "A box on the doorstep.",
+}
+NO_DAMAGE = {"overall": {"severity": "none", "score": 0.05}, "packageVisible": True}
+MINOR_DAMAGE = {"overall": {"severity": "minor", "score": 0.35}, "packageVisible": True}
+SEVERE_DAMAGE = {"overall": {"severity": "severe", "score": 0.9}, "packageVisible": True}
+
+
+def _metrics(location=1.0, timeliness=1.0, package=0.95, index=None):
+    if index is None:
+        index = round(0.4 * location + 0.3 * timeliness + 0.3 * package, 3)
+    return {"location_accuracy": location, "timeliness": timeliness, "package_quality": package, "quality_index": index}
+
+
+def test_rules():
+    """Each rule fires only on its clear-cut case; everything else goes to the LLM."""
+    print("🛤️  Testing fast-path rules")
+    print("=" * 60)
+
+    from oci_delivery_agent.config import FastPathConfig
+    from oci_delivery_agent.fast_paths import CLEAR_PASS, CLEAR_REVIEW, NO_PACKAGE, decide
+
+    config = FastPathConfig(enabled=True)
+    assert decide(CAPTION, NO_DAMAGE, _metrics(), FastPathConfig()) is None  # disabled
+
+    decision = decide(CAPTION, NO_DAMAGE, _metrics(), config)
+    assert decision.rule == CLEAR_PASS and decision.assessment["status"] == "OK"
+    assert decision.caption_summary.startswith("Package (brown cardboard box) delivered at the doorstep.")
+    assert "visible from the street" in decision.caption_summary
+
+    hidden = dict(CAPTION, packageVisible=False, packageDescription="none")
+    decision = decide(hidden, dict(NO_DAMAGE, packageVisible=False), _metrics(), config)
+    assert decision.rule == NO_PACKAGE and decision.assessment["status"] == "Review"
+    assert decide(hidden, NO_DAMAGE, _metrics(), config) is None  # damage stage saw a package: ambiguous
+
+    decision = decide(CAPTION, SEVERE_DAMAGE, _metrics(location=0.0, timeliness=0.5, package=0.1), config)
+    assert decision.rule == CLEAR_REVIEW and decision.assessment["status"] == "Review"
+    assert "Damage severity: severe" in decision.assessment["issues"]
+    assert "Low location accuracy: 0.0" in decision.assessment["issues"]
+
+    # Ambiguous: minor damage, a late delivery, or failed vision output
+    assert decide(CAPTION, MINOR_DAMAGE, _metrics(package=0.65), config) is None
+    assert decide(CAPTION, NO_DAMAGE, _metrics(timeliness=0.75), config) is None
+    assert decide({"error": "missing_credentials"}, NO_DAMAGE, _metrics(), config) is None
+    assert decide(CAPTION, {"error": "json_parse_failed"}, _metrics(index=0.1), config) is None
+    print("✅ clear_pass, no_package and clear_review fire only on clear-cut inputs")
+
+
+class _CountingLLM:
+    """FakeListLLM that takes ``seconds`` per call, so saved latency is visible."""
+
+    def __init__(self, seconds):
+        from langchain_community.llms import FakeListLLM
+
+        self.calls = 0
+        outer = self
+
+        class Slow(FakeListLLM):
+            def _call(self, *args, **kwargs):
+                outer.calls += 1
+                time.sleep(seconds)
+                return super()._call(*args, **kwargs)
+
+        self.llm = Slow(responses=["Box on the doorstep.", '{"status": "OK", "issues": [], "insights": "fine"}'])
+
+
+def _fake_tools(damage_report, latitude, caption=CAPTION, damage_calls=None):
+    def tool(run):
+        return SimpleNamespace(run=run)
+
+    def damage(payload, caption_context=None):
+        if damage_calls is not None:
+            damage_calls.append(caption_context)
+        return json.dumps(damage_report)
+
+    return {
+        "retrieval": tool(lambda name: json.dumps({"payload": "", "metadata": {"object_name": name}})),
+        "exif": tool(lambda payload: json.dumps({"GPSInfo": {"latitude": latitude, "longitude": -74.0060}})),
+        "caption": tool(lambda payload: json.dumps(caption)),
+        "damage": tool(damage),
+    }
+
+
+def test_pipeline_records_path_and_savings():
+    """Clear-cut deliveries skip both LLM calls; the path and estimated savings are reported."""
+    print("\n⏱️  Testing pipeline fast paths")
+    print("-" * 40)
+
+    import oci_delivery_agent.chains as chains
+    from oci_delivery_agent.chains import DeliveryContext, run_quality_pipeline
+    from oci_delivery_agent.config import FastPathConfig, ObjectStorageConfig, VisionConfig, WorkflowConfig
+
+    config = WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="", image_caption_model_endpoint=""),
+        fast_paths=FastPathConfig(enabled=True),
+    )
+    cases = [
+        ("clear_pass", NO_DAMAGE, 40.7128, datetime(2024, 1, 15, 9, 30)),
+        ("llm", MINOR_DAMAGE, 40.7128, datetime(2024, 1, 15, 9, 30)),
+        ("clear_review", SEVERE_DAMAGE, 41.0, datetime(2024, 1, 15, 14, 0)),
+    ]
+    original = chains.toolset
+    results = {}
+    try:
+        for expected, report, latitude, delivered in cases:
+            context = DeliveryContext(
+                object_name="deliveries/fast.jpg",
+                expected_latitude=40.7128,
+                expected_longitude=-74.0060,
+                promised_time_utc=datetime(2024, 1, 15, 10, 0),
+                delivered_time_utc=delivered,
+            )
+            chains.toolset = lambda config, deadline, report=report, latitude=latitude: _fake_tools(report, latitude)
+            counting = _CountingLLM(seconds=0.05)
+            started = time.perf_counter()
+            result = run_quality_pipeline(config=config, llm=counting.llm, context=context, object_name=context.object_name)
+            elapsed = time.perf_counter() - started
+            assert result["decision"]["path"] == expected, (expected, result["decision"], result["quality_metrics"])
+            results[expected] = (result, counting.calls, elapsed)
+    finally:
+        chains.toolset = original
+
+    fast_result, fast_calls, fast_seconds = results["clear_pass"]
+    llm_result, llm_calls, llm_seconds = results["llm"]
+    review_result, review_calls, _ = results["clear_review"]
+    assert fast_calls == 0 and review_calls == 0 and llm_calls == 2
+    assert fast_result["assessment"]["status"] == "OK" and review_result["assessment"]["status"] == "Review"
+    assert fast_result["caption_summary"].startswith("Package (brown cardboard box)")
+    assert llm_result["caption_summary"] == "Box on the doorstep."
+    assert fast_seconds < llm_seconds
+
+    metrics = review_result["decision"]["fast_paths"]
+    assert metrics["decisions"]["clear_pass"] >= 1 and metrics["decisions"]["llm"] >= 1
+    assert metrics["llm_stage_seconds_mean"] > 0 and metrics["estimated_seconds_saved"] > 0
+    print(f"✅ LLM path {llm_seconds:.2f}s vs rule path {fast_seconds:.3f}s; {json.dumps(metrics)}")
+
+
+def test_damage_short_circuit():
+    """No package in the caption skips the damage call; sampled cases still reach the model."""
+    print("\n📦 Testing damage short-circuit")
+    print("-" * 40)
+
+    import oci_delivery_agent.chains as chains
+    from oci_delivery_agent.chains import DeliveryContext, run_quality_pipeline
+    from oci_delivery_agent.config import DamageShortCircuitConfig, ObjectStorageConfig, VisionConfig, WorkflowConfig
+    from oci_delivery_agent.fast_paths import MODEL, SAMPLED, SHORT_CIRCUIT, damage_stage, fast_path_metrics
+
+    hidden = dict(CAPTION, packageVisible=False, packageDescription="none")
+    config = DamageShortCircuitConfig(enabled=True, sample_rate=0.1)
+    stages = [damage_stage(hidden, f"deliveries/{index}.jpg", config) for index in range(5000)]
+    assert 0.08 < stages.count(SAMPLED) / len(stages) < 0.12
+    assert damage_stage(hidden, "deliveries/7.jpg", config) == stages[7]  # replays take the same branch
+    assert damage_stage(CAPTION, "deliveries/7.jpg", config) == MODEL
+    assert damage_stage({"error": "bad json"}, "deliveries/7.jpg", config) == MODEL
+    assert damage_stage(hidden, "deliveries/7.jpg", DamageShortCircuitConfig()) == MODEL
+
+    context = DeliveryContext(
+        object_name="deliveries/empty-porch.jpg",
+        expected_latitude=40.7128,
+        expected_longitude=-74.0060,
+        promised_time_utc=datetime(2024, 1, 15, 10, 0),
+        delivered_time_utc=datetime(2024, 1, 15, 9, 30),
+    )
+    disagreeing = {"overall": {"severity": "minor", "score": 0.3}, "packageVisible": True}
+    original = chains.toolset
+    before = fast_path_metrics()["damage_short_circuit"]
+    try:
+        runs = {}
+        for rate in (0.0, 1.0):
+            calls = []
+            chains.toolset = lambda config, deadline, calls=calls: _fake_tools(
+                disagreeing, 40.7128, caption=hidden, damage_calls=calls
+            )
+            config = WorkflowConfig(
+                object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+                vision=VisionConfig(compartment_id="", image_caption_model_endpoint=""),
+                damage_short_circuit=DamageShortCircuitConfig(enabled=True, sample_rate=rate),
+            )
+            llm = _CountingLLM(seconds=0).llm
+            runs[rate] = (run_quality_pipeline(config=config, llm=llm, context=context, object_name=context.object_name), calls)
+    finally:
+        chains.toolset = original
+
+    skipped, skipped_calls = runs[0.0]
+    assert skipped_calls == [] and skipped["decision"]["damage_stage"] == SHORT_CIRCUIT
+    assert skipped["damage_report"]["source"] == SHORT_CIRCUIT
+    assert skipped["damage_report"]["overall"]["score"] == 0.0
+    assert skipped["quality_metrics"]["package_quality"] == 1.0
+
+    sampled, sampled_calls = runs[1.0]
+    assert len(sampled_calls) == 1 and sampled["decision"]["damage_stage"] == SAMPLED
+    assert sampled["damage_report"] == disagreeing
+
+    after = fast_path_metrics()["damage_short_circuit"]
+    assert after["short_circuited"] == before["short_circuited"] + 1
+    assert after["sampled"] == before["sampled"] + 1 and after["disagreements"] == before["disagreements"] + 1
+    print(f"✅ Skipped the damage call, sampled one back to the model: {json.dumps(after)}")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Fast Path Test")
+    print("=" * 60)
+
+    test_rules()
+    test_pipeline_records_path_and_savings()
+    test_damage_short_circuit()
+
+    print("\n🎉 All fast path tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
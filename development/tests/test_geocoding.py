@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test offline address/stop geocoding, the cached remote fallback and a bulk-load benchmark.
+
+The benchmark size defaults to 200k points to keep the suite quick; set
+GEOCODING_BENCH_POINTS=3000000 for a full-scale run.
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+STREETS = ["Main Street", "Oak Avenue", "Pine Road", "Maple Drive", "Cedar Lane", "Elm Court", "Lake Boulevard"]
+
+
+def _write_points(path, count):
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["address", "latitude", "longitude", "stop_id"])
+        for number in range(count):
+            street = STREETS[number % len(STREETS)]
+            writer.writerow([
+                f"{number // len(STREETS) + 1} {street}, Springfield",
+                f"{40.0 + (number % 1000) * 1e-4:.6f}",
+                f"{-74.0 - (number // 1000) * 1e-4:.6f}",
+                f"STOP-{number:07d}",
+            ])
+
+
+def test_local_address_and_stop_lookup():
+    """Normalized addresses and stop IDs resolve from the preloaded file."""
+    print("🗺️  Testing local geocoding index")
+    print("=" * 60)
+
+    from oci_delivery_agent.config import GeolocationConfig
+    from oci_delivery_agent.geocoding import Geocoder
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "points.csv")
+        _write_points(path, 100)
+        geocoder = Geocoder(GeolocationConfig(address_points_path=path))
+
+    assert geocoder.resolve(address="1 Main Street, Springfield") == (40.0, -74.0)
+    assert geocoder.resolve(address="1 MAIN ST.  springfield") == (40.0, -74.0)
+    assert geocoder.resolve(stop_id="STOP-0000008") == (40.0008, -74.0)
+    assert geocoder.resolve(address="999 Nowhere Street") is None
+    print(f"✅ {geocoder.stats}")
+
+
+def test_hash_collisions_are_detected():
+    """Keys whose 64-bit hashes collide still resolve to their own point, and absent keys miss."""
+    print("\n🧮 Testing hash collisions")
+    print("-" * 40)
+
+    import threading
+    from oci_delivery_agent.config import GeolocationConfig
+    from oci_delivery_agent.geocoding import AddressIndex, Geocoder, _HashIndex
+
+    class Colliding(_HashIndex):
+        _digest = staticmethod(lambda key: 7)
+
+    index = Colliding()
+    for number in range(1, 6):
+        index.add(f"{number} main st", 40.0 + number, -74.0)
+    index.freeze()
+    for number in range(1, 6):
+        assert index.get(f"{number} main st") == (40.0 + number, -74.0)
+    assert index.get("999 nowhere st") is None
+
+    # Concurrent lookups on the shared geocoder keep exact counts
+    geocoder = Geocoder(GeolocationConfig(), index=AddressIndex.from_rows([("1 Main Street", 40.0, -74.0, None)]))
+    threads = [
+        threading.Thread(target=lambda: [geocoder.resolve(address="1 Main Street") for _ in range(2000)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert geocoder.stats["local"] == 16000
+    print(f"✅ 5 colliding keys told apart by fingerprint; {geocoder.stats}")
+
+
+def _start_geocoder_service(known):
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)["q"][0]
+            calls.append(query)
+            body = json.dumps([known[query]] if query in known else []).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, calls
+
+
+def test_remote_fallback_is_cached():
+    """Addresses missing locally go to the endpoint once, including misses."""
+    print("\n🌐 Testing cached remote fallback")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import GeolocationConfig
+    from oci_delivery_agent.geocoding import Geocoder
+
+    server, calls = _start_geocoder_service({"12 Harbor Way": {"lat": "41.5", "lon": "-70.25"}})
+    try:
+        geocoder = Geocoder(
+            GeolocationConfig(geocoding_api_endpoint=f"http://127.0.0.1:{server.server_address[1]}/search")
+        )
+        assert geocoder.resolve(address="12 Harbor Way") == (41.5, -70.25)
+        assert geocoder.resolve(address="12 harbor way") == (41.5, -70.25)
+        assert geocoder.resolve(address="1 Unknown Street") is None
+        assert geocoder.resolve(address="1 Unknown St") is None
+    finally:
+        server.shutdown()
+
+    assert calls == ["12 Harbor Way", "1 Unknown Street"]
+    print(f"✅ 4 lookups, {len(calls)} HTTP calls: {geocoder.stats}")
+
+
+def test_event_with_only_a_stop_id():
+    """Handlers fill expected coordinates from deliveryStopId when they are absent."""
+    print("\n📨 Testing event context resolution")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import GeolocationConfig, ObjectStorageConfig, VisionConfig, WorkflowConfig
+    from oci_delivery_agent.handlers import _context_from_event
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "points.csv")
+        _write_points(path, 20)
+        config = WorkflowConfig(
+            object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+            vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+            geolocation=GeolocationConfig(address_points_path=path),
+        )
+        payload = {
+            "eventTime": "2024-01-15T09:30:00",
+            "data": {"resourceName": "deliveries/damage1.jpg"},
+            "additionalDetails": {"deliveryStopId": "STOP-0000003", "promisedTime": "2024-01-15T10:00:00"},
+        }
+        context = _context_from_event(payload, config)
+
+    assert (context.expected_latitude, context.expected_longitude) == (40.0003, -74.0)
+    print("✅ Stop ID resolved to expected coordinates")
+
+
+def test_bulk_load_benchmark():
+    """Bulk load is linear and lookups stay well under a millisecond."""
+    print("\n⏱️  Benchmarking bulk load")
+    print("-" * 40)
+
+    from oci_delivery_agent.geocoding import AddressIndex
+
+    count = int(os.environ.get("GEOCODING_BENCH_POINTS", "200000"))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "points.csv")
+        _write_points(path, count)
+        started = time.perf_counter()
+        index = AddressIndex.from_csv(path)
+        load_seconds = time.perf_counter() - started
+
+    probes = [f"{n // len(STREETS) + 1} {STREETS[n % len(STREETS)]}, Springfield" for n in range(0, count, max(1, count // 10000))]
+    started = time.perf_counter()
+    for address in probes:
+        assert index.lookup_address(address) is not None
+    per_lookup_us = (time.perf_counter() - started) / len(probes) * 1e6
+
+    assert len(index) == count
+    assert per_lookup_us < 1000
+    print(f"✅ {count} points loaded in {load_seconds:.2f}s ({count / load_seconds:,.0f}/s), {per_lookup_us:.1f}µs per lookup")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Geocoding Test")
+    print("=" * 60)
+
+    test_local_address_and_stop_lookup()
+    test_hash_collisions_are_detected()
+    test_remote_fallback_is_cached()
+    test_event_with_only_a_stop_id()
+    test_bulk_load_benchmark()
+
+    print("\n🎉 All geocoding tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test request hedging for GenAI vision tail latency.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def test_latency_histogram_percentiles():
+    """Nearest-rank percentiles over the sliding window."""
+    print("📊 Testing LatencyHistogram")
+    print("=" * 60)
+
+    from oci_delivery_agent.hedging import LatencyHistogram
+
+    histogram = LatencyHistogram(window=100)
+    assert histogram.percentile(95) is None
+    for value in range(1, 101):
+        histogram.record(value / 100)
+
+    assert histogram.percentile(50) == 0.5
+    assert histogram.percentile(95) == 0.95
+    histogram.record(5.0)  # evicts the oldest sample
+    assert histogram.count() == 100
+    assert histogram.percentile(100) == 5.0
+    print("✅ p50/p95 computed over the most recent window")
+
+
+def _warm(hedger, endpoint, seconds, samples=20):
+    for _ in range(samples):
+        hedger.histogram(endpoint).record(seconds)
+
+
+def test_hedge_wins_against_slow_replica():
+    """A call slower than p95 is duplicated and the faster answer is used."""
+    print("\n🏎️  Testing hedged call")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import HedgingConfig
+    from oci_delivery_agent.hedging import RequestHedger
+
+    hedger = RequestHedger(HedgingConfig(enabled=True, min_samples=20, max_hedge_ratio=1.0))
+    _warm(hedger, "endpoint-a", 0.02)
+
+    calls = []
+    lock = threading.Lock()
+
+    def flaky_replica():
+        with lock:
+            calls.append(len(calls))
+            attempt = calls[-1]
+        time.sleep(1.0 if attempt == 0 else 0.01)
+        return f"answer-{attempt}"
+
+    started = time.perf_counter()
+    result = hedger.call("endpoint-a", flaky_replica)
+    elapsed = time.perf_counter() - started
+
+    assert result == "answer-1"
+    assert elapsed < 0.5
+    stats = hedger.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    print(f"✅ Hedge answered in {elapsed * 1000:.0f} ms: {stats}")
+
+
+def test_hedge_ratio_cap():
+    """No hedges are fired once the ratio budget is spent."""
+    print("\n💰 Testing hedge ratio cap")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import HedgingConfig
+    from oci_delivery_agent.hedging import RequestHedger
+
+    hedger = RequestHedger(HedgingConfig(enabled=True, min_samples=20, max_hedge_ratio=0.0))
+    _warm(hedger, "endpoint-b", 0.01)
+
+    result = hedger.call("endpoint-b", lambda: time.sleep(0.1) or "primary")
+    assert result == "primary"
+    assert hedger.stats()["hedges"] == 0
+    print("✅ Slow call served by the primary without hedging")
+
+
+def test_disabled_hedger_runs_inline():
+    """Disabled hedging calls through on the caller's thread."""
+    from oci_delivery_agent.config import HedgingConfig
+    from oci_delivery_agent.hedging import RequestHedger
+
+    hedger = RequestHedger(HedgingConfig(enabled=False))
+    caller = threading.get_ident()
+    assert hedger.call("endpoint-c", threading.get_ident) == caller
+    assert hedger.histogram("endpoint-c").count() == 1
+
+
+def test_histograms_are_per_endpoint():
+    """In a mixed pool each endpoint's hedge delay comes from its own latency only."""
+    print("\n🎯 Testing per-endpoint latency")
+    print("-" * 40)
+
+    from concurrent.futures import ThreadPoolExecutor
+    from oci_delivery_agent.config import (
+        EndpointPoolConfig,
+        GenAIEndpoint,
+        HedgingConfig,
+        ObjectStorageConfig,
+        VisionConfig,
+        WorkflowConfig,
+    )
+    from oci_delivery_agent.tools import VisionClient
+
+    fast = GenAIEndpoint(hostname="https://genai.invalid", model_ocid="ocid1.test.hedge-fast")
+    slow = GenAIEndpoint(hostname="https://genai.invalid", model_ocid="ocid1.test.hedge-slow")
+    config = WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+        endpoint_pool=EndpointPoolConfig(endpoints=[fast, slow]),
+        hedging=HedgingConfig(enabled=True, min_samples=5, max_hedge_ratio=0.0),
+    )
+    client = VisionClient(config)
+    client._chat = lambda endpoint, request, compartment: time.sleep(0.002 if endpoint is fast else 0.06) or "{}"
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda _: client._ask("damage", [fast, slow], None, "test"), range(60)))
+
+    fast_histogram = client._hedger.histogram(f"{fast.model_ocid}/damage")
+    slow_histogram = client._hedger.histogram(f"{slow.model_ocid}/damage")
+    assert fast_histogram.count() and slow_histogram.count()
+    assert fast_histogram.count() + slow_histogram.count() == 60
+    assert fast_histogram.percentile(100) < 0.06 <= slow_histogram.percentile(0)
+    print(f"✅ fast p95 {fast_histogram.percentile(95) * 1000:.0f} ms over {fast_histogram.count()} calls, "
+          f"slow p95 {slow_histogram.percentile(95) * 1000:.0f} ms over {slow_histogram.count()} calls")
+
+
+def test_hedge_elsewhere_is_not_recorded():
+    """A hedge sent to another endpoint leaves the primary's histogram with the primary's own latency."""
+    from oci_delivery_agent.config import HedgingConfig
+    from oci_delivery_agent.hedging import RequestHedger
+
+    hedger = RequestHedger(HedgingConfig(enabled=True, min_samples=20, max_hedge_ratio=1.0))
+    _warm(hedger, "endpoint-d", 0.02)
+
+    result = hedger.call("endpoint-d", lambda: time.sleep(0.3) or "primary", lambda: "elsewhere")
+    assert result == "elsewhere"
+    histogram = hedger.histogram("endpoint-d")
+    deadline = time.time() + 2
+    while histogram.count() < 21 and time.time() < deadline:
+        time.sleep(0.01)
+    # The losing primary is recorded when it finishes; the hedge is not
+    assert histogram.count() == 21 and histogram.percentile(100) >= 0.3
+    print("✅ Losing primary recorded, remote hedge not")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Request Hedging Test")
+    print("=" * 60)
+
+    test_latency_histogram_percentiles()
+    test_hedge_wins_against_slow_replica()
+    test_hedge_ratio_cap()
+    test_disabled_hedger_runs_inline()
+    test_histograms_are_per_endpoint()
+    test_hedge_elsewhere_is_not_recorded()
+
+    print("\n🎉 All hedging tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test the prompt-keyed response cache used by the text LLM chains.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _cache(path=None):
+    from oci_delivery_agent.cache import LLMResponseCache, build_cache
+    from oci_delivery_agent.config import CacheConfig
+
+    return LLMResponseCache(build_cache(CacheConfig(enabled=True, path=path)))
+
+
+def test_chain_reuses_identical_prompts():
+    """A repeated caption summary is answered from the cache."""
+    print("📝 Testing caption chain cache reuse")
+    print("=" * 60)
+
+    from langchain_community.llms import FakeListLLM
+    from oci_delivery_agent.cache import bypass_llm_cache
+    from oci_delivery_agent.chains import build_caption_chain
+
+    llm = FakeListLLM(responses=["first answer", "second answer", "third answer"], cache=_cache())
+    chain = build_caption_chain(llm)
+    payload = {"metadata": '{"object_name": "deliveries/damage1.jpg"}', "caption_json": '{"packageVisible": true}'}
+
+    first = chain.invoke(payload)["caption_summary"]
+    second = chain.invoke(payload)["caption_summary"]
+    assert first == second == "first answer"
+
+    with bypass_llm_cache():
+        refreshed = chain.invoke(payload)["caption_summary"]
+    assert refreshed == "second answer"
+    assert chain.invoke(payload)["caption_summary"] == "second answer"
+    print("✅ Identical prompts skip the LLM; bypass forces a fresh answer and refreshes the entry")
+
+
+def test_generation_parameters_are_part_of_the_key():
+    """Different max_tokens/temperature/top_p never share an entry."""
+    print("\n🔑 Testing cache keys")
+    print("-" * 40)
+
+    from langchain_core.outputs import Generation
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "llm.sqlite3")
+        cache = _cache(path)
+        cool = str(sorted({"max_tokens": 300, "temperature": 0.2, "top_p": 0.75}.items()))
+        warm = str(sorted({"max_tokens": 300, "temperature": 0.7, "top_p": 0.75}.items()))
+
+        cache.update("prompt", cool, [Generation(text="cached")])
+        cache.update("failing", cool, [Generation(text="Error generating text: 503", generation_info={"error": "503"})])
+        assert cache.lookup("prompt", warm) is None
+        assert cache.lookup("failing", cool) is None
+
+        # The SQLite backend answers after the memory tier is gone
+        reopened = _cache(path)
+        assert reopened.lookup("prompt", cool)[0].text == "cached"
+    print("✅ Parameters change the key, errors are not cached, SQLite entries persist")
+
+
+def main():
+    """Main test function"""
+    print("🚀 LLM Response Cache Test")
+    print("=" * 60)
+
+    test_chain_reuses_identical_prompts()
+    test_generation_parameters_are_part_of_the_key()
+
+    print("\n🎉 All LLM cache tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Test the ETag-aware Object Storage read-through cache against a local stand-in server.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import requests
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _start_object_store(objects):
+    """Serve ``objects`` at Object Storage paths with ETag / If-None-Match semantics."""
+    counts = {"full": 0, "not_modified": 0, "not_found": 0, "unavailable": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _error(self, status, code):
+            body = json.dumps({"code": code, "message": code}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            name = unquote(self.path.split("/o/", 1)[1])
+            if name.startswith("unavailable/"):
+                counts["unavailable"] += 1
+                return self._error(503, "ServiceUnavailable")
+            if name not in objects:
+                counts["not_found"] += 1
+                return self._error(404, "ObjectNotFound")
+            body = objects[name]
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get("if-none-match") == etag:
+                counts["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            counts["full"] += 1
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counts
+
+
+class _Unsigned(requests.auth.AuthBase):
+    def __call__(self, request):
+        return request
+
+
+def _client_for(server, cache, local_asset_root=None, deadline=None):
+    import oci
+    from oci_delivery_agent.config import ObjectStorageConfig, VisionConfig, WorkflowConfig
+    from oci_delivery_agent.deadline import ThreadLocalClients
+    from oci_delivery_agent.tools import ObjectStorageClient
+
+    client = ObjectStorageClient(
+        WorkflowConfig(
+            object_storage=ObjectStorageConfig(namespace="ns", bucket_name="deliveries"),
+            vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+            local_asset_root=local_asset_root,
+        ),
+        deadline,
+    )
+    client._clients = ThreadLocalClients(lambda _key: oci.object_storage.ObjectStorageClient(
+        {
+            "user": "ocid1.user.oc1..standin",
+            "fingerprint": "aa:bb:cc:dd:ee:ff:00:11:22:33:44:55:66:77:88:99",
+            "key_file": os.devnull,
+            "tenancy": "ocid1.tenancy.oc1..standin",
+            "region": "us-ashburn-1",
+        },
+        signer=_Unsigned(),
+        service_endpoint=f"http://127.0.0.1:{server.server_address[1]}",
+        retry_strategy=oci.retry.NoneRetryStrategy(),
+    ))
+    client._cache = cache
+    return client
+
+
+def test_fresh_revalidated_and_changed_objects():
+    """Fresh hits skip the network, stale hits cost a 304, changed objects re-download."""
+    print("🏷️  Testing ETag read-through cache")
+    print("=" * 60)
+
+    from oci_delivery_agent.cache import MemoryLRUCache, ObjectReadThroughCache, SQLiteCache, TieredCache
+
+    objects = {"photo.jpg": b"\xff\xd8" + bytes(4096)}
+    server, counts = _start_object_store(objects)
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = TieredCache(
+            MemoryLRUCache(8, 1024 * 1024, None, clock=clock),
+            SQLiteCache(os.path.join(tmpdir, "objects.sqlite3"), 1024 * 1024, None, clock=clock),
+        )
+        client = _client_for(server, ObjectReadThroughCache(store, ttl_seconds=60, clock=clock))
+        try:
+            first = client.get_object("photo.jpg")
+            assert first["metadata"]["source"] == "oci"
+            assert client.get_object("photo.jpg")["metadata"]["source"] == "cache"
+
+            clock.now += 61
+            revalidated = client.get_object("photo.jpg")
+            assert revalidated["metadata"]["source"] == "cache_revalidated"
+            assert revalidated["data"] == first["data"]
+
+            objects["photo.jpg"] = b"\xff\xd8" + bytes(2048)
+            clock.now += 61
+            changed = client.get_object("photo.jpg")
+            assert changed["metadata"]["source"] == "oci" and len(changed["data"]) == 2050
+        finally:
+            server.shutdown()
+
+    assert counts == {"full": 2, "not_modified": 1, "not_found": 0, "unavailable": 0}
+    print(f"✅ 4 reads, {counts['full']} downloads, {counts['not_modified']} revalidation: {client._cache.snapshot()}")
+
+
+def test_missing_objects_fail_fast():
+    """A 404 is remembered and skips the local fallback; a 503 still falls back; a spent deadline does not."""
+    print("\n🚫 Testing missing-object negative cache")
+    print("-" * 40)
+
+    from oci_delivery_agent.deadline import Deadline, DeadlineExceeded
+    from oci_delivery_agent.tools import ObjectNotFoundError
+
+    server, counts = _start_object_store({})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.makedirs(os.path.join(tmpdir, "unavailable"))
+        with open(os.path.join(tmpdir, "unavailable", "photo.jpg"), "wb") as handle:
+            handle.write(b"\xff\xd8local")
+        with open(os.path.join(tmpdir, "gone.jpg"), "wb") as handle:
+            handle.write(b"\xff\xd8stale")
+        client = _client_for(server, None, local_asset_root=tmpdir)
+        try:
+            for _ in range(3):
+                try:
+                    client.get_object("gone.jpg")
+                    raise AssertionError("expected ObjectNotFoundError")
+                except ObjectNotFoundError:
+                    pass
+            fallback = client.get_object("unavailable/photo.jpg")
+            expired = _client_for(server, None, local_asset_root=tmpdir, deadline=Deadline(0))
+            try:
+                expired.get_object("unavailable/photo.jpg")
+                raise AssertionError("expected DeadlineExceeded")
+            except DeadlineExceeded:
+                pass
+        finally:
+            server.shutdown()
+
+    assert counts["not_found"] == 1
+    assert fallback["metadata"]["source"] == "local" and counts["unavailable"] == 1
+    print(f"✅ 3 reads of a missing object, {counts['not_found']} request; 503 fell back to local assets, "
+          "an expired deadline did not")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Object Storage Cache Test")
+    print("=" * 60)
+
+    test_fresh_revalidated_and_changed_objects()
+    test_missing_objects_fail_fast()
+
+    print("\n🎉 All object cache tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test the compiled, versioned prompt registry used by VisionClient.
+"""
+
+import os
+import sys
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def test_prompts_compiled_once_per_config():
+    """Identical thresholds share one compiled set; new thresholds get a new version."""
+    print("🧾 Testing prompt registry versions")
+    print("=" * 60)
+
+    from oci_delivery_agent.config import DamageScoringConfig
+    from oci_delivery_agent.prompts import compiled_prompts
+
+    default = compiled_prompts(DamageScoringConfig())
+    assert compiled_prompts(DamageScoringConfig()) is default
+
+    stricter = compiled_prompts(DamageScoringConfig(none_max=0.05))
+    assert stricter.caption.version_id == default.caption.version_id
+    assert stricter.damage.version_id != default.damage.version_id
+    assert "overall.score<=0.05" in stricter.damage.render()
+    print(f"✅ {default.versions()} -> {stricter.versions()}")
+
+
+def test_caption_context_is_the_only_splice():
+    """VisionClient renders the damage prompt with the caption context spliced in."""
+    print("\n✂️  Testing caption-context splice")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import ObjectStorageConfig, VisionConfig, WorkflowConfig
+    from oci_delivery_agent.tools import VisionClient
+
+    client = VisionClient(
+        WorkflowConfig(
+            object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+            vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+        )
+    )
+    bare = client._damage_json_prompt()
+    spliced = client._damage_json_prompt({"packageVisible": True, "packageDescription": "two brown boxes"})
+    prompts = client._prompts()
+
+    assert bare == prompts.damage.head + prompts.damage.tail
+    assert spliced.startswith(prompts.damage.head) and spliced.endswith(prompts.damage.tail)
+    assert "CONTEXT: Prior analysis identified packages in this image: two brown boxes" in spliced
+    assert client._damage_json_prompt({"packageVisible": False}) == bare
+    print("✅ Only the caption context varies between calls")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Prompt Registry Test")
+    print("=" * 60)
+
+    test_prompts_compiled_once_per_config()
+    test_caption_context_is_the_only_splice()
+
+    print("\n🎉 All prompt registry tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test mergeable hourly quantile sketches against exact percentiles.
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(round(q * len(ordered), 9))) - 1]
+
+
+def _result(delivered, driver_id, route_id, region, quality_index, location_accuracy):
+    return {
+        "context": {
+            "delivered_time_utc": delivered.isoformat(),
+            "driver_id": driver_id,
+            "route_id": route_id,
+            "region": region,
+        },
+        "quality_metrics": {"quality_index": quality_index, "location_accuracy": location_accuracy},
+    }
+
+
+def test_serialization():
+    """Sketches round-trip through their compact encoding."""
+    print("📦 Testing sketch serialization")
+    print("=" * 60)
+
+    from oci_delivery_agent.sketches import QuantileSketch
+
+    rng = random.Random(1)
+    sketch = QuantileSketch()
+    for _ in range(5000):
+        sketch.add(round(rng.betavariate(8, 2), 3))
+    data = sketch.to_bytes()
+    restored = QuantileSketch.from_bytes(data)
+
+    assert restored.counts == sketch.counts and restored.total == sketch.total
+    assert len(data) < 2048
+    empty = QuantileSketch()
+    assert QuantileSketch.from_bytes(empty.to_bytes()).total == 0
+    assert empty.quantile(0.5) is None
+    print(f"✅ {sketch.total} values in {len(sketch.counts)} bins, {len(data)} bytes")
+
+
+def test_window_quantiles_are_exact():
+    """Merged hourly sketches give the same percentiles as the raw events for any window."""
+    print("\n🎯 Testing window quantiles against raw events")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import SketchConfig
+    from oci_delivery_agent.sketches import QualitySketches, QualitySketchStore
+
+    rng = random.Random(9)
+    start = datetime(2024, 6, 1)
+    results = []
+    for _ in range(4000):
+        delivered = start + timedelta(minutes=rng.randrange(0, 7 * 24 * 60))
+        results.append(_result(
+            delivered, f"driver-{rng.randrange(4)}", f"route-{rng.randrange(3)}", rng.choice(["north", "south"]),
+            round(rng.betavariate(6, 2), 3), round(rng.random(), 3),
+        ))
+    results.append({"context": {"delivered_time_utc": start.isoformat()}, "quality_metrics": {"quality_index": 0.2}})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = SketchConfig(enabled=True, path=os.path.join(tmpdir, "sketches.sqlite3"), max_pending_sketches=50)
+        first = QualitySketches(config)
+        second = QualitySketches(config, store=QualitySketchStore(config.path))
+        for index, result in enumerate(results):
+            (first if index % 2 else second).record(result)
+        first.flush()
+        second.flush()
+
+        checks = 0
+        for entity_type, field_name, entity_id in (
+            ("driver", "driver_id", "driver-1"), ("route", "route_id", "route-2"), ("region", "region", "south"),
+        ):
+            for metric in ("quality_index", "location_accuracy"):
+                for _ in range(5):
+                    window_start = start + timedelta(hours=rng.randrange(0, 100))
+                    window_end = window_start + timedelta(hours=rng.randrange(1, 80))
+                    values = [
+                        r["quality_metrics"][metric] for r in results[:-1]
+                        if r["context"][field_name] == entity_id
+                        and window_start <= datetime.fromisoformat(r["context"]["delivered_time_utc"]) < window_end
+                    ]
+                    answer = first.quantiles(entity_type, entity_id, window_start, window_end, metric)
+                    assert answer["count"] == len(values)
+                    if values:
+                        assert answer["quantiles"] == {
+                            "p10": _exact(values, 0.1), "p50": _exact(values, 0.5), "p90": _exact(values, 0.9),
+                        }, (entity_type, metric, answer)
+                    checks += 1
+
+    assert first.flushes > 1
+    print(f"✅ {checks} windows match exact nearest-rank percentiles")
+
+
+def test_month_query_latency():
+    """A 30-day window merges 720 hourly sketches well inside the dashboard target."""
+    print("\n⚡ Testing 30-day window latency")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import SketchConfig
+    from oci_delivery_agent.sketches import QualitySketches, QualitySketchStore, hour_of
+
+    rng = random.Random(4)
+    config = SketchConfig(enabled=True, flush_interval_seconds=3600.0, max_pending_sketches=10_000)
+    sketches = QualitySketches(config, store=QualitySketchStore(":memory:"))
+    first_hour = hour_of(datetime(2024, 6, 1))
+    for hour in range(30 * 24):
+        for _ in range(40):
+            sketches.add("region", "north", "quality_index", first_hour + hour, round(rng.betavariate(6, 2), 3))
+    sketches.flush()
+
+    began = time.perf_counter()
+    answer = sketches.quantiles("region", "north", datetime(2024, 6, 1), datetime(2024, 7, 1))
+    elapsed = time.perf_counter() - began
+
+    assert answer["sketches_merged"] == 720 and answer["count"] == 720 * 40
+    assert elapsed < 2.0
+    print(f"✅ merged {answer['sketches_merged']} sketches in {elapsed * 1000:.1f} ms: {answer['quantiles']}")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Quality Sketch Test")
+    print("=" * 60)
+
+    test_serialization()
+    test_window_quantiles_are_exact()
+    test_month_query_latency()
+
+    print("\n🎉 All quality sketch tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Test re-scoring stored results under a new configuration without vision calls.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+SEVERITIES = ["none", "minor", "moderate", "severe"]
+
+
+def _config(fast_paths=True, **quality_weights):
+    from oci_delivery_agent.config import (
+        FastPathConfig,
+        ObjectStorageConfig,
+        QualityIndexWeights,
+        VisionConfig,
+        WorkflowConfig,
+    )
+
+    return WorkflowConfig(
+        object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+        vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+        quality_weights=QualityIndexWeights(**quality_weights),
+        fast_paths=FastPathConfig(enabled=fast_paths),
+    )
+
+
+def _stored(object_name, delay_minutes, damage_report, quality_index, status):
+    """One stored result for a photo taken exactly at the expected location."""
+    promised = datetime(2024, 3, 1, 12, 0)
+    return {
+        "context": {
+            "object_name": object_name,
+            "expected_latitude": 40.7128,
+            "expected_longitude": -74.0060,
+            "promised_time_utc": promised.isoformat(),
+            "delivered_time_utc": (promised + timedelta(minutes=delay_minutes)).isoformat(),
+        },
+        "exif": {"GPSInfo": {"latitude": 40.7128, "longitude": -74.0060}},
+        "caption_json": {"packageVisible": True},
+        "damage_report": damage_report,
+        "quality_metrics": {"quality_index": quality_index},
+        "assessment": {"status": status},
+    }
+
+
+def _stored_results(count, config):
+    """Results shaped like run_quality_pipeline output, scored under ``config``."""
+    from oci_delivery_agent.chains import DeliveryContext, compute_quality_index
+
+    rng = random.Random(3)
+    results = []
+    for index in range(count):
+        promised = datetime(2024, 3, 1) + timedelta(minutes=index)
+        context = DeliveryContext(
+            object_name=f"deliveries/{index:05d}.jpg",
+            expected_latitude=40.7128,
+            expected_longitude=-74.0060,
+            promised_time_utc=promised,
+            delivered_time_utc=promised + timedelta(minutes=rng.randrange(-30, 240)),
+        )
+        exif = {"GPSInfo": {"latitude": 40.7128 + rng.uniform(-3e-4, 3e-4), "longitude": -74.0060}}
+        damage_report = {
+            "overall": {"score": rng.random(), "severity": rng.choice(SEVERITIES)},
+            "indicators": {
+                name: {"present": rng.random() < 0.3, "severity": rng.choice(SEVERITIES)}
+                for name in ("leakage", "boxDeformation", "packagingIntegrity", "cornerDamage")
+            },
+        }
+        metrics = compute_quality_index(
+            context=context, exif=exif, damage_report=damage_report,
+            weights=config.quality_weights.normalized(), max_distance_meters=50.0, config=config,
+        )
+        results.append({
+            "context": {
+                "object_name": context.object_name,
+                "expected_latitude": context.expected_latitude,
+                "expected_longitude": context.expected_longitude,
+                "promised_time_utc": context.promised_time_utc.isoformat(),
+                "delivered_time_utc": context.delivered_time_utc.isoformat(),
+            },
+            "exif": exif,
+            "caption_json": {"packageVisible": True},
+            "damage_report": damage_report,
+            "quality_metrics": metrics,
+            # The review LLM weighs more than the index, so its status is not a threshold on it
+            "assessment": {"status": rng.choice(["OK", "Review"])},
+        })
+    results.append({"metadata": {"object_name": "legacy.jpg"}, "quality_metrics": {"quality_index": 0.9}})
+    return results
+
+
+def test_rescore_with_new_weights():
+    """New scores match the scalar path, old scores stay, and rule-decided status flips are counted."""
+    print("🔁 Testing re-score with new weights")
+    print("=" * 60)
+
+    from oci_delivery_agent.chains import compute_quality_index
+    from oci_delivery_agent.fast_paths import decide
+    from oci_delivery_agent.rescore import _record, rescore_file, score_version
+
+    old_config = _config()
+    new_config = _config(timeliness=0.1, location_accuracy=0.2, damage_score=0.7)
+    stored = _stored_results(2000, old_config)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, "results.jsonl")
+        destination = os.path.join(tmpdir, "rescored.jsonl")
+        with open(source, "w", encoding="utf-8") as handle:
+            handle.writelines(json.dumps(result) + "\n" for result in stored)
+
+        report = rescore_file(source, destination, new_config, workers=2, chunk_rows=300)
+        with open(destination, encoding="utf-8") as handle:
+            rescored = [json.loads(line) for line in handle]
+
+    version = score_version(new_config)
+    assert version != score_version(old_config)
+    assert [r.get("context", {}).get("object_name") for r in rescored] == [r.get("context", {}).get("object_name") for r in stored]
+    assert report.rows == 2001 and report.rescored == 2000 and report.skipped == 1
+
+    expected_flips = {"OK->Review": 0, "Review->OK": 0}
+    undecided = 0
+    for before, after in zip(stored[:-1], rescored[:-1]):
+        assert after["quality_metrics"] == before["quality_metrics"]
+        context, exif, damage_report = _record(before)
+        expected = compute_quality_index(
+            context=context, exif=exif, damage_report=damage_report,
+            weights=new_config.quality_weights.normalized(), max_distance_meters=50.0, config=new_config,
+        )
+        assert after["score_versions"][version] == expected
+        if expected["quality_index"] == before["quality_metrics"]["quality_index"]:
+            continue
+        decision = decide(before["caption_json"], damage_report, expected, new_config.fast_paths)
+        if decision is None:
+            undecided += 1
+        elif decision.assessment["status"] != before["assessment"]["status"]:
+            expected_flips[f"{before['assessment']['status']}->{decision.assessment['status']}"] += 1
+
+    assert report.flips == expected_flips and report.undecided == undecided
+    assert all(expected_flips.values()) and undecided > 0
+    print(f"✅ {json.dumps(report.summary()['flips'])} across {report.rescored} rescored rows")
+
+
+def test_flips_follow_stored_status():
+    """Flips start from the stored status and end at the pipeline's rules, never at a bare threshold."""
+    print("\n🔀 Testing flips against the stored assessment")
+    print("-" * 40)
+
+    from oci_delivery_agent.rescore import rescore_lines
+
+    clean = {"overall": {"score": 0.05, "severity": "none"}}
+    lines = [
+        # The review LLM said Review at 0.8; on time, on the spot and undamaged now clears the pass rule
+        json.dumps(_stored("deliveries/llm-review.jpg", -10, clean, 0.8, "Review")),
+        # Falls from 0.72 to 0.64: no rule settles it, so only the LLM could say whether it flips
+        json.dumps(_stored("deliveries/moderate.jpg", -10, {"overall": {"score": 0.9, "severity": "moderate"}}, 0.72, "OK")),
+    ]
+
+    rewritten, report = rescore_lines(lines, _config())
+    scores = [next(iter(json.loads(line)["score_versions"].values())) for line in rewritten]
+    assert scores[0]["quality_index"] == 0.98 and scores[1]["quality_index"] == 0.64
+    assert report.changed == 2
+    assert report.flips == {"OK->Review": 0, "Review->OK": 1}
+    assert report.flipped_objects == ["deliveries/llm-review.jpg"]
+    assert report.undecided == 1
+
+    # The rules settle flips even where the pipeline has fast paths switched off
+    _, unchanged = rescore_lines(lines, _config(fast_paths=False))
+    assert unchanged.flips == report.flips and unchanged.undecided == report.undecided
+    print(f"✅ {json.dumps(report.summary())}")
+
+
+def test_cli_defaults_count_flips():
+    """The CLI under default settings reports a stored OK that now scores in the severe band."""
+    print("\n🖥️  Testing the CLI with default settings")
+    print("-" * 40)
+
+    from oci_delivery_agent.rescore import main as rescore_main
+
+    # No GPS fix and five hours late: the index falls to 0.16, which the clear-review rule settles
+    stored = _stored("deliveries/late.jpg", 300, {"overall": {"score": 0.6, "severity": "moderate"}}, 0.74, "OK")
+    stored["exif"] = {}
+    previous = {name: os.environ.pop(name) for name in list(os.environ) if name.startswith("FAST_PATH")}
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "results.jsonl")
+            with open(source, "w", encoding="utf-8") as handle:
+                handle.write(json.dumps(stored) + "\n")
+            summary = rescore_main([source, os.path.join(tmpdir, "rescored.jsonl"), "--workers", "1"])
+    finally:
+        os.environ.update(previous)
+
+    assert summary["changed"] == 1 and summary["undecided"] == 0
+    assert summary["flips"] == {"OK->Review": 1, "Review->OK": 0}
+    assert summary["flipped_objects"] == ["deliveries/late.jpg"]
+    print(f"✅ {json.dumps(summary['flips'])}")
+
+
+def test_same_config_changes_nothing():
+    """Re-scoring under the original settings reports no changes."""
+    print("\n🟰 Testing re-score under unchanged settings")
+    print("-" * 40)
+
+    from oci_delivery_agent.rescore import rescore_lines
+
+    config = _config()
+    lines = [json.dumps(result) for result in _stored_results(200, config)]
+    _, report = rescore_lines(lines, config)
+
+    assert report.changed == 0 and sum(report.flips.values()) == 0
+    print("✅ No changes")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Re-score Test")
+    print("=" * 60)
+
+    test_rescore_with_new_weights()
+    test_flips_follow_stored_status()
+    test_cli_defaults_count_flips()
+    test_same_config_changes_nothing()
+
+    print("\n🎉 All re-score tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
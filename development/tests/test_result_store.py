@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the partitioned Parquet result store.
+"""
+
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+SEVERITIES = ["none", "minor", "moderate", "severe"]
+
+
+def _result(rng, index):
+    delivered = datetime(2024, 7, 1, 8) + timedelta(minutes=index * 7)
+    return {
+        "context": {
+            "object_name": f"deliveries/{index:06d}.jpg",
+            "promised_time_utc": (delivered - timedelta(minutes=10)).isoformat(),
+            "delivered_time_utc": delivered.isoformat(),
+            "driver_id": f"driver-{index % 40}",
+            "route_id": f"route-{index % 12}",
+            "region": ["north", "south", None][index % 3],
+        },
+        "metadata": {"object_name": f"deliveries/{index:06d}.jpg"},
+        "caption_json": {
+            "sceneType": rng.choice(["delivery", "package", "entrance"]),
+            "packageVisible": True,
+            "packageDescription": "brown cardboard box",
+            "location": {"type": rng.choice(["doorstep", "porch"]), "description": "front door"},
+            "environment": {"weather": rng.choice(["clear", "rainy", "Cloudy"]), "timeOfDay": "morning"},
+            "safetyAssessment": {"protected": True, "visible": False, "secure": True},
+            "overallDescription": "A box on the doorstep.",
+        },
+        "damage_report": {
+            "overall": {"severity": rng.choice(SEVERITIES), "score": round(rng.random(), 2)},
+            "indicators": {
+                name: {"present": rng.random() < 0.3, "severity": rng.choice(SEVERITIES)}
+                for name in ("boxDeformation", "cornerDamage", "leakage", "packagingIntegrity")
+            },
+        },
+        "quality_metrics": {
+            "location_accuracy": round(rng.random(), 3),
+            "timeliness": 1.0,
+            "package_quality": round(rng.random(), 3),
+            "quality_index": round(rng.random(), 3),
+        },
+        "assessment": {"status": rng.choice(["OK", "Review"])},
+    }
+
+
+def test_partitioned_write_and_scan():
+    """Rows land in date/region partitions, enums are dictionary-encoded, and scans prune columns."""
+    print("🗄️ Testing Parquet result store")
+    print("=" * 60)
+
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError:
+        print("⚠️ pyarrow not installed, skipping")
+        return
+
+    from oci_delivery_agent.config import ResultStoreConfig
+    from oci_delivery_agent.result_store import ParquetResultStore, column_bytes
+
+    rng = random.Random(2)
+    results = [_result(rng, index) for index in range(3000)]
+    results.append({"context": {"object_name": "caption-failed.jpg", "delivered_time_utc": "2024-07-01T09:00:00"},
+                    "caption_json": {"error": "bad json"}, "quality_metrics": {"quality_index": "n/a"}})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = ResultStoreConfig(enabled=True, path=tmpdir, max_buffered_rows=2500, flush_interval_seconds=3600)
+        store = ParquetResultStore(config)
+        for result in results:
+            store.append(result)
+        store.flush()
+
+        stats = store.stats()
+        assert stats["delivery_quality_events"]["rows"] == 3001
+        assert stats["vision_analysis"]["rows"] == 3000 and stats["damage_analysis"]["rows"] == 3000
+        assert os.path.isdir(os.path.join(tmpdir, "damage_analysis", "date=2024-07-01", "region=north"))
+        assert os.path.isdir(os.path.join(tmpdir, "delivery_quality_events", "date=2024-07-01", "region=__HIVE_DEFAULT_PARTITION__"))
+
+        scanned = store.scan("delivery_quality_events", ["driver_id", "quality_index", "region"],
+                             filter=(ds.field("region") == "south") & (ds.field("date") == "2024-07-02"))
+        expected = [
+            r for r in results[:-1]
+            if r["context"]["region"] == "south" and r["context"]["delivered_time_utc"].startswith("2024-07-02")
+        ]
+        assert scanned.column_names == ["driver_id", "quality_index", "region"]
+        assert sorted(scanned.column("quality_index").to_pylist()) == sorted(r["quality_metrics"]["quality_index"] for r in expected)
+
+        vision = store.scan("vision_analysis", ["weather", "scene_type"])
+        assert pa.types.is_dictionary(vision.schema.field("weather").type)
+        assert set(vision.column("weather").to_pylist()) == {"clear", "rainy", "cloudy"}
+
+        damage = store.scan("damage_analysis", ["overall_severity", "leakage_present"])
+        assert pa.types.is_dictionary(damage.schema.field("overall_severity").type)
+
+        sizes = column_bytes(tmpdir, "delivery_quality_events")
+        pruned = sizes["quality_index"] + sizes["driver_id"]
+        assert pruned < sum(sizes.values()) / 2
+
+    for table, table_stats in stats.items():
+        print(f"✅ {table}: {table_stats['rows']} rows in {table_stats['files']} files, "
+              f"compression {table_stats['compression_ratio']}x")
+    print(f"✅ Two-column scan reads {pruned:,} of {sum(sizes.values()):,} bytes")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Result Store Test")
+    print("=" * 60)
+
+    test_partitioned_write_and_scan()
+
+    print("\n🎉 All result store tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test the durable event spool: ingest, visibility timeouts, retries and dead letters.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _context(name="deliveries/damage1.jpg"):
+    from oci_delivery_agent.chains import DeliveryContext
+
+    return DeliveryContext(
+        object_name=name,
+        expected_latitude=40.7128,
+        expected_longitude=-74.0060,
+        promised_time_utc=datetime(2024, 1, 15, 10, 0),
+        delivered_time_utc=datetime(2024, 1, 15, 10, 30),
+    )
+
+
+def _spool(tmpdir, clock=None, **overrides):
+    from oci_delivery_agent.config import SpoolConfig
+    from oci_delivery_agent.spool import EventSpool
+
+    config = SpoolConfig(
+        enabled=True,
+        visibility_timeout_seconds=30,
+        max_attempts=2,
+        retry_backoff_seconds=1,
+        **overrides,
+    )
+    return EventSpool(os.path.join(tmpdir, "spool.sqlite3"), config, clock=clock or FakeClock())
+
+
+def test_claim_visibility_and_ack():
+    """Claimed events are hidden until the visibility timeout passes."""
+    print("📥 Testing claim / visibility timeout / ack")
+    print("=" * 60)
+
+    from oci_delivery_agent.spool import LOST_CLAIM
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        clock = FakeClock()
+        spool = _spool(tmpdir, clock)
+        spool.enqueue(_context())
+
+        item = spool.claim("worker-a")
+        assert item.context == _context()
+        assert spool.claim("worker-b") is None
+
+        clock.now += 31  # worker-a stalled; the event becomes visible again
+        retry = spool.claim("worker-b")
+        assert retry.id == item.id and retry.attempts == 2
+
+        # worker-a finally finishes: it no longer owns the event and must not touch it
+        assert spool.ack(item) is False
+        assert spool.nack(item, "late failure") == LOST_CLAIM
+        assert spool.depth() == 1 and spool.claim("worker-c") is None
+
+        assert spool.ack(retry) is True
+        assert spool.depth() == 0
+        spool.close()
+    print("✅ Expired claims are redelivered, stale acks/nacks are refused, acks remove the event")
+
+
+def test_retry_then_dead_letter():
+    """Failures retry with backoff, then land in the dead-letter table."""
+    print("\n☠️  Testing retries and dead-letter table")
+    print("-" * 45)
+
+    from oci_delivery_agent.spool import DEAD_LETTERED, RETRIED
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        clock = FakeClock()
+        spool = _spool(tmpdir, clock)
+        spool.enqueue(_context())
+
+        first = spool.claim("worker")
+        assert spool.nack(first, "ServiceError: 503") == RETRIED
+        assert spool.claim("worker") is None  # backing off
+        clock.now += 1
+
+        second = spool.claim("worker")
+        assert spool.nack(second, "ServiceError: 503") == DEAD_LETTERED
+        assert spool.depth() == 0
+        dead = spool.dead_letters()
+        assert dead[0]["attempts"] == 2 and dead[0]["event"]["object_name"] == "deliveries/damage1.jpg"
+        spool.close()
+    print(f"✅ Dead letter recorded: {dead[0]['last_error']}")
+
+
+def test_degraded_results_are_retried():
+    """A result whose vision stages errored is retried, not acked; gated photos are final."""
+    print("\n🩹 Testing degraded results")
+    print("-" * 45)
+
+    from oci_delivery_agent.concurrency import AdaptiveLimiter
+    from oci_delivery_agent.config import ConcurrencyConfig
+    from oci_delivery_agent.spool import DegradedResultError, SpoolWorkerPool, vision_stage_error
+
+    assert vision_stage_error({"caption_json": {"error": "ServiceError: 429"}, "damage_report": {}}) == "caption: ServiceError: 429"
+    assert vision_stage_error({"caption_json": {}, "damage_report": {"error": "no_response"}}) == "damage: no_response"
+    assert vision_stage_error({"caption_json": {"error": "unusable_photo"}, "damage_report": None}) is None
+    assert vision_stage_error({"caption_json": {"unstructured": "a box"}, "damage_report": {"overall": {}}}) is None
+
+    def process(context):
+        raise DegradedResultError("damage: no_response")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spool = _spool(tmpdir)
+        spool.enqueue(_context())
+        pool = SpoolWorkerPool(spool, process, AdaptiveLimiter("spool", ConcurrencyConfig()))
+        assert pool.run_once("worker")
+        assert spool.depth() == 1
+        assert pool.stats == {"processed": 0, "retried": 1, "dead_lettered": 0, "lost_claims": 0}
+        spool.close()
+    print(f"✅ Degraded result sent back for retry: {pool.stats}")
+
+
+def test_ingest_latency_independent_of_backend():
+    """Enqueue stays fast while workers are stuck on a slow backend."""
+    print("\n⚡ Testing ingest latency under a slow backend")
+    print("-" * 45)
+
+    from oci_delivery_agent.concurrency import AdaptiveLimiter
+    from oci_delivery_agent.config import ConcurrencyConfig
+    from oci_delivery_agent.spool import SpoolWorkerPool
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spool = _spool(tmpdir, clock=time.time)
+        release = threading.Event()
+        processed = []
+
+        def slow_pipeline(context):
+            release.wait(5)
+            processed.append(context.object_name)
+
+        governor = AdaptiveLimiter("spool", ConcurrencyConfig(initial_limit=2, max_limit=2))
+        workers = SpoolWorkerPool(spool, slow_pipeline, governor, workers=4, idle_sleep_seconds=0.01)
+        workers.start()
+
+        latencies = []
+        for index in range(200):
+            started = time.perf_counter()
+            spool.enqueue(_context(f"deliveries/photo{index}.jpg"))
+            latencies.append(time.perf_counter() - started)
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        assert p99 < 0.05, p99
+        assert governor.snapshot()["in_flight"] <= 2
+
+        release.set()
+        deadline = time.time() + 10
+        while spool.depth() and time.time() < deadline:
+            time.sleep(0.05)
+        workers.stop(timeout=2)
+        spool.close()
+
+    assert len(processed) == 200
+    print(f"✅ p99 enqueue latency {p99 * 1000:.2f} ms with a blocked backend; {len(processed)} events drained")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Event Spool Test")
+    print("=" * 60)
+
+    test_claim_visibility_and_ack()
+    test_retry_then_dead_letter()
+    test_degraded_results_are_retried()
+    test_ingest_latency_independent_of_backend()
+
+    print("\n🎉 All spool tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
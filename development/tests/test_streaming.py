@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test streamed GenAI replies: the JSON tracker and early termination against a local SSE stand-in.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+CAPTION = {
+    "sceneType": "delivery",
+    "packageVisible": True,
+    "packageDescription": "brown box with \"FRAGILE\" tape {handle with care}",
+    "location": {"type": "doorstep", "description": "front door, left of the mat"},
+    "environment": {"weather": "clear", "timeOfDay": "morning"},
+    "safetyAssessment": {"protected": True, "visible": False, "secure": True},
+    "overallDescription": "A box sits on the doorstep.",
+}
+COMMENTARY = " Note: the package is clearly visible and nothing suggests damage." * 4
+TOKEN_SECONDS = 0.015
+
+
+def _tokens():
+    """The reply split into small pieces, JSON object first, then slow commentary."""
+    text = json.dumps(CAPTION) + COMMENTARY
+    return [text[index:index + 6] for index in range(0, len(text), 6)]
+
+
+def _start_genai(stream_log):
+    """Serve /actions/chat, streaming tokens as server-sent events when the request asks to."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            tokens = _tokens()
+            if not body["chatRequest"].get("isStream"):
+                time.sleep(TOKEN_SECONDS * len(tokens))
+                payload = json.dumps({
+                    "modelId": "standin",
+                    "modelVersion": "1",
+                    "chatResponse": {
+                        "apiFormat": "GENERIC",
+                        "timeCreated": "2024-07-01T00:00:00Z",
+                        "choices": [{
+                            "index": 0,
+                            "finishReason": "stop",
+                            "message": {"role": "ASSISTANT", "content": [{"type": "TEXT", "text": "".join(tokens)}]},
+                        }],
+                    },
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            sent = 0
+            try:
+                for token in tokens:
+                    event = {"index": 0, "message": {"role": "ASSISTANT", "content": [{"type": "TEXT", "text": token}]}}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    sent += 1
+                    time.sleep(TOKEN_SECONDS)
+                stream_log.append({"sent": sent, "total": len(tokens), "cancelled": False})
+            except (BrokenPipeError, ConnectionResetError):
+                stream_log.append({"sent": sent, "total": len(tokens), "cancelled": True})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _Unsigned(requests.auth.AuthBase):
+    def __call__(self, request):
+        return request
+
+
+def test_tracker_detects_object_close():
+    """Closing is detected across chunk boundaries, inside strings and after escapes."""
+    print("🧩 Testing JsonObjectTracker")
+    print("=" * 60)
+
+    from oci_delivery_agent.json_extract import JsonObjectTracker, extract_json_object
+
+    text = 'Sure {note}: ```json\n' + json.dumps(CAPTION) + '\n``` and some trailing words'
+    close = text.index("```", text.index("{\"")) - 1
+    for size in (1, 2, 3, 7, 64):
+        tracker = JsonObjectTracker()
+        completed_at = None
+        for index in range(0, len(text), size):
+            if tracker.feed(text[index:index + size]):
+                completed_at = index + size
+                break
+        assert tracker.complete and completed_at is not None
+        assert close <= completed_at < close + size + 1
+        assert extract_json_object(tracker.text) == CAPTION
+
+    tracker = JsonObjectTracker()
+    assert not tracker.feed('{"a": "x\\')
+    assert not tracker.feed('"}')  # escaped quote, string still open
+    assert tracker.feed('"}')
+    assert extract_json_object(tracker.text) == {"a": 'x"}'}
+
+    tracker = JsonObjectTracker()
+    assert not tracker.feed('{"overall": {"severity": "none"')
+    assert not tracker.feed(", ")
+    print("✅ Completion found at the closing brace for every chunk size")
+
+
+def test_stream_stops_at_object_close():
+    """A streamed reply ends once the object closes and parses the same as the full reply."""
+    print("\n📡 Testing early termination against an SSE stand-in")
+    print("-" * 40)
+
+    import oci
+    from oci_delivery_agent.config import (
+        EndpointPoolConfig,
+        GenAIEndpoint,
+        ObjectStorageConfig,
+        VisionConfig,
+        WorkflowConfig,
+    )
+    from oci_delivery_agent.deadline import ThreadLocalClients
+    from oci_delivery_agent.tools import VisionClient
+
+    stream_log = []
+    server = _start_genai(stream_log)
+    hostname = f"http://127.0.0.1:{server.server_address[1]}"
+    previous = os.environ.get("OCI_COMPARTMENT_ID")
+    os.environ["OCI_COMPARTMENT_ID"] = "ocid1.compartment.test"
+    timings = {}
+    results = {}
+    try:
+        for streaming in (False, True):
+            config = WorkflowConfig(
+                object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+                vision=VisionConfig(
+                    compartment_id="test", image_caption_model_endpoint="test", stream_responses=streaming
+                ),
+                endpoint_pool=EndpointPoolConfig(
+                    endpoints=[GenAIEndpoint(hostname=hostname, model_ocid="ocid1.test.vision")]
+                ),
+            )
+            client = VisionClient(config)
+            client._clients = ThreadLocalClients(lambda _hostname: oci.generative_ai_inference.GenerativeAiInferenceClient(
+                {
+                    "user": "ocid1.user.oc1..standin",
+                    "fingerprint": "aa:bb:cc:dd:ee:ff:00:11:22:33:44:55:66:77:88:99",
+                    "key_file": os.devnull,
+                    "tenancy": "ocid1.tenancy.oc1..standin",
+                    "region": "us-ashburn-1",
+                },
+                signer=_Unsigned(),
+                service_endpoint=hostname,
+                retry_strategy=oci.retry.NoneRetryStrategy(),
+            ))
+            started = time.perf_counter()
+            results[streaming] = json.loads(client.generate_caption(b"\xff\xd8stream-test"))
+            timings[streaming] = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        if previous is None:
+            os.environ.pop("OCI_COMPARTMENT_ID", None)
+        else:
+            os.environ["OCI_COMPARTMENT_ID"] = previous
+
+    assert results[False] == CAPTION
+    assert results[True] == results[False]
+    assert timings[True] < timings[False] * 0.8
+
+    deadline = time.time() + 5
+    while not stream_log and time.time() < deadline:
+        time.sleep(0.05)
+    assert stream_log and stream_log[0]["cancelled"], stream_log
+    assert stream_log[0]["sent"] < stream_log[0]["total"]
+    print(f"✅ Full reply {timings[False]:.2f}s, streamed {timings[True]:.2f}s; "
+          f"stand-in sent {stream_log[0]['sent']}/{stream_log[0]['total']} tokens before the client hung up")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Streaming Reply Test")
+    print("=" * 60)
+
+    test_tracker_detects_object_close()
+    test_stream_stops_at_object_close()
+
+    print("\n🎉 All streaming tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
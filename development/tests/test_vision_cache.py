@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test the vision result cache: LRU/TTL bounds, the SQLite tier and VisionClient reuse.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_lru_bounds_and_ttl():
+    """The memory tier evicts least recently used entries and expires old ones."""
+    print("🧠 Testing memory LRU bounds and TTL")
+    print("=" * 60)
+
+    from oci_delivery_agent.cache import MemoryLRUCache
+
+    clock = FakeClock()
+    cache = MemoryLRUCache(max_entries=2, max_bytes=1024, ttl_seconds=60, clock=clock)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"  # "b" is now least recently used
+    cache.set("c", b"3")
+    assert cache.get("b") is None and cache.get("c") == b"3"
+
+    clock.now += 61
+    assert cache.get("a") is None
+    stats = cache.stats.snapshot()
+    assert stats["evictions"] == 1 and stats["expired"] == 1 and stats["hits"] == 2
+    print(f"✅ {stats}")
+
+
+def test_sqlite_tier_is_size_bounded_and_persistent():
+    """The disk tier survives reopening and stays under its byte budget."""
+    print("\n💾 Testing SQLite tier")
+    print("-" * 40)
+
+    from oci_delivery_agent.cache import SQLiteCache
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "vision.sqlite3")
+        clock = FakeClock()
+        cache = SQLiteCache(path, max_bytes=250, ttl_seconds=None, clock=clock)
+        for index in range(5):
+            clock.now += 1
+            cache.set(f"key-{index}", bytes(100))
+        assert cache.stats.snapshot()["evictions"] == 3
+        cache.close()
+
+        reopened = SQLiteCache(path, max_bytes=250, ttl_seconds=None, clock=clock)
+        assert reopened.get("key-0") is None
+        assert reopened.get("key-4") == bytes(100)
+        reopened.close()
+    print("✅ Oldest rows evicted, newest survive a reopen")
+
+
+def _response(text):
+    content = [SimpleNamespace(text=text)]
+    choice = SimpleNamespace(message=SimpleNamespace(content=content))
+    return SimpleNamespace(data=SimpleNamespace(chat_response=SimpleNamespace(choices=[choice])))
+
+
+def test_vision_client_reuses_results():
+    """Identical bytes, prompt and model are served from the cache."""
+    print("\n🖼️  Testing VisionClient cache reuse")
+    print("-" * 40)
+
+    from oci_delivery_agent.config import (
+        CacheConfig,
+        DamageScoringConfig,
+        EndpointPoolConfig,
+        GenAIEndpoint,
+        ObjectStorageConfig,
+        VisionConfig,
+        WorkflowConfig,
+    )
+    from oci_delivery_agent.tools import VisionClient, _reply_text
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = WorkflowConfig(
+            object_storage=ObjectStorageConfig(namespace="test", bucket_name="test"),
+            vision=VisionConfig(compartment_id="test", image_caption_model_endpoint="test"),
+            endpoint_pool=EndpointPoolConfig(
+                endpoints=[GenAIEndpoint(hostname="https://genai.invalid", model_ocid="ocid1.test.vision")]
+            ),
+            vision_cache=CacheConfig(enabled=True, path=os.path.join(tmpdir, "vision.sqlite3")),
+        )
+        calls = []
+
+        def fake_chat(endpoint, chat_request, compartment_id):
+            calls.append(chat_request.temperature)
+            if chat_request.temperature == 0.2:
+                return _reply_text(_response('{"packageVisible": true, "packageDescription": "box"}'))
+            return _reply_text(_response('{"overall": {"severity": "none", "score": 0.0}, "packageVisible": true}'))
+
+        previous = os.environ.get("OCI_COMPARTMENT_ID")
+        os.environ["OCI_COMPARTMENT_ID"] = "ocid1.compartment.test"
+        try:
+            client = VisionClient(config)
+            client._chat = fake_chat
+            image = b"\xff\xd8fake-jpeg-bytes"
+
+            first = client.generate_caption(image)
+            assert client.generate_caption(image) == first
+            report = client.detect_damage(image)
+            assert client.detect_damage(image) == report
+            assert len(calls) == 2
+
+            # Different bytes or different scoring thresholds change the key
+            client.detect_damage(image + b"\x00")
+            config.damage_scoring = DamageScoringConfig(none_max=0.05)
+            client.detect_damage(image)
+            assert len(calls) == 4
+        finally:
+            if previous is None:
+                os.environ.pop("OCI_COMPARTMENT_ID", None)
+            else:
+                os.environ["OCI_COMPARTMENT_ID"] = previous
+
+    stats = client._cache.snapshot()
+    assert stats["hits"] >= 2 and stats["bytes_written"] > 0
+    print(f"✅ Repeated analyses served from cache: {json.dumps(stats)}")
+
+
+def main():
+    """Main test function"""
+    print("🚀 Vision Cache Test")
+    print("=" * 60)
+
+    test_memory_lru_bounds_and_ttl()
+    test_sqlite_tier_is_size_bounded_and_persistent()
+    test_vision_client_reuses_results()
+
+    print("\n🎉 All vision cache tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
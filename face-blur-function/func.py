@@ -6,9 +6,23 @@ from PIL import Image
 import numpy as np
 import oci
 import os
+import sys
 from datetime import datetime
 from typing import Dict, Any, List, Tuple
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_PATH = os.path.join(CURRENT_DIR, "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from face_cache import (
+    CACHE,
+    OCI_VISION_DETECTOR,
+    detect_with_cache,
+    face_cache_from_env,
+    oci_vision_params_from_env,
+)
+
 # Check if OpenCV is available
 try:
     import cv2
@@ -483,11 +497,21 @@ def handler(ctx, data=None):
                 status_code=500
             )
         
+        # Reuse boxes already found for this exact image (see face_cache for what may be reused)
+        face_cache = face_cache_from_env(storage_client, namespace, bucket_name)
+        
         # Detect faces using OCI Vision
         if os.environ.get("DEBUG_VISION"):
             print("Detecting faces with OCI Vision...")
         try:
-            faces = detect_faces_with_oci_vision(image_bytes, compartment_id, vision_client)
+            faces, detector, source = detect_with_cache(
+                face_cache,
+                image_bytes,
+                OCI_VISION_DETECTOR,
+                oci_vision_params_from_env(),
+                lambda: detect_faces_with_oci_vision(image_bytes, compartment_id, vision_client),
+            )
+            detection_method = f"cache:{detector}" if source == CACHE else detector
             num_faces = len(faces)
             if os.environ.get("DEBUG_VISION"):
                 print(f"Face detection completed: {num_faces} faces detected")
@@ -559,7 +583,7 @@ def handler(ctx, data=None):
                 "blurred_object": blurred_object_name,
                 "namespace": namespace,
                 "bucket": bucket_name,
-                "detection_method": "oci_vision"
+                "detection_method": detection_method
             },
             status_code=200
         )
@@ -0,0 +1,231 @@
+"""Face detection results shared between the face-blur function and FaceBlurringTool.
+
+Kept as a dependency-free top-level module so ``func.py`` can import it
+without pulling in the ``oci_delivery_agent`` package.
+
+By default a caller only reuses boxes from its own detector with its own
+settings. ``FACE_CACHE_ACCEPT`` opts in to other detectors; boxes from a
+detector with lower recall than the caller's (Haar for the OCI Vision
+privacy blur) are only reused when ``FACE_CACHE_ALLOW_LOWER_RECALL`` is also
+true, since missed faces would go unblurred.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+OCI_VISION_DETECTOR = "oci_vision"
+HAAR_DETECTOR = "haar"
+
+# Relative face recall; detectors not listed rank below all of these
+DETECTOR_RECALL = {OCI_VISION_DETECTOR: 2, HAAR_DETECTOR: 1}
+
+# Where detect_with_cache got the boxes
+CACHE = "cache"
+DETECTED = "detected"
+
+
+def content_hash(image_bytes: bytes) -> str:
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def detector_key(detector: str, params: Mapping[str, Any]) -> str:
+    """Detector name plus a digest of its parameters; different settings never share boxes."""
+    digest = hashlib.sha256(json.dumps(dict(params), sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{detector}:{digest[:16]}"
+
+
+def oci_vision_params_from_env() -> Dict[str, Any]:
+    """The face-blur function's OCI Vision settings, as used for cache keys."""
+    return {
+        "max_results": int(os.environ.get("VISION_MAX_RESULTS", "100")),
+        "return_landmarks": os.environ.get("VISION_RETURN_LANDMARKS", "true").lower() == "true",
+        "min_dimension": int(os.environ.get("VISION_MIN_DIMENSION", "600")),
+        "confidence_threshold": float(os.environ.get("VISION_CONFIDENCE_THRESHOLD", "0.0")),
+    }
+
+
+def accepted_detectors_from_env(detector: str) -> List[str]:
+    """Detectors whose cached boxes may be reused, in order of preference (``FACE_CACHE_ACCEPT``).
+
+    Defaults to ``detector`` alone.
+    """
+    names = os.environ.get("FACE_CACHE_ACCEPT", detector)
+    return [name.strip() for name in names.split(",") if name.strip()]
+
+
+def allow_lower_recall_from_env() -> bool:
+    """Whether boxes from a lower-recall detector may stand in for the caller's (``FACE_CACHE_ALLOW_LOWER_RECALL``)."""
+    return os.environ.get("FACE_CACHE_ALLOW_LOWER_RECALL", "false").lower() == "true"
+
+
+def lookup_candidates(
+    detector: str, params: Mapping[str, Any], accepted: Sequence[str], allow_lower_recall: bool = False
+) -> List[Tuple[str, Optional[Mapping[str, Any]]]]:
+    """Own detector with its exact settings, other accepted detectors with any settings, in ``accepted`` order.
+
+    Accepted detectors with lower recall than ``detector`` are dropped unless
+    ``allow_lower_recall`` is set.
+    """
+    own_recall = DETECTOR_RECALL.get(detector, 0)
+    candidates: List[Tuple[str, Optional[Mapping[str, Any]]]] = []
+    for name in accepted:
+        if name == detector:
+            candidates.append((name, params))
+        elif allow_lower_recall or DETECTOR_RECALL.get(name, 0) >= own_recall:
+            candidates.append((name, None))
+    if detector not in accepted:
+        candidates.append((detector, params))
+    return candidates
+
+
+class FaceCache:
+    """Face boxes per image content hash, one entry per detector configuration.
+
+    An in-process LRU sits in front of an optional Object Storage sidecar
+    object (``<prefix><sha256>.json``), which is what lets the face-blur
+    function and the delivery pipeline see each other's results. Cache
+    failures are logged and treated as misses so detection still runs.
+    """
+
+    def __init__(
+        self,
+        storage_client: Any = None,
+        namespace: Optional[str] = None,
+        bucket_name: Optional[str] = None,
+        prefix: str = "face-cache/",
+        max_entries: int = 256,
+    ):
+        self._storage = storage_client
+        self._namespace = namespace
+        self._bucket = bucket_name
+        self._prefix = prefix
+        self._max_entries = max_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    def _remote_enabled(self) -> bool:
+        return self._storage is not None and bool(self._namespace) and bool(self._bucket)
+
+    def _object_name(self, digest: str) -> str:
+        return f"{self._prefix}{digest}.json"
+
+    def _remember(self, digest: str, entries: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[digest] = entries
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self._max_entries:
+                self._memory.popitem(last=False)
+
+    def _load(self, digest: str) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._memory.get(digest)
+            if entries is not None:
+                self._memory.move_to_end(digest)
+                return entries
+        if not self._remote_enabled():
+            return {}
+        try:
+            response = self._storage.get_object(
+                namespace_name=self._namespace,
+                bucket_name=self._bucket,
+                object_name=self._object_name(digest),
+            )
+            entries = json.loads(response.data.content)
+        except Exception as err:
+            if getattr(err, "status", None) != 404:
+                print(f"Warning: face cache read failed: {err}")
+            return {}
+        self._remember(digest, entries)
+        return entries
+
+    def lookup(
+        self, image_bytes: bytes, candidates: Sequence[Tuple[str, Optional[Mapping[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Return the first cached ``{"detector", "params", "faces"}`` among ``candidates``.
+
+        A candidate with ``params=None`` accepts that detector under any settings.
+        """
+        entries = self._load(content_hash(image_bytes))
+        for detector, params in candidates:
+            if params is not None:
+                entry = entries.get(detector_key(detector, params))
+            else:
+                entry = next((e for e in entries.values() if e.get("detector") == detector), None)
+            if entry is not None:
+                with self._lock:
+                    self.stats["hits"] += 1
+                return entry
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def store(
+        self, image_bytes: bytes, detector: str, params: Mapping[str, Any], faces: List[Dict[str, Any]]
+    ) -> None:
+        digest = content_hash(image_bytes)
+        entries = dict(self._load(digest))
+        entries[detector_key(detector, params)] = {"detector": detector, "params": dict(params), "faces": faces}
+        self._remember(digest, entries)
+        with self._lock:
+            self.stats["stores"] += 1
+        if not self._remote_enabled():
+            return
+        try:
+            self._storage.put_object(
+                namespace_name=self._namespace,
+                bucket_name=self._bucket,
+                object_name=self._object_name(digest),
+                put_object_body=json.dumps(entries).encode("utf-8"),
+                content_type="application/json",
+            )
+        except Exception as err:
+            print(f"Warning: face cache write failed: {err}")
+
+
+def face_cache_from_env(
+    storage_client: Any = None, namespace: Optional[str] = None, bucket_name: Optional[str] = None
+) -> Optional[FaceCache]:
+    """Build the shared face cache when ``FACE_CACHE_ENABLED`` is true."""
+    if os.environ.get("FACE_CACHE_ENABLED", "false").lower() != "true":
+        return None
+    return FaceCache(
+        storage_client,
+        namespace,
+        bucket_name,
+        prefix=os.environ.get("FACE_CACHE_PREFIX", "face-cache/"),
+    )
+
+
+def detect_with_cache(
+    cache: Optional[FaceCache],
+    image_bytes: bytes,
+    detector: str,
+    params: Mapping[str, Any],
+    detect: Callable[[], List[Dict[str, Any]]],
+    accepted: Optional[Sequence[str]] = None,
+    allow_lower_recall: Optional[bool] = None,
+) -> Tuple[List[Dict[str, Any]], str, str]:
+    """Faces for ``image_bytes``, the detector that found them and whether they came from the cache.
+
+    ``detect`` runs on a miss and its boxes are stored under ``detector`` and
+    ``params``. ``accepted`` and ``allow_lower_recall`` default to the
+    ``FACE_CACHE_ACCEPT`` and ``FACE_CACHE_ALLOW_LOWER_RECALL`` settings.
+    """
+    if cache is None:
+        return detect(), detector, DETECTED
+    if accepted is None:
+        accepted = accepted_detectors_from_env(detector)
+    if allow_lower_recall is None:
+        allow_lower_recall = allow_lower_recall_from_env()
+    cached = cache.lookup(image_bytes, lookup_candidates(detector, params, accepted, allow_lower_recall))
+    if cached is not None:
+        return cached["faces"], cached["detector"], CACHE
+    faces = detect()
+    cache.store(image_bytes, detector, params, faces)
+    return faces, detector, DETECTED
@@ -14,6 +14,8 @@ from PIL import Image, ExifTags
 import numpy as np
 
 from .config import WorkflowConfig
+# Top-level module under src/ so func.py can share it without importing this package
+from face_cache import HAAR_DETECTOR, detect_with_cache, face_cache_from_env
 
 try:  # pragma: no cover - optional dependency for real OCI calls
     import oci
@@ -28,46 +30,48 @@ except Exception:  # pragma: no cover - fall back if opencv not installed
     CV2_AVAILABLE = False
 
 
+def build_object_storage_client():  # pragma: no cover - requires OCI SDK & credentials
+    """OCI Object Storage client (resource principal, else local config), or None when unavailable."""
+    if oci is None:
+        return None
+    try:
+        signer = None
+        config: Dict[str, Any] = {}
+        try:
+            from oci.auth.signers import get_resource_principals_signer
+
+            signer = get_resource_principals_signer()
+            signer_region = getattr(signer, "region", None)
+            resolved_region = os.environ.get("OCI_REGION") or signer_region or "us-ashburn-1"
+            config = {"region": resolved_region}
+            print(f"Using resource principal authentication for Object Storage client (region={resolved_region})")
+        except Exception as rp_error:
+            print(f"Resource principal signer unavailable for Object Storage: {rp_error}")
+            try:
+                config = oci.config.from_file()
+                print("Falling back to local OCI configuration for Object Storage")
+            except Exception as config_error:
+                try:
+                    config = oci.config.from_file("~/.oci/config")
+                    print("Using ~/.oci/config for Object Storage client")
+                except Exception:
+                    return None
+
+        if signer is not None:
+            return oci.object_storage.ObjectStorageClient(config=config, signer=signer)
+        return oci.object_storage.ObjectStorageClient(config)
+    except Exception:
+        return None
+
+
 class ObjectStorageClient:
     """Wrapper that prefers live OCI access but supports local testing."""
 
-    def __init__(self, config: WorkflowConfig):
+    def __init__(self, config: WorkflowConfig, client: Any = None):
         self._config = config
-        self._client = self._build_oci_client()
+        self._client = client if client is not None else build_object_storage_client()
         self._namespace = None  # Cache namespace for put operations
 
-    def _build_oci_client(self):  # pragma: no cover - requires OCI SDK & credentials
-        if oci is None:
-            return None
-        try:
-            signer = None
-            config: Dict[str, Any] = {}
-            try:
-                from oci.auth.signers import get_resource_principals_signer
-
-                signer = get_resource_principals_signer()
-                signer_region = getattr(signer, "region", None)
-                resolved_region = os.environ.get("OCI_REGION") or signer_region or "us-ashburn-1"
-                config = {"region": resolved_region}
-                print(f"Using resource principal authentication for Object Storage client (region={resolved_region})")
-            except Exception as rp_error:
-                print(f"Resource principal signer unavailable for Object Storage: {rp_error}")
-                try:
-                    config = oci.config.from_file()
-                    print("Falling back to local OCI configuration for Object Storage")
-                except Exception as config_error:
-                    try:
-                        config = oci.config.from_file("~/.oci/config")
-                        print("Using ~/.oci/config for Object Storage client")
-                    except Exception:
-                        return None
-
-            if signer is not None:
-                return oci.object_storage.ObjectStorageClient(config=config, signer=signer)
-            return oci.object_storage.ObjectStorageClient(config)
-        except Exception:
-            return None
-
     def _resolve_object_name(self, object_name: str) -> str:
         prefix = self._config.object_storage.delivery_prefix or ""
         if object_name.startswith(prefix):
@@ -691,12 +695,55 @@ def extract_exif(image_bytes: bytes) -> Dict[str, Any]:
     return clean_exif
 
 
+def detect_faces_haar(
+    image_bytes: bytes,
+    scale_factor: float = 1.1,
+    min_neighbors: int = 5,
+    min_face_size: Tuple[int, int] = (30, 30)
+) -> List[Dict[str, Any]]:
+    """
+    Detect faces with OpenCV's bundled Haar cascade.
+
+    Returns boxes in the same ``{"x", "y", "width", "height", "confidence"}``
+    format the face-blur function gets from OCI Vision.
+    """
+    if not CV2_AVAILABLE or cv2 is None:
+        raise RuntimeError(
+            "OpenCV (cv2) is required for face blurring. "
+            "Install it with: pip install opencv-python>=4.8.0"
+        )
+
+    pil_image = Image.open(io.BytesIO(image_bytes))
+    gray = cv2.cvtColor(np.array(pil_image.convert('RGB')), cv2.COLOR_RGB2GRAY)
+
+    # Load pre-trained Haar Cascade for face detection
+    # This classifier comes bundled with OpenCV
+    cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+    face_cascade = cv2.CascadeClassifier(cascade_path)
+
+    if face_cascade.empty():
+        raise ValueError("Failed to load Haar Cascade classifier")
+
+    faces = face_cascade.detectMultiScale(
+        gray,
+        scaleFactor=scale_factor,
+        minNeighbors=min_neighbors,
+        minSize=tuple(min_face_size),
+        flags=cv2.CASCADE_SCALE_IMAGE
+    )
+    return [
+        {"x": int(x), "y": int(y), "width": int(w), "height": int(h), "confidence": 1.0}
+        for (x, y, w, h) in faces
+    ]
+
+
 def blur_faces_in_image(
     image_bytes: bytes,
     blur_intensity: int = 51,
     scale_factor: float = 1.1,
     min_neighbors: int = 5,
-    min_face_size: Tuple[int, int] = (30, 30)
+    min_face_size: Tuple[int, int] = (30, 30),
+    faces: Optional[List[Dict[str, Any]]] = None
 ) -> Tuple[bytes, int]:
     """
     Detect and blur human faces in an image to protect privacy.
@@ -710,6 +757,8 @@ def blur_faces_in_image(
         min_neighbors: How many neighbors each candidate rectangle should have
                       to retain it. Higher values result in fewer false positives.
         min_face_size: Minimum possible face size (width, height) in pixels.
+        faces: Boxes from an earlier detection (e.g. the face cache); when
+               given, Haar detection is skipped.
     
     Returns:
         Processed image bytes with faces blurred
@@ -732,28 +781,17 @@ def blur_faces_in_image(
         image_rgb = np.array(pil_image.convert('RGB'))
         image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
         
-        # Load pre-trained Haar Cascade for face detection
-        # This classifier comes bundled with OpenCV
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        face_cascade = cv2.CascadeClassifier(cascade_path)
-        
-        if face_cascade.empty():
-            raise ValueError("Failed to load Haar Cascade classifier")
-        
-        # Convert to grayscale for face detection (more efficient)
-        gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
-        
-        # Detect faces in the image
-        faces = face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=scale_factor,
-            minNeighbors=min_neighbors,
-            minSize=min_face_size,
-            flags=cv2.CASCADE_SCALE_IMAGE
-        )
+        if faces is None:
+            faces = detect_faces_haar(
+                image_bytes,
+                scale_factor=scale_factor,
+                min_neighbors=min_neighbors,
+                min_face_size=min_face_size
+            )
         
         # Blur each detected face
-        for (x, y, w, h) in faces:
+        for face in faces:
+            x, y, w, h = face["x"], face["y"], face["width"], face["height"]
             # Extract face region with some padding for better coverage
             padding = int(max(w, h) * 0.2)  # 20% padding
             x1 = max(0, x - padding)
@@ -764,6 +802,10 @@ def blur_faces_in_image(
             # Extract the face region
             face_region = image_bgr[y1:y2, x1:x2]
             
+            # Skip boxes that fall outside this image
+            if face_region.size == 0:
+                continue
+            
             # ADAPTIVE BLUR: Scale blur intensity based on face size
             # Use minimum 40% of face dimension for effective anonymization
             face_size = max(w, h)
@@ -819,9 +861,11 @@ class FaceBlurringTool(BaseTool):
     scale_factor: float = 1.05  # Pydantic field
     min_neighbors: int = 3  # Pydantic field
     min_face_size: Tuple[int, int] = (20, 20)  # Pydantic field
+    face_cache: Any = None  # Shared FaceCache, if enabled
     
     def __init__(self, blur_intensity: int = 51, scale_factor: float = 1.05, 
-                 min_neighbors: int = 3, min_face_size: Tuple[int, int] = (20, 20)):
+                 min_neighbors: int = 3, min_face_size: Tuple[int, int] = (20, 20),
+                 face_cache: Any = None):
         """
         Initialize the face blurring tool.
         
@@ -830,12 +874,36 @@ class FaceBlurringTool(BaseTool):
             scale_factor: Detection scale factor. Lower = more thorough. Default 1.05.
             min_neighbors: Detection sensitivity. Lower = more sensitive. Default 3.
             min_face_size: Minimum face size to detect. Default (20, 20).
+            face_cache: Optional FaceCache shared with the face-blur function.
         """
         super().__init__(
             blur_intensity=blur_intensity,
             scale_factor=scale_factor,
             min_neighbors=min_neighbors,
-            min_face_size=min_face_size
+            min_face_size=min_face_size,
+            face_cache=face_cache
+        )
+    
+    def _haar_params(self) -> Dict[str, Any]:
+        return {
+            "scale_factor": self.scale_factor,
+            "min_neighbors": self.min_neighbors,
+            "min_face_size": list(self.min_face_size),
+        }
+    
+    def _detect(self, image_bytes: bytes) -> Tuple[List[Dict[str, Any]], str, str]:
+        """Faces plus the detector that found them and whether they came from the cache."""
+        return detect_with_cache(
+            self.face_cache,
+            image_bytes,
+            HAAR_DETECTOR,
+            self._haar_params(),
+            lambda: detect_faces_haar(
+                image_bytes,
+                scale_factor=self.scale_factor,
+                min_neighbors=self.min_neighbors,
+                min_face_size=self.min_face_size
+            ),
         )
     
     def _run(self, encoded_payload: str) -> str:
@@ -850,12 +918,11 @@ class FaceBlurringTool(BaseTool):
         """
         try:
             image_bytes = base64.b64decode(encoded_payload)
+            faces, detector, source = self._detect(image_bytes)
             processed_bytes, num_faces = blur_faces_in_image(
                 image_bytes,
                 blur_intensity=self.blur_intensity,
-                scale_factor=self.scale_factor,
-                min_neighbors=self.min_neighbors,
-                min_face_size=self.min_face_size
+                faces=faces
             )
             processed_payload = base64.b64encode(processed_bytes).decode('utf-8')
             
@@ -864,6 +931,8 @@ class FaceBlurringTool(BaseTool):
                 "faces_blurred": num_faces > 0,
                 "num_faces": num_faces,
                 "blur_intensity": self.blur_intensity,
+                "detector": detector,
+                "detection_source": source,
                 "detection_settings": {
                     "scale_factor": self.scale_factor,
                     "min_neighbors": self.min_neighbors,
@@ -885,9 +954,9 @@ class ObjectRetrievalTool(BaseTool):
     description: str = "Fetch delivery photo bytes and metadata from OCI Object Storage."
     client: Any = None  # Pydantic field for storage client
 
-    def __init__(self, config: WorkflowConfig):
+    def __init__(self, config: WorkflowConfig, storage_client: Any = None):
         super().__init__()
-        self.client = ObjectStorageClient(config)
+        self.client = ObjectStorageClient(config, storage_client)
 
     def _run(self, object_name: str) -> str:
         result = self.client.get_object(object_name)
@@ -948,17 +1017,28 @@ class DamageDetectionTool(BaseTool):
         raise NotImplementedError
 
 
-def toolset(config: WorkflowConfig) -> Dict[str, BaseTool]:
-    """Factory returning all tools keyed by workflow stage."""
+def toolset(config: WorkflowConfig, storage_client: Any = None) -> Dict[str, BaseTool]:
+    """Factory returning all tools keyed by workflow stage.
+
+    ``storage_client`` is the OCI Object Storage client shared by photo
+    retrieval and the face cache; one is built when it is not given.
+    """
 
+    if storage_client is None:
+        storage_client = build_object_storage_client()
     return {
-        "retrieval": ObjectRetrievalTool(config),
+        "retrieval": ObjectRetrievalTool(config, storage_client),
         "exif": ExifExtractionTool(),
         "face_blur": FaceBlurringTool(
             blur_intensity=config.privacy.blur_intensity,
             scale_factor=config.privacy.face_detection_scale_factor,
             min_neighbors=config.privacy.face_detection_min_neighbors,
-            min_face_size=config.privacy.face_detection_min_size
+            min_face_size=config.privacy.face_detection_min_size,
+            face_cache=face_cache_from_env(
+                storage_client,
+                config.object_storage.namespace,
+                config.object_storage.bucket_name,
+            )
         ),
         "caption": ImageCaptionTool(config),
         "damage": DamageDetectionTool(config),